@@ -3,12 +3,31 @@ PageRank Implementation Package
 
 This package provides various implementations of the PageRank algorithm,
 including power iteration, Gauss-Seidel, GMRES, and direct LU methods.
+
+Solvers are loaded lazily: ``pagerank.power_pagerank`` and friends import
+their module on first access (see ``pagerank.algorithms.get_solver``).
 """
 
-from .algorithms.power import pagerank as power_pagerank
-from .algorithms.gauss_seidel import pagerank as gauss_seidel_pagerank
-from .algorithms.direct_lu import pagerank as direct_lu_pagerank
-from .algorithms.gmres_solver import pagerank as gmres_pagerank
-from .algorithms.anderson_acceleration import pagerank as anderson_pagerank
+__version__ = "0.1.0"
+
+_LAZY = {
+    "power_pagerank",
+    "gauss_seidel_pagerank",
+    "direct_lu_pagerank",
+    "gmres_pagerank",
+    "anderson_pagerank",
+    "monte_carlo_pagerank",
+    "adaptive_pagerank",
+    "blockrank_pagerank",
+    "inner_outer_pagerank",
+    "power_arnoldi_pagerank",
+    "async_relaxation_pagerank",
+    "auto_pagerank",
+}
+
 
-__version__ = "0.1.0" 
\ No newline at end of file
+def __getattr__(name: str):
+    if name in _LAZY:
+        from . import algorithms
+        return getattr(algorithms, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,6 +1,106 @@
-from .power import pagerank as power_pagerank
-from .gauss_seidel import pagerank as gauss_seidel_pagerank
-from .direct_lu import pagerank as direct_lu_pagerank
-from .gmres_solver import pagerank as gmres_pagerank
-from .anderson_acceleration import pagerank as anderson_pagerank
- 
\ No newline at end of file
+"""
+Registry of PageRank solvers.
+
+Solver modules are imported only when they are first selected, so importing
+the package (or running the CLI with one algorithm) does not pay for SciPy
+LinearOperator/SuperLU set-up of solvers that are never used.
+
+Every solver module exposes
+    pagerank(G, *, alpha, tol, max_iter, ...) -> (scores, residuals, elapsed)
+
+Other packages can add solvers through the ``pagerank.solvers`` entry-point
+group; the entry point's value must be the solver's module path, e.g.::
+
+    [project.entry-points."pagerank.solvers"]
+    my_solver = "my_package.my_solver"
+"""
+
+from __future__ import annotations
+import importlib
+from types import ModuleType
+from typing import Callable, Dict, List
+
+# name -> module path; modules are imported on first use
+SOLVERS: Dict[str, str] = {
+    "power": "pagerank.algorithms.power",
+    "gauss_seidel": "pagerank.algorithms.gauss_seidel",
+    "gmres_solver": "pagerank.algorithms.gmres_solver",
+    "direct_lu": "pagerank.algorithms.direct_lu",
+    "anderson_acceleration": "pagerank.algorithms.anderson_acceleration",
+    "monte_carlo": "pagerank.algorithms.monte_carlo",
+    "adaptive": "pagerank.algorithms.adaptive",
+    "blockrank": "pagerank.algorithms.blockrank",
+    "inner_outer": "pagerank.algorithms.inner_outer",
+    "power_arnoldi": "pagerank.algorithms.power_arnoldi",
+    "async_relaxation": "pagerank.algorithms.async_relaxation",
+    "auto": "pagerank.algorithms.auto",
+}
+
+# Names re-exported for backwards compatibility (``from pagerank.algorithms import power_pagerank``)
+_ALIASES = {
+    "power_pagerank": "power",
+    "gauss_seidel_pagerank": "gauss_seidel",
+    "direct_lu_pagerank": "direct_lu",
+    "gmres_pagerank": "gmres_solver",
+    "anderson_pagerank": "anderson_acceleration",
+    "monte_carlo_pagerank": "monte_carlo",
+    "adaptive_pagerank": "adaptive",
+    "blockrank_pagerank": "blockrank",
+    "inner_outer_pagerank": "inner_outer",
+    "power_arnoldi_pagerank": "power_arnoldi",
+    "async_relaxation_pagerank": "async_relaxation",
+    "auto_pagerank": "auto",
+}
+
+_entry_points_loaded = False
+
+
+def _load_entry_points() -> None:
+    """Add solvers registered by other installed packages (read once)."""
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:  # Python < 3.8
+        return
+    eps = entry_points()
+    group = (eps.select(group="pagerank.solvers") if hasattr(eps, "select")
+             else eps.get("pagerank.solvers", []))
+    for ep in group:
+        SOLVERS.setdefault(ep.name, ep.value.split(":")[0])
+
+
+def available_solvers() -> List[str]:
+    """Names of all registered solvers, built-in ones first."""
+    _load_entry_points()
+    return list(SOLVERS)
+
+
+def register_solver(name: str, module: str) -> None:
+    """Register a solver module under ``name`` without importing it."""
+    SOLVERS[name] = module
+
+
+def get_solver_module(name: str) -> ModuleType:
+    """Import and return the module implementing solver ``name``."""
+    if name not in SOLVERS:
+        _load_entry_points()
+    try:
+        path = SOLVERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown algorithm {name!r}. "
+                         f"Valid choices are: {', '.join(available_solvers())}") from None
+    return importlib.import_module(path)
+
+
+def get_solver(name: str) -> Callable:
+    """Return the ``pagerank`` function of solver ``name``."""
+    return get_solver_module(name).pagerank
+
+
+def __getattr__(name: str):
+    if name in _ALIASES:
+        return get_solver(_ALIASES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
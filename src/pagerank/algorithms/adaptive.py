@@ -0,0 +1,155 @@
+"""
+Deadline-aware PageRank: picks power iteration or Anderson acceleration
+from the convergence observed in a few probe iterations.
+
+Power iteration on the Google matrix contracts the L1 residual by a roughly
+constant factor ρ per step.  After ``probe`` steps the solver knows ρ and
+the time per step, so it can predict the time power iteration needs to
+reach ``tol``:
+
+    t_power ≈ t_step · log(tol / r) / log(ρ)
+
+Anderson acceleration behaves like a Krylov method, needing roughly the
+square root of that many iterations.  Each of its iterations costs about
+``ANDERSON_COST`` power steps, and it has to build its own matrix first,
+which takes about as long as the probe's matrix build.  The solver continues
+with whichever is predicted to finish first.  With a ``time_budget`` it also
+keeps power iteration whenever that still fits in the remaining time, since
+power iteration has monotone residuals and the cheapest steps.
+"""
+
+from __future__ import annotations
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+
+from ..deadline import Deadline, error_bound
+from ..logging_utils import get_logger
+from ..tracing import NULL_TRACER, Tracer
+from ..transition import transition_matrix
+from .kernel import PageRankKernel, start_vector
+
+logger = get_logger(__name__)
+
+# Cost of one Anderson iteration relative to one power step (least squares
+# and history updates on top of the same mat-vec)
+ANDERSON_COST = 2.0
+
+
+def pagerank(
+    G: nx.DiGraph,
+    *,
+    alpha: float = 0.85,
+    tol: float = 1e-6,
+    max_iter: int = 100,
+    time_budget: Optional[float] = None,
+    probe: int = 5,
+    m: int = 5,
+    x0: Optional[Dict] = None,
+    stats: Optional[dict] = None,
+    tracer: Optional[Tracer] = None,
+) -> Tuple[Dict[int, float], List[float], float]:
+    """
+    Power iteration or Anderson acceleration, whichever is predicted to
+    reach ``tol`` first (within ``time_budget`` if given).
+
+    Args:
+        G: Input graph
+        alpha: Damping factor
+        tol: Convergence threshold (L1 residual)
+        max_iter: Maximum number of iterations over both phases
+        time_budget: Seconds available; the best iterate is returned when
+            they run out
+        probe: Power iterations used to measure the convergence rate
+        m: Anderson history size if Anderson is chosen
+        x0: Optional start vector {node: score}
+        stats: If given, filled with ``error_bound`` (certified),
+            ``deadline_hit`` and ``solver`` (the path taken)
+        tracer: Optional tracer recording phase timings and residuals
+
+    Returns:
+        Tuple of (scores, residuals, elapsed)
+    """
+    t0 = time.perf_counter()
+    deadline = Deadline(time_budget)
+    tracer = tracer or NULL_TRACER
+
+    if G.number_of_nodes() == 0:
+        return {}, [], 0.0
+
+    logger.info("Starting adaptive solver")
+    with tracer.phase("build_matrix"):
+        nodes, P, dangling = transition_matrix(G)
+        N = len(nodes)
+    t_build = time.perf_counter() - t0
+
+    kernel = PageRankKernel(P, alpha, dangling=dangling)
+    x, y = kernel.buffers(start_vector(x0, nodes))
+    residuals: List[float] = []
+    path = "power"
+
+    def power_steps(limit: int) -> None:
+        nonlocal x, y
+        for _ in range(limit):
+            with tracer.phase("spmv"):
+                kernel.apply(x, y)
+            tracer.matvec()
+            with tracer.phase("residual"):
+                res = kernel.residual(x, y)
+            residuals.append(res)
+            tracer.iteration(res)
+            x, y = y, x
+            if res < tol or deadline.expired():
+                return
+
+    t_probe = time.perf_counter()
+    power_steps(min(probe, max_iter))
+    t_step = (time.perf_counter() - t_probe) / max(len(residuals), 1)
+
+    done = residuals[-1] < tol or deadline.hit or len(residuals) >= max_iter
+    if not done:
+        rates = [b / a for a, b in zip(residuals[:-1], residuals[1:]) if a > 0]
+        rho = min(max(rates[-1] if rates else alpha, 1e-12), 1 - 1e-12)
+        power_iters = math.log(tol / residuals[-1]) / math.log(rho)
+        t_power = t_step * power_iters
+        t_anderson = t_build + ANDERSON_COST * t_step * math.sqrt(power_iters)
+        remaining = deadline.remaining()
+        use_power = t_power <= t_anderson or (time_budget is not None and t_power <= remaining)
+        logger.info(f"Observed rate {rho:.3f}: power needs ~{power_iters:.0f} more iterations "
+                    f"(~{t_power:.2f}s), Anderson ~{t_anderson:.2f}s"
+                    + (f", {remaining:.2f}s left" if time_budget is not None else "")
+                    + f"; continuing with {'power iteration' if use_power else 'Anderson'}")
+        if use_power:
+            power_steps(max_iter - len(residuals))
+        else:
+            from . import anderson_acceleration
+
+            path = "power→anderson"
+            inner = {}
+            scores, more, _ = anderson_acceleration.pagerank(
+                G, alpha=alpha, tol=tol, max_iter=max_iter - len(residuals), m=m,
+                x0=dict(zip(nodes, x)), time_budget=None if time_budget is None else remaining,
+                stats=inner, tracer=tracer)
+            residuals.extend(more)
+            deadline.hit = deadline.hit or inner["deadline_hit"]
+            x = np.fromiter((scores[n] for n in nodes), dtype=float, count=N)
+            bound = inner["error_bound"]
+
+    if path == "power":
+        x = np.maximum(x, 0)
+        x /= x.sum()
+        bound = error_bound(residuals[-1], alpha, stepped=True)
+    if deadline.hit:
+        logger.warning(f"Time budget of {time_budget:.3f}s used up; error bound {bound:.2e}")
+
+    tracer.annotate(solver=path, error_bound=bound)
+    if stats is not None:
+        stats.update(error_bound=bound, deadline_hit=deadline.hit, solver=path)
+
+    elapsed = time.perf_counter() - t0
+    logger.info(f"Adaptive solver ({path}) completed in {elapsed:.2f}s "
+                f"with {len(residuals)} iterations")
+    return dict(zip(nodes, x)), residuals, elapsed
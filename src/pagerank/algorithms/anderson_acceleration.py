@@ -1,25 +1,150 @@
 import networkx as nx
 import numpy as np
 import time
-from scipy.sparse import csr_matrix
-from typing import Dict, List, Tuple
+from scipy.linalg import solve_triangular
+from scipy.linalg.blas import drot
+from typing import Dict, List, Optional, Tuple
+from ..checkpoint import Checkpointer
+from ..deadline import Deadline, error_bound
 from ..logging_utils import get_logger
+from ..tracing import NULL_TRACER, Tracer
+from ..transition import transition_matrix
+from .kernel import PageRankKernel, start_vector
 
 logger = get_logger(__name__)
 
+
+class _AndersonHistory:
+    """
+    Fixed-size Anderson history: thin QR factors of ΔF and a ring buffer of ΔX.
+
+    Q (N×m, Fortran order so columns are contiguous) and R (m×m) factor the
+    last k ≤ m residual differences ΔF = Q·R.  Appending a column is one
+    Gram-Schmidt step (re-orthogonalised once); dropping the oldest column
+    is a Givens downdate of R whose rotations are applied to Q in place.
+    Q keeps its logical column order, so only ΔX needs ring indexing.
+    N-length intermediates go through one preallocated scratch vector, so
+    nothing is allocated per iteration beyond O(m) scratch.
+    """
+
+    def __init__(self, N: int, m: int):
+        self.m = m
+        self.k = 0
+        self.start = 0  # physical ΔX column of the oldest entry
+        self.Q = np.zeros((N, m), order="F")
+        self.R = np.zeros((m, m))
+        self.dX = np.zeros((N, m), order="F")
+        self.coef = np.zeros(m)  # γ in physical ΔX order
+        self.tmp = np.empty(N)  # scratch for N-length products
+
+    def clear(self) -> None:
+        self.k = 0
+        self.start = 0
+
+    def drop_oldest(self) -> None:
+        k, R, Q = self.k, self.R, self.Q
+        # Removing R's first column leaves an upper Hessenberg matrix
+        R[:k, :k - 1] = R[:k, 1:k]
+        R[:, k - 1] = 0.0
+        for i in range(k - 1):
+            a, b = R[i, i], R[i + 1, i]
+            h = np.hypot(a, b)
+            if h == 0.0:
+                continue
+            c, s = a / h, b / h
+            Ri, Ri1 = R[i, i:k - 1].copy(), R[i + 1, i:k - 1].copy()
+            R[i, i:k - 1] = c * Ri + s * Ri1
+            R[i + 1, i:k - 1] = c * Ri1 - s * Ri
+            drot(Q[:, i], Q[:, i + 1], c, s, overwrite_x=True, overwrite_y=True)
+        R[k - 1, :] = 0.0
+        self.k -= 1
+        self.start = (self.start + 1) % self.m
+
+    def push(self, df_into, dx_into) -> bool:
+        """
+        Append a (ΔF, ΔX) pair, dropping the oldest one if the buffer is full.
+
+        ``df_into(out)`` and ``dx_into(out)`` write the new columns straight
+        into the buffers.  Returns False if ΔF is numerically dependent on
+        the stored columns (the pair is then discarded).
+        """
+        if self.k == self.m:
+            self.drop_oldest()
+        k = self.k
+        q = self.Q[:, k]
+        df_into(q)
+        dx_into(self.dX[:, (self.start + k) % self.m])
+        norm0 = np.linalg.norm(q)
+        if k:
+            Qk, tmp = self.Q[:, :k], self.tmp
+            r = Qk.T @ q
+            q -= np.dot(Qk, r, out=tmp)
+            r2 = Qk.T @ q  # second Gram-Schmidt pass ("twice is enough")
+            q -= np.dot(Qk, r2, out=tmp)
+            self.R[:k, k] = r + r2
+        rkk = np.linalg.norm(q)
+        if rkk <= 1e-14 * norm0 or norm0 == 0.0:
+            self.R[:k, k] = 0.0
+            return False
+        q /= rkk
+        self.R[k, k] = rkk
+        self.k += 1
+        return True
+
+    def condition(self) -> float:
+        """Cheap estimate of cond(R) from its diagonal."""
+        d = np.abs(np.diag(self.R)[:self.k])
+        return d.max() / d.min()
+
+    def coefficients(self, f: np.ndarray, reg: float) -> np.ndarray:
+        """Solve min ‖f − ΔF·γ‖² + λ‖γ‖² with λ = reg·‖R‖²_F."""
+        k = self.k
+        Rk = self.R[:k, :k]
+        qf = self.Q[:, :k].T @ f
+        if reg > 0.0:
+            lam = reg * np.sum(Rk * Rk)
+            return np.linalg.solve(Rk.T @ Rk + lam * np.eye(k), Rk.T @ qf)
+        return solve_triangular(Rk, qf)
+
+    def apply(self, gamma: np.ndarray, x: np.ndarray, f: np.ndarray, beta: float) -> None:
+        """x ← x + β·f − ΔX·γ − β·ΔF·γ, in place."""
+        k = self.k
+        self.coef[:] = 0.0
+        self.coef[(self.start + np.arange(k)) % self.m] = gamma
+        tmp = self.tmp
+        x += np.multiply(f, beta, out=tmp)
+        x -= np.dot(self.dX, self.coef, out=tmp)
+        np.dot(self.Q[:, :k], self.R[:k, :k] @ gamma, out=tmp)
+        x -= np.multiply(tmp, beta, out=tmp)
+
+
 def pagerank(
     G: nx.DiGraph,
     *,
     alpha: float = 0.85,
     tol: float = 1e-6,
     max_iter: int = 100,
-    m: int = 2  # Number of previous vectors to use for acceleration
+    m: int = 2,  # Number of previous vectors to use for acceleration
+    beta: float = 1.0,
+    reg: float = 0.0,
+    droptol: float = 1e10,
+    safeguard: Optional[float] = 10.0,
+    tracer: Optional[Tracer] = None,
+    checkpoint: Optional[Checkpointer] = None,
+    x0: Optional[Dict] = None,
+    time_budget: Optional[float] = None,
+    stats: Optional[dict] = None,
 ) -> Tuple[Dict[int, float], List[float], float]:
     """
-    PageRank with Anderson Acceleration:
-        p_{t+1} = (1-β)G(p_t) + βG(p_{t-1})
-    where G(p) = α * Â * p + (1‑α) * v is the standard PageRank update,
-    and β is optimized using the previous m vectors.
+    PageRank with type-II Anderson acceleration (Anderson mixing):
+        f_t = G(p_t) − p_t
+        γ_t = argmin ‖f_t − ΔF_t γ‖
+        p_{t+1} = p_t + β f_t − (ΔX_t + β ΔF_t) γ_t
+    where G(p) = α * Â * p + (1‑α) * v is the standard PageRank update and
+    ΔX_t, ΔF_t hold the last m differences of iterates and residuals.
+
+    The history lives in preallocated N×m buffers (see _AndersonHistory),
+    so memory per iteration is constant and m = 10–20 is practical.
 
     Parameters
     ----------
@@ -33,92 +158,145 @@ def pagerank(
         Maximum number of iterations, by default 100
     m : int, optional
         Number of previous vectors to use for acceleration, by default 2
+    beta : float, optional
+        Mixing (damping) parameter; 1.0 gives undamped Anderson, by default 1.0
+    reg : float, optional
+        Tikhonov regularisation of the least-squares problem, relative to
+        ‖ΔF‖², by default 0.0
+    droptol : float, optional
+        Drop the oldest history columns while cond(R) exceeds this,
+        by default 1e10
+    safeguard : float, optional
+        Clear the history when the residual grows by more than this factor
+        in one step; None disables the restart, by default 10.0
+    tracer : Tracer, optional
+        Records per-phase timings and residuals, by default disabled
+    checkpoint : Checkpointer, optional
+        Periodically saves the iterate and the Anderson history, and
+        resumes a saved run, by default disabled
+    x0 : dict, optional
+        Start vector {node: score}, by default uniform
+    time_budget : float, optional
+        Seconds after which the best image G(p) seen so far is returned,
+        by default unlimited
+    stats : dict, optional
+        Receives the certified ``error_bound`` of the result and
+        ``deadline_hit``
 
     Returns
     -------
     pr : dict[node,float]
         Final PageRank scores (L1‑normalised).
     residuals : list[float]
-        L1 error ‖p_{t+1} − p_t‖ at each iteration.
+        L1 residual ‖G(p_t) − p_t‖ at each iteration.
     elapsed : float
         Wall‑clock time in seconds.
     """
     t0 = time.perf_counter()
+    deadline = Deadline(time_budget)
+    tracer = tracer or NULL_TRACER
     
     N = G.number_of_nodes()
     if N == 0:
         return {}, [], 0.0
 
-    # Relabel nodes to 0..N‑1 for vectorised ops
-    nodes = list(G.nodes())
-    index = {n: i for i, n in enumerate(nodes)}
-    out_deg = np.array([G.out_degree(n) for n in nodes], dtype=float)
-
-    # Build sparse column‑stochastic matrix in CSR
-    row_idx, col_idx, data = [], [], []
-    for u, v in G.edges():
-        row_idx.append(index[v])      # note: transpose for column‑stochastic
-        col_idx.append(index[u])
-        data.append(1.0 / out_deg[index[u]] if out_deg[index[u]] else 0.0)
-    A = csr_matrix((data, (row_idx, col_idx)), shape=(N, N))
+    with tracer.phase("build_matrix"):
+        # Sparse column‑stochastic matrix in CSR, nodes relabelled to 0..N‑1
+        nodes, A, dangling = transition_matrix(G)
 
     # Uniform teleport & dangling distribution
-    v = np.full(N, 1.0 / N)
-    dangling = (out_deg == 0).astype(float)
+    kernel = PageRankKernel(A, alpha, dangling=dangling)
 
-    # Initialize vectors
-    p = np.full(N, 1.0 / N)
+    # Preallocated state: iterate, its image, residual and the previous pair
+    p, g = kernel.buffers(start_vector(x0, nodes))
+    f = np.empty(N)
+    p_prev = np.empty(N)
+    f_prev = np.empty(N)
+    history = _AndersonHistory(N, max(1, m))
     residuals = []
-    history = []  # Store previous vectors for acceleration
     last_err = float('inf')
+    first = 0
+    # Anderson residuals are not monotone: under a deadline keep the best G(p)
+    best = np.empty(N) if time_budget is not None else None
+    best_err = float('inf')
+    bound = None
+
+    state = (checkpoint.start(solver="anderson_acceleration", nodes=N, edges=A.nnz, alpha=alpha,
+                              m=m, beta=beta, reg=reg) if checkpoint else None)
+    if state is not None:
+        p[:], p_prev[:], f_prev[:] = state["p"], state["p_prev"], state["f_prev"]
+        history.Q[:], history.R[:], history.dX[:] = state["Q"], state["R"], state["dX"]
+        history.k, history.start = int(state["k"]), int(state["start"])
+        residuals = state["residuals"].tolist()
+        last_err = float(state["last_err"])
+        first = int(state["iteration"])
+        t0 -= float(state["elapsed"])
 
-    for _ in range(max_iter):
-        # Standard PageRank update
-        dangling_mass = (dangling * p).sum()
-        p_new = alpha * (A @ p + dangling_mass * v) + (1.0 - alpha) * v
-
-        # Store current vector in history
-        history.append(p_new)
-        if len(history) > m:
-            history.pop(0)  # Keep only last m vectors
-
-        # Apply Anderson acceleration if we have enough history
-        if len(history) > 1:
-            # Calculate differences between consecutive vectors
-            diffs = np.diff(history, axis=0)
-            
-            # Solve least squares problem to find optimal coefficients
-            try:
-                # Use QR decomposition for better numerical stability
-                Q, R = np.linalg.qr(diffs[:-1].T)
-                beta = np.linalg.solve(R, Q.T @ diffs[-1])
-                
-                # Apply acceleration with stability check
-                beta = beta.reshape(-1, 1)
-                p_acc = history[-1] + np.sum(beta * diffs[:-1], axis=0)
-                
-                # Check if acceleration improved the result
-                err_acc = np.abs(p_acc - p).sum()
-                if err_acc < last_err:
-                    p_new = p_acc
-                else:
-                    logger.debug("Acceleration rejected, using standard update")
-            except np.linalg.LinAlgError:
-                # Fall back to standard update if acceleration fails
-                logger.debug("Anderson acceleration failed, using standard update")
-                p_new = history[-1]
-
-        err = np.abs(p_new - p).sum()
+    for it in range(first, max_iter):
+        # Standard PageRank update g = G(p)
+        with tracer.phase("spmv"):
+            kernel.apply(p, g)
+        tracer.matvec()
+
+        with tracer.phase("residual"):
+            np.subtract(g, p, out=f)
+            err = np.abs(f).sum()
         residuals.append(err)
-        last_err = err
-        
+        tracer.iteration(err)
         if err < tol:
-            p = p_new
+            p, g = g, p
+            bound = error_bound(err, alpha, stepped=True)
+            break
+        if best is not None and err < best_err:
+            best[:] = g
+            best_err = err
+        if deadline.expired():
+            logger.warning(f"Time budget of {time_budget:.3f}s used up after {it + 1} iterations "
+                           f"(best residual {best_err:.2e})")
+            p = best
+            bound = error_bound(best_err, alpha, stepped=True)
             break
-        p = p_new
+
+        with tracer.phase("acceleration"):
+            if safeguard is not None and err > safeguard * last_err and history.k:
+                logger.debug(f"Residual grew {err / last_err:.1f}x, restarting Anderson history")
+                history.clear()
+            elif it > 0 and m > 0:
+                history.push(lambda out: np.subtract(f, f_prev, out=out),
+                             lambda out: np.subtract(p, p_prev, out=out))
+                while history.k > 1 and history.condition() > droptol:
+                    history.drop_oldest()
+            last_err = err
+            p_prev[:] = p
+            f_prev[:] = f
+
+            if history.k:
+                try:
+                    gamma = history.coefficients(f, reg)
+                    history.apply(gamma, p, f, beta)
+                    # Keep the iterate a probability vector
+                    np.maximum(p, 0.0, out=p)
+                    p /= p.sum()
+                except np.linalg.LinAlgError:
+                    logger.debug("Anderson least-squares failed, using standard update")
+                    history.clear()
+                    p[:] = g
+            else:
+                p += np.multiply(f, beta, out=history.tmp)
+
+        if checkpoint:
+            checkpoint.step(it + 1, lambda: dict(
+                p=p, p_prev=p_prev, f_prev=f_prev, Q=history.Q, R=history.R, dX=history.dX,
+                k=history.k, start=history.start, last_err=last_err, residuals=residuals,
+                elapsed=time.perf_counter() - t0))
 
     # Normalise exactly
     p /= p.sum()
+    if bound is None:
+        bound = kernel.certify(p)
+    tracer.annotate(error_bound=bound)
+    if stats is not None:
+        stats.update(error_bound=bound, deadline_hit=deadline.hit)
     
     elapsed = time.perf_counter() - t0
-    return {n: p[index[n]] for n in nodes}, residuals, elapsed
+    return dict(zip(nodes, p)), residuals, elapsed
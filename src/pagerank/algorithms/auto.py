@@ -0,0 +1,110 @@
+"""
+Automatic solver selection (``--algorithm auto``).
+
+Extracts cheap graph features, predicts the time and memory of every
+candidate solver with the cost model calibrated from benchmark history
+(see ``pagerank.cost_model``), and runs the predicted fastest one that
+fits in memory and is expected to converge.  The prediction table and
+the reason for the choice are logged.
+"""
+
+from __future__ import annotations
+import inspect
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import networkx as nx
+
+from ..checkpoint import Checkpointer
+from ..cost_model import CANDIDATES, CostModel, graph_features, select_solver
+from ..logging_utils import get_logger
+from ..memory import available_memory
+from ..tracing import NULL_TRACER, Tracer
+from . import get_solver
+
+logger = get_logger(__name__)
+
+
+def pagerank(
+    G: nx.DiGraph,
+    *,
+    alpha: float = 0.85,
+    tol: float = 1e-6,
+    max_iter: int = 100,
+    candidates: Sequence[str] = CANDIDATES,
+    history: Optional[Sequence[str]] = None,
+    memory_budget: Optional[int] = None,
+    x0: Optional[Dict] = None,
+    time_budget: Optional[float] = None,
+    stats: Optional[dict] = None,
+    checkpoint: Optional[Checkpointer] = None,
+    tracer: Optional[Tracer] = None,
+) -> Tuple[Dict[int, float], List[float], float]:
+    """
+    Run the solver the cost model predicts to be fastest on G.
+
+    Args:
+        G: Input graph
+        alpha: Damping factor
+        tol: Convergence threshold
+        max_iter: Maximum number of iterations of the chosen solver
+        candidates: Solvers to choose from
+        history: Benchmark history files calibrating the cost model
+            (default: ``cost_model.HISTORY_FILE`` if it exists)
+        memory_budget: Bytes available to the solver (default: detected
+            free memory)
+        x0, time_budget, checkpoint: Passed on to the chosen solver if it
+            supports them
+        stats: If given, filled by the chosen solver, plus ``solver``,
+            ``predicted_s`` and ``predicted_MB``
+        tracer: Optional tracer recording phase timings and residuals
+
+    Returns:
+        Tuple of (scores, residuals, elapsed); elapsed includes the selection
+    """
+    t0 = time.perf_counter()
+    tracer = tracer or NULL_TRACER
+
+    if G.number_of_nodes() == 0:
+        return {}, [], 0.0
+
+    with tracer.phase("select_solver"):
+        features = graph_features(G)
+        model = CostModel.from_history(history)
+        budget = memory_budget if memory_budget is not None else available_memory()
+        ranked = select_solver(features, model, alpha=alpha, tol=tol, max_iter=max_iter,
+                               candidates=candidates, memory_budget=budget,
+                               time_budget=time_budget)
+    logger.info(f"Graph features: {features.nodes} nodes, {features.edges} edges, "
+                f"{features.dangling:.1%} dangling, largest SCC {features.giant_scc:.1%}, "
+                f"{features.closed_sccs} closed SCCs, degree skew {features.skew:.0f}")
+    for p in ranked:
+        notes = [note for ok, note in ((p.fits, "exceeds memory"), (p.converges, "no convergence"),
+                                       (p.within_budget, "over time budget")) if not ok]
+        calibrated = f"{model.samples[p.solver]} samples" if p.solver in model.samples else "prior"
+        logger.info(f"  {p.solver:<22} ~{p.seconds:9.3f}s  ~{p.bytes / 2**20:8.0f} MB  "
+                    f"({calibrated}{'; ' + ', '.join(notes) if notes else ''})")
+
+    best = ranked[0]
+    rejected = [p for p in ranked[1:] if p.fits and p.converges and p.within_budget]
+    reason = (f"fastest predicted ({best.seconds:.3f}s"
+              + (f" vs {rejected[0].solver} {rejected[0].seconds:.3f}s" if rejected else "") + ")")
+    if not best.fits:
+        reason = "no candidate fits in memory; it has the smallest predicted time"
+    elif not best.converges:
+        reason = f"no candidate is predicted to converge within {max_iter} iterations; fastest of them"
+    elif not best.within_budget:
+        reason = f"no candidate fits the {time_budget:.3f}s budget; fastest of them"
+    logger.info(f"Selected {best.solver}: {reason}")
+
+    solve = get_solver(best.solver)
+    params = inspect.signature(solve).parameters
+    passed = dict(x0=x0, time_budget=time_budget, stats=stats, checkpoint=checkpoint, tracer=tracer)
+    kw = {k: v for k, v in passed.items() if v is not None and k in params}
+    t_select = time.perf_counter() - t0
+    scores, residuals, elapsed = solve(G, alpha=alpha, tol=tol, max_iter=max_iter, **kw)
+    tracer.annotate(solver=best.solver, predicted_s=best.seconds)
+    if stats is not None:
+        stats.update(solver=best.solver, predicted_s=best.seconds,
+                     predicted_MB=best.bytes / 2**20)
+    return scores, residuals, t_select + elapsed
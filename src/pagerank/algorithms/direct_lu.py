@@ -13,26 +13,18 @@ import networkx as nx, numpy as np, time
 from scipy.sparse import csr_matrix, eye
 from scipy.sparse.linalg import splu
 from ..logging_utils import get_logger
-from typing import Dict, List, Tuple
+from ..tracing import NULL_TRACER, Tracer
+from ..transition import transition_matrix
+from typing import Dict, List, Optional, Tuple
 
 logger = get_logger(__name__)
 
 
-def build_matrix(G, alpha: float = 0.85) -> csr_matrix:
-    """Return A = I - α·P as CSR sparse matrix."""
-    n = G.number_of_nodes()
-    idx = {u: i for i, u in enumerate(G.nodes())}
-    
-    # Build P (transpose matrix)
-    rows, cols, data = [], [], []
-    for u, v in G.edges():
-        j, i = idx[u], idx[v]          # P: source column is destination node
-        rows.append(i)
-        cols.append(j)
-        data.append(1.0 / G.out_degree(u))
-    
-    P = csr_matrix((data, (rows, cols)), shape=(n, n))
-    return eye(n) - alpha * P
+def build_matrix(G, alpha: float = 0.85) -> Tuple[List, csr_matrix]:
+    """Return (nodes, A = I - α·P as CSR sparse matrix), rows in ``nodes`` order."""
+    # P: source column is destination node; dangling columns stay zero
+    nodes, P, _ = transition_matrix(G)
+    return nodes, eye(P.shape[0]) - alpha * P
 
 
 def pagerank(
@@ -42,13 +34,15 @@ def pagerank(
     tol: float = 1e-12,          # not used, kept for interface consistency
     max_iter: int = 1,           # not used
     permc_spec: str = "COLAMD",  # SuiteSparse pivot strategy
-    drop_tol: float = 1e-10      # for detecting singular matrix
+    drop_tol: float = 1e-10,     # for detecting singular matrix
+    tracer: Optional[Tracer] = None,
 ) -> Tuple[Dict[int, float], List[float], float]:
     """
     Return (scores, residuals=[], elapsed).
     residuals is empty because this is a Direct method.
     """
     t0 = time.perf_counter()
+    tracer = tracer or NULL_TRACER
     
     if G.number_of_nodes() == 0:
         return {}, [], 0.0
@@ -57,17 +51,21 @@ def pagerank(
     logger.debug(f"Parameters: alpha={alpha}, drop_tol={drop_tol}")
 
     # 1. Build A (CSR) and vector b
-    A = build_matrix(G, alpha)
-    b = np.ones(G.number_of_nodes()) * (1 - alpha) / G.number_of_nodes()
+    with tracer.phase("build_matrix"):
+        nodes, A = build_matrix(G, alpha)
+        b = np.ones(len(nodes)) * (1 - alpha) / len(nodes)
     
     # 2. LU decomposition
     logger.info("Factorising sparse LU...")
-    lu = splu(A.tocsc(), permc_spec=permc_spec,
-              options={"ILU_MILU": "SMILU_2"})  # full pivoting
+    with tracer.phase("factorize"):
+        lu = splu(A.tocsc(), permc_spec=permc_spec,
+                  options={"ILU_MILU": "SMILU_2"})  # full pivoting
+    tracer.annotate(lu_nnz=int(lu.L.nnz + lu.U.nnz))
     
     # 3. Solve
     logger.debug("Solving system...")
-    x = lu.solve(b)
+    with tracer.phase("solve"):
+        x = lu.solve(b)
     
     # 4. Normalize & statistics
     x = np.maximum(x, 0)
@@ -75,4 +73,4 @@ def pagerank(
     
     elapsed = time.perf_counter() - t0
     logger.info(f"Direct LU completed in {elapsed:.2f}s")
-    return dict(zip(G.nodes(), x)), [], elapsed 
\ No newline at end of file
+    return dict(zip(nodes, x)), [], elapsed 
\ No newline at end of file
@@ -11,12 +11,19 @@ omega can be a float or a callable function that takes (iteration, residuals) an
 from __future__ import annotations
 import networkx as nx
 import numpy as np, time
-from scipy.sparse import csr_matrix
-from typing import Union, Callable, List, Dict, Tuple
+from typing import Union, Callable, List, Dict, Optional, Tuple
+from ..checkpoint import Checkpointer
+from ..deadline import Deadline
 from ..logging_utils import get_logger
+from ..tracing import NULL_TRACER, Tracer
+from ..transition import transition_matrix
+from .kernel import PageRankKernel, start_vector
 
 logger = get_logger(__name__)
 
+# Nodes between deadline checks inside a sweep
+DEADLINE_CHECK = 4096
+
 def find_optimal_omega(G: nx.DiGraph, alpha: float = 0.85, test_range: tuple = (1.0, 1.9), steps: int = 10) -> float:
     """
     Find optimal omega by testing a range of values and selecting the one with fastest convergence.
@@ -81,82 +88,98 @@ def find_optimal_omega(G: nx.DiGraph, alpha: float = 0.85, test_range: tuple = (
                 f"final residual = {best_residual:.2e})")
     return best_omega
 
-def create_dynamic_omega() -> Callable[[int, List[float]], float]:
+class DynamicOmega:
     """
-    Create a dynamic omega adjustment function that adapts based on convergence rate.
-    
-    Returns:
-        A function that takes (iteration, residuals) and returns the next omega value
+    Dynamic omega adjustment that adapts to the convergence rate.
+
+    Called as ``omega(iteration, residuals)`` and returns the next omega
+    value.  Its state can be saved and restored with ``state_dict`` and
+    ``load_state_dict`` so checkpointed runs resume with the same ω.
     """
-    # Use lists to maintain state between calls
-    current_omega = [1.0]  # Current omega value
-    last_logged_iteration = [0]  # Track last logged iteration
-    last_rate = [1.0]  # Track last convergence rate
-    last_residual = [float('inf')]  # Track last residual
-    divergence_count = [0]  # Track number of divergences
-    best_omega = [1.0]  # Track best omega so far
-    best_residual = [float('inf')]  # Track best residual so far
-    
-    def dynamic_omega(iteration: int, residuals: List[float]) -> float:
+
+    def __init__(self):
+        self.current_omega = 1.0  # Current omega value
+        self.last_logged_iteration = 0  # Track last logged iteration
+        self.last_rate = 1.0  # Track last convergence rate
+        self.last_residual = float('inf')  # Track last residual
+        self.divergence_count = 0  # Track number of divergences
+        self.best_omega = 1.0  # Track best omega so far
+        self.best_residual = float('inf')  # Track best residual so far
+
+    def state_dict(self) -> Dict[str, float]:
+        return dict(vars(self))
+
+    def load_state_dict(self, state: Dict[str, float]) -> None:
+        for name in vars(self):
+            setattr(self, name, type(getattr(self, name))(state[name]))
+
+    def __call__(self, iteration: int, residuals: List[float]) -> float:
         if iteration < 2:
             if iteration == 1:  # Log only once at start
-                logger.debug(f"Starting with omega = {current_omega[0]:.3f}")
-            return current_omega[0]  # Start with standard Gauss-Seidel
+                logger.debug(f"Starting with omega = {self.current_omega:.3f}")
+            return self.current_omega  # Start with standard Gauss-Seidel
         
         # Calculate convergence rate
         rate = residuals[-2] / residuals[-1] if residuals[-1] > 0 else 1.0
-        old_omega = current_omega[0]
+        old_omega = self.current_omega
         
         # Update best omega if current residual is better
-        if residuals[-1] < best_residual[0]:
-            best_residual[0] = residuals[-1]
-            best_omega[0] = current_omega[0]
+        if residuals[-1] < self.best_residual:
+            self.best_residual = residuals[-1]
+            self.best_omega = self.current_omega
         
         # Check for divergence
-        if residuals[-1] > last_residual[0]:
+        if residuals[-1] > self.last_residual:
             # Divergence detected
-            divergence_count[0] += 1
+            self.divergence_count += 1
             
-            if divergence_count[0] >= 3:
+            if self.divergence_count >= 3:
                 # After 3 divergences, stick to best omega found
-                current_omega[0] = best_omega[0]
+                self.current_omega = self.best_omega
                 logger.warning(f"Iteration {iteration}: Multiple divergences detected, "
-                             f"switching to best omega = {best_omega[0]:.3f}")
+                             f"switching to best omega = {self.best_omega:.3f}")
             else:
                 # Reduce omega and try again
-                current_omega[0] = max(1.0, current_omega[0] - 0.1)
-                logger.warning(f"Iteration {iteration}: Divergence detected (residual increased from {last_residual[0]:.2e} to {residuals[-1]:.2e}), "
-                             f"reducing omega from {old_omega:.3f} to {current_omega[0]:.3f}")
+                self.current_omega = max(1.0, self.current_omega - 0.1)
+                logger.warning(f"Iteration {iteration}: Divergence detected (residual increased from {self.last_residual:.2e} to {residuals[-1]:.2e}), "
+                             f"reducing omega from {old_omega:.3f} to {self.current_omega:.3f}")
         else:
             # Normal adjustment based on convergence rate
             if rate < 1.2:  # Very slow convergence
-                current_omega[0] = min(1.3, current_omega[0] + 0.01)  # Very small increase
-                if current_omega[0] != old_omega:
+                self.current_omega = min(1.3, self.current_omega + 0.01)  # Very small increase
+                if self.current_omega != old_omega:
                     logger.debug(f"Iteration {iteration}: Very slow convergence (rate = {rate:.3f}), "
-                              f"increasing omega from {old_omega:.3f} to {current_omega[0]:.3f}")
+                              f"increasing omega from {old_omega:.3f} to {self.current_omega:.3f}")
             elif rate > 1.8:  # Fast convergence
-                current_omega[0] = max(1.0, current_omega[0] - 0.02)  # Small decrease
-                if current_omega[0] != old_omega:
+                self.current_omega = max(1.0, self.current_omega - 0.02)  # Small decrease
+                if self.current_omega != old_omega:
                     logger.debug(f"Iteration {iteration}: Fast convergence (rate = {rate:.3f}), "
-                              f"decreasing omega from {old_omega:.3f} to {current_omega[0]:.3f}")
-            elif rate < last_rate[0]:  # Convergence is slowing down
-                current_omega[0] = min(1.3, current_omega[0] + 0.005)  # Tiny increase
-                if current_omega[0] != old_omega:
-                    logger.debug(f"Iteration {iteration}: Convergence slowing (rate = {rate:.3f} < {last_rate[0]:.3f}), "
-                              f"increasing omega from {old_omega:.3f} to {current_omega[0]:.3f}")
+                              f"decreasing omega from {old_omega:.3f} to {self.current_omega:.3f}")
+            elif rate < self.last_rate:  # Convergence is slowing down
+                self.current_omega = min(1.3, self.current_omega + 0.005)  # Tiny increase
+                if self.current_omega != old_omega:
+                    logger.debug(f"Iteration {iteration}: Convergence slowing (rate = {rate:.3f} < {self.last_rate:.3f}), "
+                              f"increasing omega from {old_omega:.3f} to {self.current_omega:.3f}")
         
-        last_rate[0] = rate  # Update last rate
-        last_residual[0] = residuals[-1]  # Update last residual
+        self.last_rate = rate  # Update last rate
+        self.last_residual = residuals[-1]  # Update last residual
         
         # Log progress every 10 iterations
-        if iteration - last_logged_iteration[0] >= 10:
-            logger.debug(f"Iteration {iteration}: Current omega = {current_omega[0]:.3f}, "
+        if iteration - self.last_logged_iteration >= 10:
+            logger.debug(f"Iteration {iteration}: Current omega = {self.current_omega:.3f}, "
                       f"convergence rate = {rate:.3f}, residual = {residuals[-1]:.2e}")
-            last_logged_iteration[0] = iteration
+            self.last_logged_iteration = iteration
         
-        return current_omega[0]
+        return self.current_omega
+
+def create_dynamic_omega() -> Callable[[int, List[float]], float]:
+    """
+    Create a dynamic omega adjustment function that adapts based on convergence rate.
     
-    return dynamic_omega
+    Returns:
+        A ``DynamicOmega`` that takes (iteration, residuals) and returns the next omega value
+    """
+    return DynamicOmega()
 
 def pagerank(
     G: nx.DiGraph,
@@ -165,58 +188,99 @@ def pagerank(
     tol: float = 1e-6,
     max_iter: int = 100,
     omega: Union[float, Callable[[int, list[float]], float]] = 1.0,  # Can be float or function
+    tracer: Optional[Tracer] = None,
+    checkpoint: Optional[Checkpointer] = None,
+    x0: Optional[Dict] = None,
+    time_budget: Optional[float] = None,
+    stats: Optional[dict] = None,
 ) -> tuple[dict, list, float]:
-
+    """
+    ``x0`` is an optional {node: score} start vector.  ``time_budget``
+    (seconds) is checked every ``DEADLINE_CHECK`` nodes, so a long sweep
+    can stop part-way; the current iterate is returned.  ``stats`` receives
+    the certified ``error_bound`` of the result (one extra mat-vec) and
+    ``deadline_hit``.
+    """
     t0 = time.perf_counter()
+    deadline = Deadline(time_budget)
+    tracer = tracer or NULL_TRACER
     
     N = G.number_of_nodes()
     if N == 0:
         return {}, [], 0.0
 
-    nodes = list(G)
-    idx   = {n: i for i, n in enumerate(nodes)}
-    outdeg = np.fromiter((G.out_degree(n) for n in nodes), float, N)
-
-    # sparse column-stochastic matrix (same as power.py)
-    rows, cols, data = [], [], []
-    for u, v in G.edges():
-        if outdeg[idx[u]]:
-            rows.append(idx[v]); cols.append(idx[u])
-            data.append(1.0 / outdeg[idx[u]])
-    A = csr_matrix((data, (rows, cols)), shape=(N, N))
+    with tracer.phase("build_matrix"):
+        # sparse column-stochastic matrix (same as power.py)
+        nodes, A, dangling_mask = transition_matrix(G)
 
     v = np.full(N, 1.0 / N)
-    dangling = (outdeg == 0).astype(float)
+    dangling = dangling_mask.astype(float)
 
-    p = v.copy()                # initialize uniform
+    p = v.copy() if x0 is None else start_vector(x0, nodes)   # initialize uniform
     residual = []
     current_omega = omega if isinstance(omega, float) else 1.0  # Start with 1.0 if dynamic
+    first = 0
+
+    # A fixed omega is part of the run description; a callable one is restored from its state
+    state = (checkpoint.start(solver="gauss_seidel", nodes=N, edges=A.nnz, alpha=alpha,
+                              omega=None if callable(omega) else float(omega))
+             if checkpoint else None)
+    if state is not None:
+        p[:] = state["p"]
+        residual = state["residuals"].tolist()
+        current_omega = float(state["omega"])
+        if hasattr(omega, "load_state_dict"):
+            omega.load_state_dict({k[6:]: v for k, v in state.items() if k.startswith("omega.")})
+        first = int(state["iteration"])
+        t0 -= float(state["elapsed"])
 
-    for iteration in range(max_iter):
+    for iteration in range(first, max_iter):
         diff = 0.0
+        interrupted = False
         d_mass = p[dangling.astype(bool)].sum()   # mass from dangling nodes
         
         # Update omega if it's a function
         if callable(omega):
             current_omega = omega(iteration, residual)
         
-        for i in range(N):
-            rank_new = (1 - alpha) * v[i]
-            rank_new += alpha * d_mass * v[i]
-            # ∑_{j→i} α * p_j / outdeg_j
-            start, end = A.indptr[i], A.indptr[i + 1]
-            rank_new += alpha * A.data[start:end] @ p[A.indices[start:end]]
-
-            # apply SOR: xᵢ ← (1-ω)·xᵢ(old) + ω·rank_new
-            rank_new = (1 - current_omega) * p[i] + current_omega * rank_new
-            diff += abs(rank_new - p[i])
-            p[i] = rank_new
+        with tracer.phase("sweep"):
+            for i in range(N):
+                if time_budget is not None and i % DEADLINE_CHECK == 0 and deadline.expired():
+                    interrupted = True
+                    break
+                rank_new = (1 - alpha) * v[i]
+                rank_new += alpha * d_mass * v[i]
+                # ∑_{j→i} α * p_j / outdeg_j
+                start, end = A.indptr[i], A.indptr[i + 1]
+                rank_new += alpha * A.data[start:end] @ p[A.indices[start:end]]
 
+                # apply SOR: xᵢ ← (1-ω)·xᵢ(old) + ω·rank_new
+                rank_new = (1 - current_omega) * p[i] + current_omega * rank_new
+                diff += abs(rank_new - p[i])
+                p[i] = rank_new
+
+        if interrupted:
+            # A partial sweep's diff is no residual; don't record or test it
+            logger.warning(f"Time budget of {time_budget:.3f}s used up in sweep {iteration + 1}")
+            break
+        tracer.matvec()
         residual.append(diff)
+        tracer.iteration(diff)
         if diff < tol:
             break
+        if deadline.expired():
+            logger.warning(f"Time budget of {time_budget:.3f}s used up after sweep {iteration + 1}")
+            break
+        if checkpoint:
+            checkpoint.step(iteration + 1, lambda: dict(
+                p=p, residuals=residual, omega=current_omega, elapsed=time.perf_counter() - t0,
+                **{f"omega.{k}": v for k, v in getattr(omega, "state_dict", dict)().items()}))
 
     p /= p.sum()                 # normalize
+    if stats is not None:
+        bound = PageRankKernel(A, alpha, dangling=dangling_mask).certify(p)
+        tracer.annotate(error_bound=bound)
+        stats.update(error_bound=bound, deadline_hit=deadline.hit)
     
     elapsed = time.perf_counter() - t0
-    return {n: p[idx[n]] for n in nodes}, residual, elapsed 
\ No newline at end of file
+    return dict(zip(nodes, p)), residual, elapsed 
\ No newline at end of file
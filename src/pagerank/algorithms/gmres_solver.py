@@ -3,29 +3,33 @@ GMRES PageRank solver with preconditioner options.
 """
 from __future__ import annotations
 import networkx as nx, numpy as np, time
-from scipy.sparse import csr_matrix
+from scipy.sparse import csr_matrix, eye
 from scipy.sparse.linalg import LinearOperator, gmres, spilu
+from ..checkpoint import Checkpointer
+from ..deadline import Deadline
 from ..logging_utils import get_logger
+from ..tracing import NULL_TRACER, Tracer
+from ..transition import transition_matrix
+from .kernel import PageRankKernel, start_vector
+from typing import Optional, Union
 logger = get_logger(__name__)
 
-def _build_linear_operator(G, alpha: float):
+def _build_linear_operator(G, alpha: float, tracer=NULL_TRACER):
     """Returns (LinearOperator A, vector b, danglings_mask)"""
-    N = G.number_of_nodes()
-    nodes = list(G)
-    idx = {n:i for i,n in enumerate(nodes)}
-    outdeg = np.fromiter((G.out_degree(n) for n in nodes), float, N)
-    rows, cols, data = [], [], []
-    for u,v in G.edges():
-        j = idx[u]; i = idx[v]
-        if outdeg[j]:
-            rows.append(i); cols.append(j); data.append(alpha/outdeg[j])
-    P = csr_matrix((data,(rows,cols)), shape=(N,N))
+    nodes, P, dangling = transition_matrix(G)
+    N = len(nodes)
+    P.data *= alpha
     # A = I - alpha*P,   b = (1-alpha)*v
+    # GMRES consumes each product before the next call, so one output buffer is reused
+    kernel = PageRankKernel(P, alpha, dangling=dangling, scaled=True)
+    out = np.empty(N)
     def matvec(x):            # A·x
-        return x - P @ x
+        tracer.matvec()
+        with tracer.phase("spmv"):
+            return kernel.matvec(np.ravel(x), out)
     A = LinearOperator((N,N), matvec=matvec, dtype=float)
     b = np.full(N, (1-alpha)/N)
-    return A, b, outdeg==0, nodes, P
+    return A, b, dangling, nodes, P
 
 def _make_preconditioner(A_csr: csr_matrix, kind:str):
     """Returns LinearOperator M^{-1} or None"""
@@ -38,8 +42,25 @@ def _make_preconditioner(A_csr: csr_matrix, kind:str):
         logger.debug("Building ILU preconditioner...")
         ilu = spilu(A_csr.tocsc(), drop_tol=1e-4, fill_factor=10)
         return LinearOperator(A_csr.shape, matvec=ilu.solve)
+    if kind == "amg":
+        from .amg import AMGHierarchy
+        logger.debug("Building AMG preconditioner...")
+        amg = AMGHierarchy(A_csr)
+        logger.debug(f"AMG: {len(amg.levels) + 1} levels, "
+                     f"operator complexity {amg.operator_complexity:.2f}")
+        return amg.aslinearoperator()
     raise ValueError(f"Unknown preconditioner {kind}")
 
+def build_preconditioner(G: nx.DiGraph, alpha: float = 0.85, kind: str = "amg"):
+    """
+    Build a preconditioner for G once so it can be reused across solves.
+
+    Pass the result as ``preconditioner=`` to ``pagerank`` (same G and alpha).
+    Returns a LinearOperator, or None for kind="none".
+    """
+    _, _, _, nodes, P = _build_linear_operator(G, alpha)
+    return _make_preconditioner(eye(len(nodes), format="csr") - P, kind)
+
 def pagerank(
     G: nx.DiGraph,
     *,
@@ -47,7 +68,12 @@ def pagerank(
     tol: float = 1e-6,
     max_iter: int = 100,
     restart: int = 30,
-    preconditioner: str = "ilu",
+    preconditioner: Union[str, LinearOperator] = "ilu",
+    tracer: Optional[Tracer] = None,
+    checkpoint: Optional[Checkpointer] = None,
+    x0: Optional[dict] = None,
+    time_budget: Optional[float] = None,
+    stats: Optional[dict] = None,
 ) -> tuple[dict, list, float]:
     """
     GMRES PageRank solver.
@@ -58,7 +84,16 @@ def pagerank(
         tol: Convergence threshold
         max_iter: Maximum number of iterations
         restart: Number of iterations before restart
-        preconditioner: Type of preconditioner ("ilu", "jacobi", "none")
+        preconditioner: Type of preconditioner ("ilu", "jacobi", "amg", "none"),
+            or a LinearOperator from ``build_preconditioner`` to reuse its setup
+        tracer: Optional tracer recording phase timings and residuals
+        checkpoint: Optional checkpointer; GMRES then runs one restart cycle
+            at a time and saves the restart vector between cycles
+        x0: Optional start vector {node: score}
+        time_budget: Seconds after which the current restart vector is
+            returned; checked between restart cycles
+        stats: If given, filled with the certified ``error_bound`` of the
+            result (one extra mat-vec) and ``deadline_hit``
         
     Returns:
         Tuple containing:
@@ -67,24 +102,32 @@ def pagerank(
         - float: Execution time
     """
     t0 = time.perf_counter()
+    deadline = Deadline(time_budget)
+    tracer = tracer or NULL_TRACER
     
     if G.number_of_nodes() == 0:
         return {}, [], 0.0
 
-    logger.info(f"Starting GMRES solver with {preconditioner} preconditioner")
+    reuse = isinstance(preconditioner, LinearOperator)
+    logger.info(f"Starting GMRES solver with "
+                f"{'prebuilt' if reuse else preconditioner} preconditioner")
     logger.debug(f"Parameters: alpha={alpha}, tol={tol}, max_iter={max_iter}, restart={restart}")
 
     # Build LinearOperator
-    A_op, b, dangling_mask, nodes, P = _build_linear_operator(G, alpha)
+    with tracer.phase("build_matrix"):
+        A_op, b, dangling_mask, nodes, P = _build_linear_operator(G, alpha, tracer)
 
-    # Build CSR matrix for preconditioner
-    N = len(nodes)
-    I = csr_matrix(np.eye(N))
-    A_csr = I - alpha * P
+        # Build CSR matrix for preconditioner (P already includes alpha)
+        N = len(nodes)
+        I = eye(N, format="csr")
+        A_csr = I - P
 
     M = None
-    if preconditioner != "none":
-        M = _make_preconditioner(A_csr, preconditioner)
+    if reuse:
+        M = preconditioner
+    elif preconditioner != "none":
+        with tracer.phase("preconditioner"):
+            M = _make_preconditioner(A_csr, preconditioner)
 
     res_history = []
     def callback(residual):
@@ -93,10 +136,41 @@ def pagerank(
             res_history.append(float(residual))
         else:
             res_history.append(float(np.linalg.norm(residual)))
+        tracer.iteration(res_history[-1])
 
-    x, info = gmres(A_op, b, rtol=tol, restart=restart,
-                    maxiter=max_iter, M=M, callback=callback,
-                    callback_type='pr_norm')
+    x = start_vector(x0, nodes)
+    if checkpoint is None and time_budget is None:
+        with tracer.phase("solve"):
+            x, info = gmres(A_op, b, x0=x, rtol=tol, restart=restart,
+                            maxiter=max_iter, M=M, callback=callback,
+                            callback_type='pr_norm')
+    else:
+        # One restart cycle per call: x is the restart vector between cycles
+        x, first = (np.zeros(N) if x is None else x), 0
+        state = (checkpoint.start(solver="gmres_solver", nodes=N, edges=P.nnz, alpha=alpha,
+                                  restart=restart,
+                                  preconditioner="prebuilt" if reuse else preconditioner)
+                 if checkpoint else None)
+        if state is not None:
+            x = state["x"].copy()
+            res_history.extend(state["residuals"].tolist())
+            first = int(state["iteration"])
+            t0 -= float(state["elapsed"])
+        info = max_iter
+        for cycle in range(first, max_iter):
+            with tracer.phase("solve"):
+                x, info = gmres(A_op, b, x0=x, rtol=tol, restart=restart,
+                                maxiter=1, M=M, callback=callback,
+                                callback_type='pr_norm')
+            if info == 0:
+                break
+            if deadline.expired():
+                logger.warning(f"Time budget of {time_budget:.3f}s used up after {cycle + 1} "
+                               f"restart cycles")
+                break
+            if checkpoint:
+                checkpoint.step(cycle + 1, lambda: dict(x=x, residuals=res_history,
+                                                        elapsed=time.perf_counter() - t0))
     if info != 0:
         logger.warning("GMRES did not converge (info=%s)", info)
     else:
@@ -104,6 +178,10 @@ def pagerank(
 
     x = np.maximum(x, 0)
     x /= x.sum()
+    if stats is not None:
+        bound = PageRankKernel(P, alpha, dangling=dangling_mask, scaled=True).certify(x)
+        tracer.annotate(error_bound=bound)
+        stats.update(error_bound=bound, deadline_hit=deadline.hit)
     
     elapsed = time.perf_counter() - t0
     logger.info(f"GMRES completed in {elapsed:.2f}s with {len(res_history)} iterations")
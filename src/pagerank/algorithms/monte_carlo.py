@@ -0,0 +1,316 @@
+"""
+Monte Carlo (random-walk) PageRank estimator.
+
+Complete-path estimator of Avrachenkov et al.: from every node start a
+number of random walks; at each step a walk stops with probability 1-α,
+otherwise it moves to a uniformly chosen out-neighbour (or, from a dangling
+node, to a uniformly chosen node).  The PageRank of j is estimated by the
+fraction of all visited positions that are j.
+
+• Walks advance in lock-step as NumPy arrays over the CSR arrays, one
+  vectorised step for all live walkers at a time
+• Walks are dealt round-robin to ``batches`` groups whose independent
+  estimates give per-node standard errors (batch means), and from those an
+  L1 error estimate
+• ``refine`` adds more walks to the same counts, so the estimate tightens
+  incrementally
+• With ``workers > 1`` the walks of each refinement are split across
+  processes, each with its own ``SeedSequence`` child stream
+"""
+
+from __future__ import annotations
+import time
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+from typing import Dict, List, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+
+from ..graph_io import adjacency_csr
+from ..checkpoint import Checkpointer
+from ..deadline import Deadline
+from ..logging_utils import get_logger
+from ..tracing import NULL_TRACER, Tracer
+from ..transition import graph_policy
+
+logger = get_logger(__name__)
+
+# Graph arrays of a worker process, set once by _init_worker
+_WORKER_GRAPH: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+
+def _init_worker(indptr: np.ndarray, indices: np.ndarray) -> None:
+    global _WORKER_GRAPH
+    _WORKER_GRAPH = (indptr, indices)
+
+
+def _walk_counts(
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    alpha: float,
+    batches: int,
+    first_sweep: int,
+    n_sweeps: int,
+    seed: np.random.SeedSequence,
+    max_walkers: int,
+) -> np.ndarray:
+    """
+    Run ``n_sweeps`` sweeps (one walk from every node each) and count visits.
+
+    Sweep s is assigned to batch ``s % batches``.
+
+    Returns:
+        (batches, N) int64 visit counts
+    """
+    N = len(indptr) - 1
+    nnz = len(indices)
+    rng = np.random.default_rng(seed)
+    out_deg = np.diff(indptr)
+    key_dtype = np.int32 if batches * N < 2**31 else np.int64
+    counts = np.zeros(batches * N, dtype=np.int64)
+
+    total = n_sweeps * N
+    for lo in range(0, total, max_walkers):
+        walker = np.arange(lo, min(lo + max_walkers, total), dtype=np.int64)
+        pos = walker % N
+        key_base = ((walker // N + first_sweep) % batches) * N
+        visits = []
+        while len(pos):
+            visits.append((key_base + pos).astype(key_dtype, copy=False))
+            alive = rng.random(len(pos)) < alpha
+            pos, key_base = pos[alive], key_base[alive]
+            if not len(pos):
+                break
+            deg = out_deg[pos]
+            edge = indptr[pos] + (rng.random(len(pos)) * deg).astype(np.int64)
+            nxt = indices[np.minimum(edge, nnz - 1)] if nnz else np.zeros_like(pos)
+            dangling = deg == 0
+            if dangling.any():
+                nxt[dangling] = rng.integers(0, N, int(dangling.sum()))
+            pos = nxt.astype(np.int64, copy=False)
+        counts += np.bincount(np.concatenate(visits), minlength=batches * N)
+    return counts.reshape(batches, N)
+
+
+def _worker_walk_counts(alpha, batches, first_sweep, n_sweeps, seed, max_walkers) -> np.ndarray:
+    indptr, indices = _WORKER_GRAPH
+    return _walk_counts(indptr, indices, alpha, batches, first_sweep, n_sweeps, seed, max_walkers)
+
+
+class MonteCarloEstimator:
+    """
+    Incrementally refined Monte Carlo PageRank estimate.
+
+    Args:
+        indptr, indices: CSR out-adjacency (row u lists the targets of u)
+        alpha: Damping factor
+        seed: Seed of the root ``SeedSequence``; every refinement (and every
+            worker within it) draws a fresh independent child stream
+        batches: Number of batch-mean groups for the error estimate
+        workers: Processes used by ``refine`` (1 = in-process)
+        max_walkers: Walkers advanced together; bounds the working memory
+
+    Use as a context manager (or call ``close``) when ``workers > 1`` so the
+    process pool is shut down.
+    """
+
+    def __init__(
+        self,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        alpha: float = 0.85,
+        *,
+        seed: Optional[int] = None,
+        batches: int = 8,
+        workers: int = 1,
+        max_walkers: int = 1 << 20,
+    ):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.alpha = alpha
+        self.batches = max(2, batches)
+        self.workers = max(1, workers)
+        self.max_walkers = max_walkers
+        self.n = len(self.indptr) - 1
+        self.sweeps = 0  # walks started per node so far
+        self.counts = np.zeros((self.batches, self.n), dtype=np.int64)
+        self._seed = np.random.SeedSequence(seed)
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> "MonteCarloEstimator":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def refine(self, walks_per_node: int) -> None:
+        """Run ``walks_per_node`` more walks from every node."""
+        if walks_per_node <= 0 or self.n == 0:
+            return
+        workers = min(self.workers, walks_per_node)
+        share = [walks_per_node // workers + (i < walks_per_node % workers) for i in range(workers)]
+        starts = self.sweeps + np.concatenate([[0], np.cumsum(share)[:-1]])
+        seeds = self._seed.spawn(workers)
+        args = [(self.alpha, self.batches, int(s), n, seq, self.max_walkers)
+                for s, n, seq in zip(starts, share, seeds)]
+
+        if workers == 1:
+            self.counts += _walk_counts(self.indptr, self.indices, *args[0])
+        else:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                                 initargs=(self.indptr, self.indices))
+            for counts in self._pool.map(_worker_walk_counts, *zip(*args)):
+                self.counts += counts
+        self.sweeps += walks_per_node
+
+    def state_dict(self) -> Dict[str, np.ndarray]:
+        """Visit counts and RNG position, enough to continue bit for bit."""
+        return dict(counts=self.counts, sweeps=self.sweeps,
+                    entropy=str(self._seed.entropy),
+                    spawned=self._seed.n_children_spawned)
+
+    def load_state_dict(self, state: Dict[str, np.ndarray]) -> None:
+        self.counts[:] = state["counts"]
+        self.sweeps = int(state["sweeps"])
+        self._seed = np.random.SeedSequence(int(str(state["entropy"])),
+                                            n_children_spawned=int(state["spawned"]))
+
+    def scores(self) -> np.ndarray:
+        """Current PageRank estimate (sums to 1)."""
+        visits = self.counts.sum(axis=0)
+        total = visits.sum()
+        return visits / total if total else np.full(self.n, 1.0 / max(self.n, 1))
+
+    def stderr(self) -> np.ndarray:
+        """Per-node standard error of ``scores`` from the batch means."""
+        totals = self.counts.sum(axis=1)
+        used = totals > 0
+        if used.sum() < 2:
+            return np.full(self.n, np.inf)
+        estimates = self.counts[used] / totals[used, None]
+        return estimates.std(axis=0, ddof=1) / np.sqrt(used.sum())
+
+    def error_bound(self, confidence: float = 0.95) -> float:
+        """
+        Estimated L1 error of ``scores``: the sum of the per-node
+        ``confidence`` half-widths (normal approximation).
+        """
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        return float(z * self.stderr().sum())
+
+
+def pagerank(
+    G: nx.DiGraph,
+    *,
+    alpha: float = 0.85,
+    tol: float = 1e-6,
+    max_iter: int = 100,
+    walks_per_node: int = 10,
+    workers: int = 1,
+    seed: Optional[int] = None,
+    confidence: float = 0.95,
+    stats: Optional[dict] = None,
+    tracer: Optional[Tracer] = None,
+    checkpoint: Optional[Checkpointer] = None,
+    time_budget: Optional[float] = None,
+) -> Tuple[Dict[int, float], List[float], float]:
+    """
+    Monte Carlo PageRank by random walks.
+
+    Each iteration adds ``walks_per_node`` walks from every node; the run
+    stops once the estimated L1 error is below ``tol`` or after
+    ``max_iter`` refinements.
+
+    Args:
+        G: Input directed graph
+        alpha: Damping factor
+        tol: Target estimated L1 error
+        max_iter: Maximum number of refinements
+        walks_per_node: Walks started from every node per refinement
+        workers: Worker processes (independent RNG streams)
+        seed: Random seed for reproducible estimates
+        confidence: Confidence level of the error estimate
+        stats: If given, filled with ``walks_per_node`` (total), the final
+            ``error_bound`` and ``max_stderr``, and ``deadline_hit``.  The
+            bound is statistical (at ``confidence``), not certified
+        tracer: Optional tracer recording phase timings and residuals
+        checkpoint: Optional checkpointer saving the visit counts and RNG
+            position between refinements
+        time_budget: Seconds after which no further refinement is started
+
+    Returns:
+        Tuple of (scores, residuals, elapsed) where residuals[i] is the L1
+        change of the estimate in refinement i
+    """
+    t0 = time.perf_counter()
+    deadline = Deadline(time_budget)
+    tracer = tracer or NULL_TRACER
+
+    if G.number_of_nodes() == 0:
+        return {}, [], 0.0
+
+    logger.info(f"Starting Monte Carlo solver with {walks_per_node} walks/node per round, "
+                f"{workers} worker(s)")
+    logger.debug(f"Parameters: alpha={alpha}, tol={tol}, max_iter={max_iter}, seed={seed}")
+
+    if not graph_policy(G).plain:
+        logger.warning("Monte Carlo walks follow the unweighted adjacency; "
+                       "the graph's edge weights and transition policy are ignored")
+    with tracer.phase("build_matrix"):
+        nodes, indptr, indices = adjacency_csr(G)
+
+    residuals = []
+    bound = float("inf")
+    first = 0
+    with MonteCarloEstimator(indptr, indices, alpha, seed=seed, workers=workers) as est:
+        state = (checkpoint.start(solver="monte_carlo", nodes=len(nodes), edges=len(indices),
+                                  alpha=alpha, walks_per_node=walks_per_node, workers=workers,
+                                  seed=seed) if checkpoint else None)
+        if state is not None:
+            est.load_state_dict(state)
+            residuals = state["residuals"].tolist()
+            first = int(state["iteration"])
+            t0 -= float(state["elapsed"])
+        x = est.scores()
+        for i in range(first, max_iter):
+            with tracer.phase("walks"):
+                est.refine(walks_per_node)
+            with tracer.phase("estimate"):
+                x_new = est.scores()
+                res = float(np.abs(x_new - x).sum())
+                bound = est.error_bound(confidence)
+            residuals.append(res)
+            tracer.iteration(res)
+            x = x_new
+            logger.debug(f"Round {i + 1}: {est.sweeps} walks/node, change = {res:.2e}, "
+                         f"error bound = {bound:.2e}")
+            if bound < tol:
+                logger.info(f"Error bound {bound:.2e} reached after {est.sweeps} walks/node")
+                break
+            if deadline.expired():
+                logger.warning(f"Time budget of {time_budget:.3f}s used up after {est.sweeps} "
+                               f"walks/node, error bound {bound:.2e}")
+                break
+            if checkpoint:
+                checkpoint.step(i + 1, lambda: dict(residuals=residuals, elapsed=time.perf_counter() - t0,
+                                                    **est.state_dict()))
+        else:
+            logger.info(f"Stopped after {est.sweeps} walks/node, error bound {bound:.2e}")
+        max_stderr = float(est.stderr().max())
+        sweeps = est.sweeps
+
+    tracer.annotate(walks_per_node=sweeps, error_bound=bound)
+    if stats is not None:
+        stats.update(walks_per_node=sweeps, error_bound=bound, max_stderr=max_stderr,
+                     deadline_hit=deadline.hit)
+
+    elapsed = time.perf_counter() - t0
+    logger.info(f"Monte Carlo completed in {elapsed:.2f}s")
+    return dict(zip(nodes, x)), residuals, elapsed
@@ -1,9 +1,14 @@
 import networkx as nx
 import numpy as np
 import time
-from scipy.sparse import csr_matrix
+from ..checkpoint import Checkpointer
+from ..compressed import CompressedKernel, compressed_adjacency
+from ..deadline import Deadline, error_bound
 from ..logging_utils import get_logger
-from typing import Dict, List, Tuple
+from ..tracing import NULL_TRACER, Tracer
+from ..transition import transition_matrix
+from .kernel import PageRankKernel, start_vector
+from typing import Dict, List, Optional, Tuple
 
 logger = get_logger(__name__)
 
@@ -13,11 +18,32 @@ def pagerank(
     alpha: float = 0.85,
     tol: float = 1e-6,
     max_iter: int = 100,
+    tracer: Optional[Tracer] = None,
+    checkpoint: Optional[Checkpointer] = None,
+    x0: Optional[Dict] = None,
+    time_budget: Optional[float] = None,
+    stats: Optional[dict] = None,
+    compressed: bool = False,
 ) -> Tuple[Dict[int, float], List[float], float]:
     """
     Power iteration PageRank solver.
+
+    Dangling nodes redistribute their mass uniformly (see
+    ``transition.TransitionPolicy`` for the other choices); each step is one
+    fused ``PageRankKernel`` update into a preallocated buffer.  With a
+    ``checkpoint`` the iterate and residuals are saved periodically and a
+    saved run is resumed.
+
+    ``x0`` is an optional {node: score} start vector.  ``time_budget``
+    (seconds) stops the iteration early; the L1 residual never increases,
+    so the last iterate is the best one.  ``stats`` receives the certified
+    ``error_bound`` of the result and whether the deadline was hit.
+    With ``compressed`` every mat-vec decodes the gap/varint-coded
+    adjacency (see ``pagerank.compressed``) instead of reading a CSR matrix.
     """
     t0 = time.perf_counter()
+    deadline = Deadline(time_budget)
+    tracer = tracer or NULL_TRACER
     
     if G.number_of_nodes() == 0:
         return {}, [], 0.0
@@ -26,43 +52,63 @@ def pagerank(
     logger.debug(f"Parameters: alpha={alpha}, tol={tol}, max_iter={max_iter}")
 
     # Build transition matrix P
-    n = G.number_of_nodes()
-    idx = {u: i for i, u in enumerate(G.nodes())}
-    rows, cols, data = [], [], []
-    for u, v in G.edges():
-        j, i = idx[u], idx[v]
-        rows.append(i)
-        cols.append(j)
-        data.append(1.0 / G.out_degree(u))
-    P = csr_matrix((data, (rows, cols)), shape=(n, n))
+    with tracer.phase("build_matrix"):
+        if compressed:
+            adjacency = compressed_adjacency(G)
+            n, nodes, edges = adjacency.n, adjacency.nodes.tolist(), adjacency.nnz
+            kernel = CompressedKernel(adjacency, alpha)
+        else:
+            nodes, P, dangling = transition_matrix(G)
+            n, edges = len(nodes), P.nnz
+            kernel = PageRankKernel(P, alpha, dangling=dangling)
 
-    # Initialize
-    x = np.ones(n) / n
+    # Double buffers: y receives the update of x, then the two are swapped
+    x, y = kernel.buffers(start_vector(x0, nodes))
     res_history = []
-    last_res = float('inf')
+    first = 0
+
+    state = checkpoint.start(solver="power", nodes=n, edges=edges, alpha=alpha) if checkpoint else None
+    if state is not None:
+        x[:] = state["x"]
+        res_history = state["residuals"].tolist()
+        first = int(state["iteration"])
+        t0 -= float(state["elapsed"])
 
     # Power iteration
-    for i in range(max_iter):
-        x_new = alpha * (P @ x) + (1 - alpha) / n
-        res = np.linalg.norm(x_new - x, ord=1)
+    for i in range(first, max_iter):
+        with tracer.phase("spmv"):
+            kernel.apply(x, y)
+        tracer.matvec()
+        with tracer.phase("residual"):
+            res = kernel.residual(x, y)
         res_history.append(res)
-        
+        tracer.iteration(res)
+        x, y = y, x
+
         if i % 10 == 0:
             logger.debug(f"Iteration {i}: residual = {res:.2e}")
-            
+
         if res < tol:
             logger.info(f"Converged after {i+1} iterations")
             break
-            
-        x = x_new
-        last_res = res
+        if deadline.expired():
+            logger.warning(f"Time budget of {time_budget:.3f}s used up after {i+1} iterations "
+                           f"(residual {res:.2e})")
+            break
+        if checkpoint:
+            checkpoint.step(i + 1, lambda: dict(x=x, residuals=res_history,
+                                                elapsed=time.perf_counter() - t0))
     else:
         logger.warning(f"Did not converge after {max_iter} iterations")
 
     # Normalize
     x = np.maximum(x, 0)
     x /= x.sum()
+    bound = error_bound(res_history[-1], alpha, stepped=True) if res_history else kernel.certify(x)
+    tracer.annotate(error_bound=bound)
+    if stats is not None:
+        stats.update(error_bound=bound, deadline_hit=deadline.hit)
     
     elapsed = time.perf_counter() - t0
     logger.info(f"Power Iteration completed in {elapsed:.2f}s")
-    return dict(zip(G.nodes(), x)), res_history, elapsed 
\ No newline at end of file
+    return dict(zip(nodes, x)), res_history, elapsed 
\ No newline at end of file
@@ -0,0 +1,267 @@
+"""
+Power–Arnoldi hybrid with thick restarts (after Wu & Wei 2007) for high
+damping factors.
+
+Power iteration reduces the error by |λ₂| ≈ α per mat-vec.  A few Arnoldi
+steps can remove the slowest error components at once, but restarted
+Arnoldi on its own wastes much of its work orthogonalising.  The hybrid
+alternates between the two:
+
+• Arnoldi cycle: extend the subspace spanned by the current iterate (plus
+  ``keep`` vectors carried over from the last cycle) by ``m`` Krylov
+  vectors of the Google matrix G, then take the refined approximation.
+  That is the unit vector x of the subspace W that minimises ‖(G − I)·x‖₂,
+  read off the smallest singular vector of the small factor R of
+  (G·W − W) = Q·R.
+• Power phase: at least ``power_steps`` power iterations from there.  They
+  continue while the residual still falls faster than ``switch_ratio`` per
+  step.  When convergence slows down to the rate of the slowest mode left,
+  the solver switches back to an Arnoldi cycle.
+
+Thick restart: the Ritz vectors of the next ``keep`` eigenvalues after the
+dominant one (real and imaginary parts for complex pairs) are carried into
+the next cycle.  Their images under G are linear combinations of the
+stored G·W, so they cost no mat-vecs.  Keeping them holds the subdominant
+eigenvectors in the subspace, which is what makes the hybrid converge at α
+close to 1.
+
+The residual history has one entry per power step and one per Arnoldi
+cycle (the residual of the refined vector).  ``stats['matvecs']`` counts
+all mat-vecs.
+"""
+
+from __future__ import annotations
+import time
+from typing import Dict, List, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+
+from ..checkpoint import Checkpointer
+from ..compressed import CompressedKernel, compressed_adjacency
+from ..deadline import Deadline, error_bound
+from ..logging_utils import get_logger
+from ..tracing import NULL_TRACER, Tracer
+from ..transition import transition_matrix
+from .kernel import PageRankKernel, start_vector
+
+logger = get_logger(__name__)
+
+
+def _orthogonalize(W: np.ndarray, AW: np.ndarray, n: int, u: np.ndarray,
+                   Au: Optional[np.ndarray] = None) -> bool:
+    """
+    Orthonormalise ``u`` against rows ``:n`` of ``W`` (classical Gram–Schmidt,
+    twice) into row ``n``, applying the same combination to its image ``Au``
+    into ``AW[n]``.
+
+    Returns False if ``u`` lies (numerically) in the span of the rows.
+    """
+    norm0 = np.linalg.norm(u)
+    if norm0 == 0.0:
+        return False
+    w = W[n]
+    w[:] = u
+    if Au is not None:
+        AW[n] = Au
+    for _ in range(2):
+        h = W[:n] @ w
+        w -= h @ W[:n]
+        if Au is not None:
+            AW[n] -= h @ AW[:n]
+    norm = np.linalg.norm(w)
+    if norm < 1e-10 * norm0:
+        return False
+    w /= norm
+    if Au is not None:
+        AW[n] /= norm
+    return True
+
+
+def _restart_vectors(W: np.ndarray, AW: np.ndarray, keep: int) -> np.ndarray:
+    """
+    Coefficients (rows) of the real Ritz basis of the ``keep`` eigenvalues
+    following the dominant one, from the Rayleigh quotient H = W·(G·W)ᵀ.
+    """
+    H = W @ AW.T
+    vals, vecs = np.linalg.eig(H)
+    order = np.argsort(-np.abs(vals))[1:]
+    rows = []
+    for j in order:
+        if len(rows) >= keep:
+            break
+        if vals[j].imag > 1e-12:
+            rows += [vecs[:, j].real, vecs[:, j].imag]
+        elif vals[j].imag >= -1e-12:
+            rows.append(vecs[:, j].real)
+    return np.array(rows[:keep]).reshape(-1, len(W))
+
+
+def pagerank(
+    G: nx.DiGraph,
+    *,
+    alpha: float = 0.85,
+    tol: float = 1e-6,
+    max_iter: int = 100,
+    m: int = 8,
+    keep: int = 2,
+    power_steps: int = 6,
+    switch_ratio: Optional[float] = None,
+    x0: Optional[Dict] = None,
+    compressed: bool = False,
+    time_budget: Optional[float] = None,
+    stats: Optional[dict] = None,
+    checkpoint: Optional[Checkpointer] = None,
+    tracer: Optional[Tracer] = None,
+) -> Tuple[Dict[int, float], List[float], float]:
+    """
+    Power–Arnoldi PageRank solver.
+
+    Args:
+        G: Input graph
+        alpha: Damping factor
+        tol: Convergence threshold (L1 residual)
+        max_iter: Maximum number of mat-vecs over both phases
+        m: Krylov vectors added per Arnoldi cycle (mat-vecs per cycle)
+        keep: Ritz vectors kept across thick restarts
+        power_steps: Minimum power iterations between Arnoldi cycles
+        switch_ratio: Switch back to Arnoldi once the residual falls by less
+            than this factor per power step (default: α − 0.1)
+        x0: Optional start vector {node: score}
+        compressed: Multiply with the gap/varint-coded adjacency, decoded
+            on the fly (see ``pagerank.compressed``), instead of CSR
+        time_budget: Seconds available; the best iterate is returned when
+            they run out
+        stats: If given, filled with ``error_bound`` (certified),
+            ``deadline_hit``, ``matvecs`` and ``cycles``
+        checkpoint: Optional checkpointer, saved before every Arnoldi cycle
+        tracer: Optional tracer recording phase timings and residuals
+
+    Returns:
+        Tuple of (scores, residuals, elapsed)
+    """
+    t0 = time.perf_counter()
+    deadline = Deadline(time_budget)
+    tracer = tracer or NULL_TRACER
+
+    if G.number_of_nodes() == 0:
+        return {}, [], 0.0
+    if m < 1 or keep < 0:
+        raise ValueError(f"Need m >= 1 and keep >= 0, got m={m}, keep={keep}")
+    if switch_ratio is None:
+        switch_ratio = alpha - 0.1
+
+    logger.info(f"Starting Power-Arnoldi solver (m={m}, keep={keep}, {power_steps} power steps)")
+    # G is linear, so kernel.apply also maps the signed basis vectors
+    with tracer.phase("build_matrix"):
+        if compressed:
+            adjacency = compressed_adjacency(G)
+            nodes, edges = adjacency.nodes.tolist(), adjacency.nnz
+            kernel = CompressedKernel(adjacency, alpha)
+        else:
+            nodes, P, dangling = transition_matrix(G)
+            edges = P.nnz
+            kernel = PageRankKernel(P, alpha, dangling=dangling)
+        N = len(nodes)
+
+    x, y = kernel.buffers(start_vector(x0, nodes))
+    # Basis of the cycle's subspace and its image under G, one vector per row
+    W = np.empty((keep + m, N))
+    AW = np.empty((keep + m, N))
+    U = np.empty((0, N))
+    AU = np.empty((0, N))
+    residuals: List[float] = []
+    matvecs = 0
+    cycle = 0
+
+    state = (checkpoint.start(solver="power_arnoldi", nodes=N, edges=edges, alpha=alpha,
+                              m=m, keep=keep, power_steps=power_steps, switch_ratio=switch_ratio)
+             if checkpoint else None)
+    if state is not None:
+        x[:] = state["x"]
+        U, AU = state["U"], state["AU"]
+        residuals = state["residuals"].tolist()
+        matvecs = int(state["matvecs"])
+        cycle = int(state["iteration"])
+        t0 -= float(state["elapsed"])
+
+    done = False
+    res = float("inf")
+    while not done:
+        if checkpoint and cycle:
+            checkpoint.step(cycle, lambda: dict(x=x, U=U, AU=AU, residuals=residuals,
+                                                matvecs=matvecs, elapsed=time.perf_counter() - t0))
+        cycle += 1
+
+        # Arnoldi cycle on span{U, x, G·x, G²·x, ...}
+        with tracer.phase("arnoldi"):
+            n = 0
+            for u, Au in zip(U, AU):
+                n += _orthogonalize(W, AW, n, u, Au)
+            steps = min(m, max_iter - matvecs) if _orthogonalize(W, AW, n, x) else 0
+            for j in range(steps):
+                with tracer.phase("spmv"):
+                    kernel.apply(W[n], AW[n])
+                tracer.matvec()
+                matvecs += 1
+                n += 1
+                if j < steps - 1 and not _orthogonalize(W, AW, n, AW[n - 1]):
+                    break  # invariant subspace found
+            Wn, AWn = W[:n], AW[:n]
+
+            # Refined vector: argmin ‖(G − I)·Wᵀ·c‖₂ over unit c
+            R = np.linalg.qr((AWn - Wn).T, mode="r")
+            c = np.linalg.svd(R)[2][-1]
+            x = c @ Wn
+            y = c @ AWn
+            s = x.sum()
+            x /= s
+            y /= s
+            Y = _restart_vectors(Wn, AWn, keep)
+            U, AU = Y @ Wn, Y @ AWn
+
+        with tracer.phase("residual"):
+            res = kernel.residual(x, y)
+        residuals.append(res)
+        tracer.iteration(res)
+        logger.debug(f"Arnoldi cycle {cycle}: refined residual = {res:.2e} after {matvecs} mat-vecs")
+        # Continue from G(x), which the cycle already computed
+        x, y = y, x
+
+        # Power phase while it converges faster than switch_ratio
+        steps, prev = 0, res
+        while True:
+            if res < tol or matvecs >= max_iter or deadline.expired():
+                done = True
+                break
+            if steps >= power_steps and res > switch_ratio * prev:
+                break
+            with tracer.phase("spmv"):
+                kernel.apply(x, y)
+            tracer.matvec()
+            matvecs += 1
+            with tracer.phase("residual"):
+                prev, res = res, kernel.residual(x, y)
+            residuals.append(res)
+            tracer.iteration(res)
+            x, y = y, x
+            steps += 1
+
+    if res < tol:
+        logger.info(f"Converged after {matvecs} mat-vecs ({cycle} Arnoldi cycles)")
+    elif deadline.hit:
+        logger.warning(f"Time budget of {time_budget:.3f}s used up after {matvecs} mat-vecs "
+                       f"(residual {res:.2e})")
+    else:
+        logger.warning(f"Did not converge after {max_iter} mat-vecs")
+
+    x = np.maximum(x, 0)
+    x /= x.sum()
+    bound = error_bound(res, alpha, stepped=True)
+    tracer.annotate(error_bound=bound, matvecs=matvecs, cycles=cycle)
+    if stats is not None:
+        stats.update(error_bound=bound, deadline_hit=deadline.hit, matvecs=matvecs, cycles=cycle)
+
+    elapsed = time.perf_counter() - t0
+    logger.info(f"Power-Arnoldi solver completed in {elapsed:.2f}s")
+    return dict(zip(nodes, x)), residuals, elapsed
@@ -0,0 +1,743 @@
+"""
+Benchmark suite for the PageRank package.
+
+Usage:
+    python -m pagerank.benchmark startup [--repeat 20] [--json out.json]
+    python -m pagerank.benchmark parse [--graph web-Google.txt.gz] [--workers 1,4,8]
+    python -m pagerank.benchmark kernel [--nodes 875000,4800000] [--degree 6]
+    python -m pagerank.benchmark suite [--nodes 10000,100000] [--generator rmat] [--baseline base.json]
+    python -m pagerank.benchmark alpha [--graph powerlaw:nodes=1e5,closed=0.02] [--alphas 0.85,0.99]
+    python -m pagerank.benchmark relax [--graph rmat:nodes=1e6] [--workers 1,2,4,8]
+    python -m pagerank.benchmark compress [--graph web-Google.txt.gz] [--block-rows 16384]
+    python -m pagerank.benchmark calibrate [benchmark_history.jsonl]
+
+Every benchmark returns a list of flat dicts (one per measurement) which are
+printed as a table and can be saved as JSON for comparison between runs.
+With ``--baseline`` a run is compared with a saved ``--json`` file, and time
+or memory regressions beyond ``--threshold`` are flagged; the exit status is
+then 1.  With ``--history`` the results are also appended to a JSON-lines
+file, from which ``calibrate`` (and ``--algorithm auto``) fit the solver
+cost model.
+"""
+
+from __future__ import annotations
+import argparse
+import inspect
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Sequence
+
+# Commands timed by the startup benchmark: (label, python arguments)
+STARTUP_COMMANDS = [
+    ("python (baseline)", ["-c", "pass"]),
+    ("import pagerank", ["-c", "import pagerank"]),
+    ("pagerank.cli --help", ["-m", "pagerank.cli", "--help"]),
+    ("import power solver", ["-c", "from pagerank.algorithms import get_solver; get_solver('power')"]),
+    ("import gmres solver", ["-c", "from pagerank.algorithms import get_solver; get_solver('gmres_solver')"]),
+    ("import plotting", ["-c", "import pagerank.plotting"]),
+]
+
+
+# Solvers of the regression suite with their extra arguments; "max_nodes"
+# skips graphs the solver is not meant for (SuperLU fill explodes on R-MAT)
+SUITE_SOLVERS = {
+    "power": {},
+    "gauss_seidel": {},
+    "gmres_solver": {},
+    "anderson_acceleration": {"m": 5},
+    "adaptive": {},
+    "blockrank": {},
+    "inner_outer": {},
+    "power_arnoldi": {},
+    "async_relaxation": {},
+    "monte_carlo": {"max_iter": 5, "seed": 0},
+    "direct_lu": {"max_nodes": 20_000},
+}
+SUITE_SIZES = (10_000, 100_000, 1_000_000, 10_000_000)
+
+# Damping-factor sweep: solvers compared and the default graph, a crawl-like
+# power-law graph with closed 2-cycles (|λ₂| = α, the hard case for power
+# iteration)
+ALPHA_SOLVERS = ("power", "gauss_seidel", "gmres_solver", "inner_outer", "power_arnoldi")
+ALPHAS = (0.85, 0.9, 0.95, 0.99)
+ALPHA_GRAPH = "powerlaw:nodes=100000,edges=800000,closed=0.02,seed=0"
+
+# Relative change beyond which a result is a regression
+REGRESSION_THRESHOLD = 0.25
+# Columns compared with the baseline; lower is better unless listed in _HIGHER_IS_BETTER
+_METRICS = ("median_s", "median_ms", "min_ms", "peak_MB", "peak_alloc_MB", "MB_per_s", "edges_per_s")
+_HIGHER_IS_BETTER = ("MB_per_s", "edges_per_s")
+# Changes smaller than this are measurement noise, whatever the ratio
+_NOISE_FLOOR = {"median_s": 0.05, "median_ms": 0.5, "min_ms": 0.5, "peak_MB": 16.0, "peak_alloc_MB": 1.0}
+# Columns identifying the same measurement in two runs
+_KEY_COLUMNS = ("benchmark", "generator", "file", "nodes", "case")
+
+
+def _time_command(args: List[str], repeat: int) -> List[float]:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, *args], check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def bench_startup(repeat: int = 10) -> List[Dict]:
+    """
+    Measure cold-process start-up time of the package entry points.
+
+    Each command runs in a fresh interpreter ``repeat`` times; the median and
+    minimum wall times are reported in milliseconds.
+    """
+    results = []
+    for label, args in STARTUP_COMMANDS:
+        times = _time_command(args, repeat)
+        results.append({
+            "benchmark": "startup",
+            "case": label,
+            "median_ms": round(statistics.median(times) * 1e3, 2),
+            "min_ms": round(min(times) * 1e3, 2),
+            "repeat": repeat,
+        })
+    return results
+
+
+def _write_edge_list(path: str, n_edges: int, n_nodes: int, seed: int = 0) -> None:
+    """Write a random SNAP-style edge list (with header) for parse benchmarks."""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    with open(path, "w") as f:
+        f.write(f"# Synthetic benchmark graph\n# Nodes: {n_nodes} Edges: {n_edges}\n"
+                "# FromNodeId\tToNodeId\n")
+        for lo in range(0, n_edges, 1 << 20):
+            block = rng.integers(0, n_nodes, (min(1 << 20, n_edges - lo), 2))
+            f.write("\n".join(f"{u}\t{v}" for u, v in block.tolist()) + "\n")
+
+
+def _uncompressed_size(path: str) -> int:
+    from .edge_list import is_compressed, open_edge_list
+
+    if not is_compressed(path):
+        return os.path.getsize(path)
+    size = 0
+    with open_edge_list(path) as f:
+        while True:
+            chunk = f.read(16 << 20)
+            if not chunk:
+                return size
+            size += len(chunk)
+
+
+def bench_parse(
+    paths: Sequence[str] = (),
+    workers: Sequence[int] = (1,),
+    repeat: int = 3,
+    n_edges: int = 5_000_000,
+    baseline: bool = True,
+) -> List[Dict]:
+    """
+    Measure edge-list parse throughput of ``edge_list.read_edge_array``,
+    and of ``csr_loader.load_csr``, which also builds the CSR adjacency.
+
+    Without ``paths`` a random edge list of ``n_edges`` edges is generated
+    in a temporary directory, plain and gzip-compressed.  Throughput is
+    uncompressed MB per second of the median run.  With ``baseline`` the
+    previous pandas chunked reader is timed too.
+    """
+    import gzip
+    import shutil
+    from .csr_loader import load_csr
+    from .edge_list import read_edge_array
+
+    tmp = None
+    if not paths:
+        tmp = tempfile.mkdtemp(prefix="pagerank-bench-")
+        plain = os.path.join(tmp, "edges.txt")
+        _write_edge_list(plain, n_edges, max(1, n_edges // 5))
+        with open(plain, "rb") as src, gzip.open(plain + ".gz", "wb", compresslevel=1) as dst:
+            shutil.copyfileobj(src, dst)
+        paths = [plain, plain + ".gz"]
+
+    results = []
+    try:
+        for path in paths:
+            mb = _uncompressed_size(path) / 2**20
+            cases = [(f"workers={w}", lambda w=w: read_edge_array(path, workers=w)) for w in workers]
+            # Parse plus ID remapping and CSR construction in the reader pipeline
+            cases += [(f"load_csr workers={w}", lambda w=w: load_csr(path, workers=w).indices)
+                      for w in workers]
+            if baseline and not path.endswith(".zst"):
+                cases.append(("pandas (old loader)", lambda: _pandas_parse(path)))
+            for label, parse in cases:
+                times = []
+                for _ in range(repeat):
+                    t0 = time.perf_counter()
+                    n = len(parse())
+                    times.append(time.perf_counter() - t0)
+                median = statistics.median(times)
+                results.append({
+                    "benchmark": "parse",
+                    "file": os.path.basename(path),
+                    "case": label,
+                    "edges": n,
+                    "median_s": round(median, 3),
+                    "MB_per_s": round(mb / median, 1),
+                })
+    finally:
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+    return results
+
+
+def _pandas_parse(path: str):
+    """The chunked pandas reader ``load_graph`` used before ``edge_list``."""
+    import numpy as np
+    import pandas as pd
+
+    chunks = pd.read_csv(path, sep=r"\s+", comment="#", header=None, names=["source", "target"],
+                         dtype={"source": np.int32, "target": np.int32}, chunksize=100000)
+    return np.concatenate([chunk.to_numpy() for chunk in chunks])
+
+
+def _random_transition(n_nodes: int, degree: float, seed: int = 0):
+    """Column-stochastic P of a random graph with skewed in-degrees and ~5% dangling nodes."""
+    import numpy as np
+    from scipy.sparse import csr_matrix
+
+    rng = np.random.default_rng(seed)
+    m = int(n_nodes * degree)
+    src = rng.integers(0, n_nodes, m)
+    src = src[src >= n_nodes // 20]  # the first 5% keep no out-edges
+    dst = np.minimum((rng.pareto(1.5, len(src)) * n_nodes / 50).astype(np.int64), n_nodes - 1)
+    dst = rng.permutation(n_nodes)[dst]
+    outdeg = np.bincount(src, minlength=n_nodes)
+    return csr_matrix((1.0 / outdeg[src], (dst, src)), shape=(n_nodes, n_nodes))
+
+
+def bench_kernel(
+    sizes: Sequence[int] = (875_000,),
+    degree: float = 6.0,
+    iterations: int = 20,
+    alpha: float = 0.85,
+) -> List[Dict]:
+    """
+    Per-iteration cost of one PageRank update plus L1 residual.
+
+    Compares the NumPy expression the solvers used before (an SpMV and
+    several N-length temporaries per step) with ``PageRankKernel.step``
+    writing into preallocated double buffers.  Reports the median time per
+    iteration and the peak memory allocated while iterating (tracemalloc).
+    """
+    import tracemalloc
+    import numpy as np
+    from .algorithms.kernel import PageRankKernel
+
+    results = []
+    for n in sizes:
+        P = _random_transition(n, degree)
+        dangling = np.bincount(P.indices, minlength=n) == 0
+        kernel = PageRankKernel(P, alpha, dangling=dangling)
+
+        def expression(x, _):
+            y = alpha * (P @ x) + (alpha * x[dangling].sum() + 1 - alpha) / n
+            return y, np.linalg.norm(y - x, ord=1)
+
+        def fused(x, y):
+            return y, kernel.step(x, y)
+
+        for label, step in [("numpy expression", expression), ("fused kernel", fused)]:
+            x, y = kernel.buffers()
+            times = []
+            for i in range(iterations + 1):
+                if i == 1:
+                    tracemalloc.start()
+                t0 = time.perf_counter()
+                y, _ = step(x, y)
+                times.append(time.perf_counter() - t0)
+                x, y = y, x
+            allocated = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            results.append({
+                "benchmark": "kernel",
+                "nodes": n,
+                "edges": P.nnz,
+                "case": label,
+                "median_ms": round(statistics.median(times[1:]) * 1e3, 2),
+                "peak_alloc_MB": round(allocated / 2**20, 1),
+            })
+    return results
+
+
+def bench_suite(
+    sizes: Sequence[int] = SUITE_SIZES,
+    solvers: Optional[Sequence[str]] = None,
+    generator: str = "rmat",
+    degree: float = 8.0,
+    repeat: int = 1,
+    seed: int = 0,
+) -> List[Dict]:
+    """
+    End-to-end time and memory of generating, loading and solving graphs.
+
+    For every size a ``generator`` graph with ``degree`` edges per node is
+    generated from a fixed ``seed`` (so runs are comparable) and loaded into
+    a ``CSRGraph`` like ``load_graph`` does.  Then every solver runs
+    with the CLI defaults (α = 0.85, tol = 1e-6, 100 iterations).  Times
+    are medians over ``repeat`` runs.  ``peak_MB`` is the growth of the
+    peak RSS over the RSS before the step.  Steps that the memory planner
+    predicts will not fit in the available memory are reported as skipped.
+    Solver rows carry the graph's ``cost_model.GraphFeatures`` and the
+    solver settings, so saved runs can calibrate ``--algorithm auto``.
+    """
+    import gc
+    from .cost_model import graph_features
+    from .generators import GENERATORS
+    from .csr_loader import build_csr
+    from .algorithms import get_solver
+    from .memory import (available_memory, current_rss, estimate_load_bytes,
+                         estimate_solver_bytes, peak_rss, reset_peak_rss)
+
+    solvers = list(solvers or SUITE_SOLVERS)
+    available = available_memory()
+
+    def measure(fn):
+        times, peak, value = [], 0, None
+        for _ in range(repeat):
+            gc.collect()
+            before = current_rss()
+            reset_peak_rss()
+            t0 = time.perf_counter()
+            value = fn()
+            times.append(time.perf_counter() - t0)
+            peak = max(peak, peak_rss() - before)
+        return value, {"median_s": round(statistics.median(times), 3),
+                       "peak_MB": round(peak / 2**20, 1)}
+
+    results = []
+    for n in sizes:
+        m = int(n * degree)
+        row = {"benchmark": "suite", "generator": generator, "nodes": n}
+        if available and estimate_load_bytes(n, m) > available:
+            results.append({**row, "case": "load", "skipped": "memory"})
+            continue
+        edges, metrics = measure(lambda: GENERATORS[generator](n, m, seed=seed))
+        results.append({**row, "case": "generate", "edges": m, **metrics,
+                        "edges_per_s": round(m / max(metrics["median_s"], 1e-9))})
+        G, metrics = measure(lambda: build_csr([edges]))
+        del edges
+        results.append({**row, "case": "load", "edges": G.number_of_edges(), **metrics})
+        loaded = current_rss()
+        # Keep the requested size as "nodes" so runs stay comparable
+        features = {k: v for k, v in graph_features(G).as_row().items() if k != "nodes"}
+
+        for name in solvers:
+            options = dict(SUITE_SOLVERS.get(name, {}))
+            max_nodes = options.pop("max_nodes", None)
+            need = max(estimate_solver_bytes(name, n, G.number_of_edges()).values())
+            if max_nodes and n > max_nodes:
+                results.append({**row, "case": name, "skipped": f"nodes > {max_nodes}"})
+                continue
+            if available and loaded + need > available:
+                results.append({**row, "case": name, "skipped": "memory"})
+                continue
+            options = {"alpha": 0.85, "tol": 1e-6, "max_iter": 100, **options}
+            (_, residuals, _), metrics = measure(lambda: get_solver(name)(G, **options))
+            results.append({**row, "case": name, **metrics, "iterations": len(residuals),
+                            **features, **{k: options[k] for k in ("alpha", "tol", "max_iter")}})
+        del G
+    return results
+
+
+def bench_alpha(
+    graph: str = ALPHA_GRAPH,
+    alphas: Sequence[float] = ALPHAS,
+    solvers: Sequence[str] = ALPHA_SOLVERS,
+    tol: float = 1e-8,
+    max_iter: int = 2000,
+    repeat: int = 1,
+) -> List[Dict]:
+    """
+    Iterations, mat-vecs and time of each solver across damping factors.
+
+    ``graph`` is an edge-list file or a generator spec.  Every solver runs
+    to ``tol`` from the uniform start vector.  ``matvecs`` is reported by
+    the solvers that do more than one mat-vec per recorded residual
+    (power_arnoldi); for the others it equals ``iterations``, except
+    gmres_solver, whose iterations are preconditioned Krylov steps.
+    """
+    from .algorithms import get_solver
+    from .cost_model import graph_features
+    from .graph_io import load_graph
+
+    G = load_graph(graph)
+    row = {"benchmark": "alpha", "file": graph, **graph_features(G).as_row(),
+           "tol": tol, "max_iter": max_iter}
+    results = []
+    for alpha in alphas:
+        for name in solvers:
+            times = []
+            solve = get_solver(name)
+            for _ in range(repeat):
+                stats: Dict = {}
+                options = {"stats": stats} if "stats" in inspect.signature(solve).parameters else {}
+                _, residuals, elapsed = solve(G, alpha=alpha, tol=tol, max_iter=max_iter, **options)
+                times.append(elapsed)
+            results.append({**row, "case": f"{name} alpha={alpha:g}", "alpha": alpha,
+                            "iterations": len(residuals),
+                            "matvecs": stats.get("matvecs", len(residuals)),
+                            "converged": bool(residuals and residuals[-1] < tol),
+                            "median_s": round(statistics.median(times), 3)})
+    return results
+
+
+def bench_relaxation(
+    graph: str = "rmat:nodes=1000000,seed=0",
+    workers: Sequence[int] = (1,),
+    alpha: float = 0.85,
+    tol: float = 1e-8,
+    max_iter: int = 1000,
+    repeat: int = 1,
+    gauss_seidel_max_nodes: int = 100_000,
+) -> List[Dict]:
+    """
+    Sweeps and time of asynchronous relaxation by worker count, against
+    the sequential ``gauss_seidel`` solver.
+
+    ``speedup`` is relative to one worker.  ``sweeps`` is the largest
+    per-worker sweep count: workers that own easier ranges keep sweeping
+    while the slowest one catches up.  ``gauss_seidel`` updates node by node
+    in Python, so it only runs on graphs of at most
+    ``gauss_seidel_max_nodes`` nodes.
+    """
+    from .algorithms import get_solver
+    from .graph_io import load_graph
+
+    G = load_graph(graph)
+    n = G.number_of_nodes()
+    row = {"benchmark": "relax", "file": graph, "nodes": n}
+    cases = [("gauss_seidel", {})] if n <= gauss_seidel_max_nodes else []
+    cases += [(f"async_relaxation workers={w}", {"workers": w}) for w in workers]
+    results, base = [], None
+    for case, options in cases:
+        name = case.split()[0]
+        times = []
+        for _ in range(repeat):
+            stats: Dict = {}
+            _, residuals, elapsed = get_solver(name)(G, alpha=alpha, tol=tol, max_iter=max_iter,
+                                                     stats=stats, **options)
+            times.append(elapsed)
+        median = statistics.median(times)
+        result = {**row, "case": case, "sweeps": max(stats.get("sweeps", [len(residuals)])),
+                  "error_bound": float(f"{stats['error_bound']:.2e}"),
+                  "median_s": round(median, 3)}
+        if options:
+            base = base or median
+            result["speedup"] = round(base / median, 2)
+        results.append(result)
+    return results
+
+
+def bench_compressed(
+    graphs: Sequence[str] = ("rmat:nodes=1000000,seed=0",),
+    block_rows: Optional[int] = None,
+    alpha: float = 0.85,
+    tol: float = 1e-8,
+    max_iter: int = 1000,
+    repeat: int = 3,
+) -> List[Dict]:
+    """
+    Compressed adjacency against plain CSR (see ``pagerank.compressed``).
+
+    For every graph there is one ``csr`` and one ``compressed`` row:
+
+    • ``MB``/``bits_per_edge``: bytes of the transition matrix as the
+      solvers hold it.  For CSR that is indptr, indices and data; for the
+      compressed form the gap and degree streams plus the out-degrees
+    • ``ratio``: CSR bytes over compressed bytes
+    • ``edges_per_s``/``MB_per_s``: decode throughput of all blocks
+    • ``spmv_ms``: median time of one fused PageRank update
+    • ``median_s``: end-to-end ``power`` solve (matrix set-up included)
+    """
+    import numpy as np
+    from scipy.sparse import csr_matrix
+
+    from .algorithms import get_solver
+    from .algorithms.kernel import PageRankKernel
+    from .compressed import BLOCK_ROWS, CompressedAdjacency, CompressedKernel
+    from .graph_io import adjacency_csr, load_graph
+
+    block_rows = block_rows or BLOCK_ROWS
+    power = get_solver("power")
+    results = []
+    for graph in graphs:
+        G = load_graph(graph)
+        nodes, indptr, indices = adjacency_csr(G)
+        N, E = len(nodes), len(indices)
+        out_deg = np.diff(indptr)
+        data = 1.0 / np.repeat(np.maximum(out_deg, 1), out_deg)
+        P = csr_matrix((data, indices, indptr), shape=(N, N)).T.tocsr()
+        t0 = time.perf_counter()
+        adj = CompressedAdjacency.from_csr(np.asarray(nodes), indptr, indices, block_rows)
+        encode_s = time.perf_counter() - t0
+        G.graph["compressed"] = adj
+
+        decode = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            for b in range(adj.n_blocks):
+                adj.decode_block(b)
+            decode.append(time.perf_counter() - t0)
+        decode_s = statistics.median(decode)
+
+        row = {"benchmark": "compress", "file": graph, "nodes": N, "edges": E}
+        csr_bytes = P.indptr.nbytes + P.indices.nbytes + P.data.nbytes
+        kernels = {"csr": (PageRankKernel(P, alpha, dangling=out_deg == 0), csr_bytes, {}),
+                   "compressed": (CompressedKernel(adj, alpha), adj.nbytes, {"compressed": True})}
+        for case, (kernel, nbytes, options) in kernels.items():
+            x, y = kernel.buffers()
+            spmv = []
+            for _ in range(max(repeat, 5)):
+                t0 = time.perf_counter()
+                kernel.apply(x, y)
+                spmv.append(time.perf_counter() - t0)
+            solve = [power(G, alpha=alpha, tol=tol, max_iter=max_iter, **options)
+                     for _ in range(repeat)]
+            result = {**row, "case": case, "MB": round(nbytes / 2**20, 1),
+                      "bits_per_edge": round(8 * nbytes / max(E, 1), 1),
+                      "spmv_ms": round(1000 * statistics.median(spmv), 2),
+                      "iterations": len(solve[0][1]),
+                      "median_s": round(statistics.median(r[2] for r in solve), 3)}
+            if case == "compressed":
+                result.update(ratio=round(csr_bytes / nbytes, 2), encode_s=round(encode_s, 3),
+                              edges_per_s=int(E / decode_s),
+                              MB_per_s=round(adj.gaps.nbytes / 2**20 / decode_s, 1))
+            results.append(result)
+    return results
+
+
+def bench_calibrate(paths: Sequence[str]) -> List[Dict]:
+    """
+    Calibrate the ``--algorithm auto`` cost model on benchmark history.
+
+    One row per solver with history: the number of samples, the median
+    relative error of the prior and the calibrated predictions against the
+    measured times, and the calibrated coefficients.
+    """
+    from .cost_model import PRIOR, CostModel, GraphFeatures, load_history
+
+    rows = load_history(paths)
+    model = CostModel().calibrate(rows)
+    prior = CostModel()
+    results = []
+    for solver, n in model.samples.items():
+        errors = {"prior": [], "calibrated": []}
+        for row in rows:
+            if str(row.get("case", "")).split()[:1] != [solver] or not row.get("median_s"):
+                continue
+            f = GraphFeatures.from_row(row)
+            settings = (row.get("alpha", 0.85), row.get("tol", 1e-6), row.get("max_iter", 100))
+            for name, m in (("prior", prior), ("calibrated", model)):
+                predicted = m.predict(solver, f, *settings).seconds
+                errors[name].append(abs(predicted / row["median_s"] - 1.0))
+        results.append({"benchmark": "calibrate", "case": solver, "samples": n,
+                        "prior_error": round(statistics.median(errors["prior"]), 2),
+                        "calibrated_error": round(statistics.median(errors["calibrated"]), 2),
+                        **{k: float(f"{v:.3g}") for k, v in model.coefficients[solver].items()}})
+    missing = sorted(set(PRIOR) - set(model.samples))
+    if missing:
+        print(f"No history for {', '.join(missing)}; they keep the prior coefficients")
+    return results
+
+
+def compare_results(
+    results: List[Dict],
+    baseline: List[Dict],
+    threshold: float = REGRESSION_THRESHOLD,
+) -> List[str]:
+    """
+    Compare ``results`` with a saved baseline run of the same benchmark.
+
+    Each result matched in the baseline gets a ``vs_baseline`` column with
+    the relative change of its time/memory/throughput columns.  A change
+    worse than ``threshold`` (and above the noise floor of its column) is a
+    regression.
+
+    Returns:
+        One message per regression
+    """
+    def key(r):
+        return tuple(r.get(c) for c in _KEY_COLUMNS)
+
+    saved = {key(r): r for r in baseline}
+    regressions = []
+    for r in results:
+        old = saved.get(key(r))
+        if old is None:
+            continue
+        changes = []
+        for metric in _METRICS:
+            if not old.get(metric) or r.get(metric) is None:
+                continue
+            change = r[metric] / old[metric] - 1.0
+            if metric in _HIGHER_IS_BETTER:
+                worse = -change > threshold / (1.0 + threshold)
+            else:
+                worse = change > threshold and r[metric] - old[metric] > _NOISE_FLOOR.get(metric, 0.0)
+            changes.append(f"{metric} {change:+.0%}" + (" REGRESSION" if worse else ""))
+            if worse:
+                label = " ".join(str(v) for v in key(r) if v is not None)
+                regressions.append(f"{label}: {metric} {old[metric]} -> {r[metric]} ({change:+.0%})")
+        r["vs_baseline"] = ", ".join(changes)
+    return regressions
+
+
+def format_results(results: List[Dict]) -> str:
+    """Format benchmark results as a plain-text table."""
+    if not results:
+        return ""
+    columns = list(dict.fromkeys(k for r in results for k in r))
+    cells = [[str(r.get(c, "")) for c in columns] for r in results]
+    widths = [max([len(c)] + [len(row[i]) for row in cells]) for i, c in enumerate(columns)]
+    lines = ["  ".join(c.ljust(w) for c, w in zip(columns, widths))]
+    lines += ["  ".join(v.ljust(w) for v, w in zip(row, widths)) for row in cells]
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="PageRank benchmark suite")
+    sub = ap.add_subparsers(dest="benchmark", required=True)
+
+    p = sub.add_parser("startup", help="Cold start-up time of imports and the CLI")
+    p.add_argument("--repeat", type=int, default=10, help="Runs per command")
+    p.add_argument("--json", type=str, default=None, help="Also save results to this file")
+
+    p = sub.add_parser("parse", help="Edge-list parse throughput (MB/s) by worker count")
+    p.add_argument("--graph", type=str, action="append", default=[],
+                   help="Edge list to parse (plain, .gz or .zst; repeatable). Default: a generated file")
+    p.add_argument("--edges", type=int, default=5_000_000, help="Edges of the generated file")
+    p.add_argument("--workers", type=str, default=None,
+                   help="Comma-separated worker counts (default: 1 and the CPU count)")
+    p.add_argument("--repeat", type=int, default=3, help="Runs per case")
+    p.add_argument("--no-baseline", action="store_true", help="Skip the pandas reader")
+    p.add_argument("--json", type=str, default=None, help="Also save results to this file")
+
+    p = sub.add_parser("kernel", help="Per-iteration time of the fused update kernel")
+    p.add_argument("--nodes", type=str, default="875000",
+                   help="Comma-separated graph sizes (nodes) of the generated graphs")
+    p.add_argument("--degree", type=float, default=6.0, help="Average out-degree")
+    p.add_argument("--iterations", type=int, default=20, help="Timed iterations per case")
+    p.add_argument("--json", type=str, default=None, help="Also save results to this file")
+
+    p = sub.add_parser("suite", help="Generate, load and solve synthetic graphs with every solver")
+    p.add_argument("--nodes", type=str, default=",".join(str(n) for n in SUITE_SIZES),
+                   help="Comma-separated graph sizes (nodes)")
+    p.add_argument("--generator", type=str, default="rmat", choices=["rmat", "kronecker", "powerlaw"],
+                   help="Synthetic graph model (see pagerank.generators)")
+    p.add_argument("--degree", type=float, default=8.0, help="Edges per node")
+    p.add_argument("--solvers", type=str, default=None,
+                   help=f"Comma-separated solvers (default: {','.join(SUITE_SOLVERS)})")
+    p.add_argument("--repeat", type=int, default=1, help="Runs per step")
+    p.add_argument("--seed", type=int, default=0, help="Generator seed (keep fixed to compare runs)")
+    p.add_argument("--json", type=str, default=None, help="Also save results to this file")
+
+    p = sub.add_parser("alpha", help="Iterations and time of the solvers across damping factors")
+    p.add_argument("--graph", type=str, default=ALPHA_GRAPH,
+                   help="Edge list or generator spec (see pagerank.generators)")
+    p.add_argument("--alphas", type=str, default=",".join(str(a) for a in ALPHAS),
+                   help="Comma-separated damping factors")
+    p.add_argument("--solvers", type=str, default=",".join(ALPHA_SOLVERS),
+                   help="Comma-separated solvers")
+    p.add_argument("--tol", type=float, default=1e-8, help="Convergence tolerance")
+    p.add_argument("--max-iter", type=int, default=2000, help="Iteration cap per solve")
+    p.add_argument("--repeat", type=int, default=1, help="Runs per case")
+    p.add_argument("--json", type=str, default=None, help="Also save results to this file")
+
+    p = sub.add_parser("relax", help="Asynchronous relaxation by worker count vs Gauss-Seidel")
+    p.add_argument("--graph", type=str, default="rmat:nodes=1000000,seed=0",
+                   help="Edge list or generator spec (see pagerank.generators)")
+    p.add_argument("--workers", type=str, default=None,
+                   help="Comma-separated worker counts (default: 1 and the CPU count)")
+    p.add_argument("--alpha", type=float, default=0.85, help="Damping factor")
+    p.add_argument("--tol", type=float, default=1e-8, help="Convergence tolerance")
+    p.add_argument("--repeat", type=int, default=1, help="Runs per case")
+    p.add_argument("--json", type=str, default=None, help="Also save results to this file")
+
+    p = sub.add_parser("compress", help="Compressed adjacency vs CSR: size, decode throughput, solve time")
+    p.add_argument("--graph", type=str, action="append", default=[],
+                   help="Edge list, .cgr file or generator spec (repeatable). Default: a 1M-node R-MAT graph")
+    p.add_argument("--block-rows", type=int, default=None, help="Rows per compressed block")
+    p.add_argument("--alpha", type=float, default=0.85, help="Damping factor")
+    p.add_argument("--tol", type=float, default=1e-8, help="Convergence tolerance")
+    p.add_argument("--repeat", type=int, default=3, help="Runs per case")
+    p.add_argument("--json", type=str, default=None, help="Also save results to this file")
+
+    p = sub.add_parser("calibrate", help="Fit the --algorithm auto cost model to benchmark history")
+    p.add_argument("files", nargs="*", default=None,
+                   help="History (--history) or --json result files (default: benchmark_history.jsonl)")
+    p.add_argument("--json", type=str, default=None, help="Also save results to this file")
+
+    for p in sub.choices.values():
+        p.add_argument("--history", type=str, default=None,
+                       help="Append the results to this JSON-lines history, which calibrates --algorithm auto")
+        p.add_argument("--baseline", type=str, default=None,
+                       help="Saved --json results to compare with; regressions set exit status 1")
+        p.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                       help="Relative slow-down or memory growth flagged as a regression")
+
+    args = ap.parse_args(argv)
+    if args.benchmark == "startup":
+        results = bench_startup(args.repeat)
+    elif args.benchmark == "parse":
+        workers = ([int(w) for w in args.workers.split(",")] if args.workers
+                   else sorted({1, os.cpu_count() or 1}))
+        results = bench_parse(args.graph, workers, args.repeat, args.edges,
+                              baseline=not args.no_baseline)
+    elif args.benchmark == "kernel":
+        results = bench_kernel([int(n) for n in args.nodes.split(",")], args.degree, args.iterations)
+    elif args.benchmark == "suite":
+        results = bench_suite([int(float(n)) for n in args.nodes.split(",")],
+                              args.solvers.split(",") if args.solvers else None,
+                              args.generator, args.degree, args.repeat, args.seed)
+    elif args.benchmark == "alpha":
+        results = bench_alpha(args.graph, [float(a) for a in args.alphas.split(",")],
+                              args.solvers.split(","), args.tol, args.max_iter, args.repeat)
+    elif args.benchmark == "relax":
+        workers = ([int(w) for w in args.workers.split(",")] if args.workers
+                   else sorted({1, os.cpu_count() or 1}))
+        results = bench_relaxation(args.graph, workers, args.alpha, args.tol, repeat=args.repeat)
+    elif args.benchmark == "compress":
+        results = bench_compressed(args.graph or ["rmat:nodes=1000000,seed=0"], args.block_rows,
+                                   args.alpha, args.tol, repeat=args.repeat)
+    elif args.benchmark == "calibrate":
+        from .cost_model import HISTORY_FILE
+
+        results = bench_calibrate(args.files or [HISTORY_FILE])
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.history:
+        from .cost_model import append_history
+
+        append_history(args.history, results)
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_results(results, json.load(f), args.threshold)
+
+    print(format_results(results))
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+        print("\n".join(f"  {r}" for r in regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
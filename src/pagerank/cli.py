@@ -1,34 +1,69 @@
+from __future__ import annotations
 import argparse
 import time
-import networkx as nx
-import numpy as np
-import matplotlib.pyplot as plt
-import importlib
 import os
-import pandas as pd
+import sys
 from datetime import datetime
-from typing import Dict, List, Tuple
+from typing import TYPE_CHECKING, Dict, List, Tuple
+from .algorithms import available_solvers, get_solver_module
 from .logging_utils import setup_logging, get_logger
-from .graph_io import load_graph
-from .plotting import (
-    plot_convergence_comparison,
-    plot_top10_comparison,
-    save_metrics_comparison
+from .memory import (
+    peak_rss,
+    plan_memory,
+    read_graph_size,
+    reset_peak_rss
 )
+from .tracing import Tracer, save_chrome_trace
 
-# Import for table plotting
-import matplotlib.gridspec as gridspec
-from matplotlib.table import Table
+# networkx, numpy, pandas and matplotlib are imported where they are used so
+# that `--help` and headless `--no-report` runs start quickly
+if TYPE_CHECKING:
+    import networkx as nx
+    from .checkpoint import Checkpointer
 
 logger = get_logger(__name__)
 
-def parse_args() -> argparse.Namespace:
+METRIC_COLUMNS = [
+    'Algorithm',
+    'Time (s)',
+    'Residual Norm',
+    'Iterations',
+    'Initial Residual',
+    'Final Residual',
+    'Convergence Rate',
+    'Convergence Type',
+    'Norm Type',
+    'Omega',
+    'Error Bound',
+    'Est. Solver (MB)',
+    'Peak RSS (MB)'
+]
+
+def add_transition_args(ap: argparse.ArgumentParser) -> None:
+    """Options of the ``TransitionPolicy`` the graph is loaded with (see ``transition_policy``)."""
+    ap.add_argument("--weighted", action="store_true",
+                   help="Read a third edge-list column as edge weights (missing weights count as 1)")
+    ap.add_argument("--dedupe", type=str, default="first",
+                   choices=["first", "sum", "max"],
+                   help="Weight of a repeated edge: the first one, the sum (multiplicity when unweighted) or the max")
+    ap.add_argument("--self-loops", type=str, default="keep",
+                   choices=["keep", "drop"],
+                   help="Keep self-loops as links or drop them before normalizing")
+    ap.add_argument("--dangling", type=str, default="teleport",
+                   choices=["teleport", "self"],
+                   help="Dangling nodes spread their mass like the teleport vector, or keep it with a self-loop")
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
     """Parse command line arguments"""
     ap = argparse.ArgumentParser(description="PageRank Implementation")
     ap.add_argument("--graph", type=str, default="web-Google.txt",
-                   help="Path to graph file")
+                   help="Path to graph file, or a generator spec such as rmat:nodes=875713,edges=5105039,seed=1")
     ap.add_argument("--limit", type=int, default=1000,
                    help="Limit number of nodes to process (-1 for full graph)")
+    ap.add_argument("--load-workers", type=int, default=None,
+                   help="Processes used to parse the edge list (default: CPU count)")
+    add_transition_args(ap)
     ap.add_argument("--log-level", type=str, default="INFO",
                    choices=["DEBUG", "INFO", "WARNING", "ERROR"],
                    help="Set the logging level")
@@ -39,7 +74,7 @@ def parse_args() -> argparse.Namespace:
     ap.add_argument("--max-iter", type=int, default=100,
                    help="Maximum number of iterations")
     ap.add_argument("--algorithm", type=str, default="power",
-                   help="PageRank algorithm(s) to use. Use comma-separated list (e.g. 'power,gauss_seidel,anderson_acceleration') or 'all' for all algorithms")
+                   help="PageRank algorithm(s) to use. Use comma-separated list (e.g. 'power,gauss_seidel,anderson_acceleration') or 'all' for all algorithms; 'auto' runs the solver a cost model predicts to be fastest")
     ap.add_argument("--omega", type=str, default="1.0",
                    help="SOR relaxation factor(s) for gauss_seidel. Can be a single value or comma-separated list (e.g. '1.0,1.2,1.3')")
     ap.add_argument("--omega-strategy", type=str, default="fixed",
@@ -48,7 +83,7 @@ def parse_args() -> argparse.Namespace:
     ap.add_argument("--restart", type=int, default=30,
                    help="GMRES restart size (only for gmres_solver)")
     ap.add_argument("--preconditioner", type=str, default="ilu",
-                   choices=["ilu", "jacobi", "none"],
+                   choices=["ilu", "jacobi", "amg", "none"],
                    help="Preconditioner for GMRES (only for gmres_solver)")
     ap.add_argument("--permc-spec", type=str, default="COLAMD",
                    choices=["COLAMD", "NATURAL", "MMD_AT_PLUS_A", "MMD_ATA"],
@@ -56,19 +91,99 @@ def parse_args() -> argparse.Namespace:
     ap.add_argument("--direct-drop-tol", type=float, default=1e-10,
                    help="Drop tolerance for sparse LU (only for direct_lu)")
     ap.add_argument("--m", type=int, default=2,
-                   help="Number of previous vectors to use for Anderson acceleration")
+                   help="Number of previous vectors to use for Anderson acceleration (memory is constant per iteration, so 10-20 is practical)")
+    ap.add_argument("--anderson-beta", type=float, default=1.0,
+                   help="Mixing (damping) parameter for Anderson acceleration")
+    ap.add_argument("--anderson-reg", type=float, default=0.0,
+                   help="Relative Tikhonov regularisation of the Anderson least-squares problem")
+    ap.add_argument("--anderson-safeguard", type=float, default=10.0,
+                   help="Restart the Anderson history when the residual grows by more than this factor in one step (0 disables)")
+    ap.add_argument("--walks-per-node", type=int, default=10,
+                   help="Random walks started from every node per refinement round (only for monte_carlo; --max-iter caps the rounds)")
+    ap.add_argument("--mc-workers", type=int, default=1,
+                   help="Worker processes for monte_carlo, each with an independent random stream")
+    ap.add_argument("--seed", type=int, default=None,
+                   help="Random seed (only for monte_carlo)")
+    ap.add_argument("--partition", type=str, default="range",
+                   choices=["range", "host", "label"],
+                   help="Block partition for blockrank: node-ID ranges, --host-map hosts or label propagation")
+    ap.add_argument("--blocks", type=int, default=None,
+                   help="Number of blocks for --partition range (default: sqrt of the node count)")
+    ap.add_argument("--host-map", type=str, default=None,
+                   help="File of 'node host' lines for --partition host")
+    ap.add_argument("--global-solver", type=str, default="power",
+                   help="Solver blockrank starts from the block start vector (power, gauss_seidel, gmres_solver, anderson_acceleration, adaptive)")
+    ap.add_argument("--inner-beta", type=float, default=0.5,
+                   help="Inner damping factor of inner_outer (must be below --alpha)")
+    ap.add_argument("--inner-tol", type=float, default=1e-2,
+                   help="Inner tolerance of inner_outer")
+    ap.add_argument("--arnoldi-m", type=int, default=8,
+                   help="Krylov vectors (mat-vecs) per Arnoldi cycle of power_arnoldi")
+    ap.add_argument("--arnoldi-keep", type=int, default=2,
+                   help="Ritz vectors power_arnoldi keeps across thick restarts")
+    ap.add_argument("--power-steps", type=int, default=6,
+                   help="Minimum power iterations between Arnoldi cycles of power_arnoldi")
+    ap.add_argument("--relax-workers", type=int, default=None,
+                   help="Worker threads of async_relaxation, at most one per core (default: CPU count)")
+    ap.add_argument("--relax-block", type=int, default=4096,
+                   help="Rows per block update of async_relaxation")
+    ap.add_argument("--cost-history", type=str, action="append", default=None,
+                   help="Benchmark history calibrating the cost model of --algorithm auto (repeatable; default: benchmark_history.jsonl)")
+    ap.add_argument("--compressed", action="store_true",
+                   help="Multiply with the gap/varint-compressed adjacency, decoded on the fly (power, inner_outer, power_arnoldi)")
+    ap.add_argument("--save-compressed", type=str, default=None,
+                   help="Write the loaded graph as a compressed .cgr file, which --graph reads back")
+    ap.add_argument("--export", type=str, default=None,
+                   help="Directory to export full score vectors to, one sub-directory per run (see pagerank.export)")
+    ap.add_argument("--export-format", type=str, default="npy",
+                   choices=["npy", "parquet"],
+                   help="Format for --export: memory-mappable .npy arrays or Parquet (needs pyarrow)")
+    ap.add_argument("--deadline-ms", type=float, default=None,
+                   help="Time budget per solver run in milliseconds; the best iterate so far is returned when it runs out")
+    ap.add_argument("--checkpoint", type=str, default=None,
+                   help="Directory for periodic solver checkpoints, one .npz file per run")
+    ap.add_argument("--checkpoint-every", type=int, default=None,
+                   help="Checkpoint every N iterations (GMRES: restart cycles; default 10 unless --checkpoint-seconds is set)")
+    ap.add_argument("--checkpoint-seconds", type=float, default=None,
+                   help="Checkpoint when this many seconds have passed since the last one")
+    ap.add_argument("--resume", action="store_true",
+                   help="Continue every run from its checkpoint in --checkpoint, if one exists")
+    ap.add_argument("--memory-budget", type=float, default=None,
+                   help="Memory available to the run in MB (default: detected free memory)")
+    ap.add_argument("--memory-policy", type=str, default="warn",
+                   choices=["warn", "downgrade", "abort"],
+                   help="What to do when the memory planner predicts the run will not fit: warn, downgrade parameters (preconditioner, restart, m, limit, drop direct_lu) or abort")
+    ap.add_argument("--no-report", action="store_true",
+                   help="Skip plots and CSV files; only print the comparison table")
+    ap.add_argument("--report-mode", type=str, default="background",
+                   choices=["background", "sync", "deferred"],
+                   help="How to render plots from results.json: in a detached worker process (background), before exiting (sync), or not at all, leaving it to `pagerank report` (deferred)")
+    ap.add_argument("--report-max-points", type=int, default=2000,
+                   help="Downsample residual series to about this many points when plotting")
+    ap.add_argument("--trace", action="store_true",
+                   help="Record per-phase timings and residuals; writes trace.json (Chrome trace format) and time_breakdown.png")
+    ap.add_argument("--trace-memory", action="store_true",
+                   help="Also record bytes allocated per phase (implies --trace, slower)")
     
-    args = ap.parse_args()
+    args = ap.parse_args(argv)
     
+    if args.trace_memory:
+        args.trace = True
+    if args.resume and not args.checkpoint:
+        ap.error("--resume requires --checkpoint")
+    if args.compressed and not transition_policy(args).plain:
+        ap.error("--compressed supports only the default --dedupe, --self-loops and --dangling, without --weighted")
+
     # Validate algorithm choices
-    valid_algorithms = ["power", "gauss_seidel", "gmres_solver", "direct_lu", "anderson_acceleration", "all"]
+    valid_algorithms = available_solvers()
     if args.algorithm == "all":
-        args.algorithms = valid_algorithms[:-1]  # Exclude 'all'
+        # auto would only repeat the run of the solver it selects
+        args.algorithms = [algo for algo in valid_algorithms if algo != "auto"]
     else:
         args.algorithms = [algo.strip() for algo in args.algorithm.split(",")]
-        invalid = [algo for algo in args.algorithms if algo not in valid_algorithms[:-1]]
+        invalid = [algo for algo in args.algorithms if algo not in valid_algorithms]
         if invalid:
-            ap.error(f"Invalid algorithm(s): {', '.join(invalid)}. Valid choices are: {', '.join(valid_algorithms[:-1])}")
+            ap.error(f"Invalid algorithm(s): {', '.join(invalid)}. Valid choices are: {', '.join(valid_algorithms)}")
     
     # Parse omega values
     try:
@@ -79,10 +194,41 @@ def parse_args() -> argparse.Namespace:
     return args
 
 
-def run_algorithm(G: nx.DiGraph, args: argparse.Namespace, omega: float = None) -> Tuple[Dict[int, float], List[float], float]:
+def transition_policy(args: argparse.Namespace):
+    """``TransitionPolicy`` of the --weighted, --dedupe, --self-loops and --dangling options."""
+    from .transition import TransitionPolicy
+
+    return TransitionPolicy(weighted=args.weighted, dedupe=args.dedupe,
+                            self_loops=args.self_loops, dangling=args.dangling)
+
+
+def run_algorithm(G: nx.DiGraph, args: argparse.Namespace, omega: float = None,
+                  tracer: Tracer = None, checkpoint: Checkpointer = None
+                  ) -> Tuple[Dict[int, float], List[float], float]:
     """Run the specified PageRank algorithm."""
-    mod = importlib.import_module(f"pagerank.algorithms.{args.algorithm}")
-    kw = dict(alpha=args.alpha, tol=args.tolerance, max_iter=args.max_iter)
+    import inspect
+
+    mod = get_solver_module(args.algorithm)
+    kw = dict(alpha=args.alpha, tol=args.tolerance, max_iter=args.max_iter, tracer=tracer)
+    args.last_stats = {}
+    params = inspect.signature(mod.pagerank).parameters
+    if "stats" in params:
+        kw["stats"] = args.last_stats
+    if checkpoint is not None:
+        if "checkpoint" in params:
+            kw["checkpoint"] = checkpoint
+        else:
+            logger.warning(f"{args.algorithm} does not support checkpoints; running without")
+    if args.deadline_ms is not None:
+        if "time_budget" in params:
+            kw["time_budget"] = args.deadline_ms / 1000
+        else:
+            logger.warning(f"{args.algorithm} does not support --deadline-ms; running to completion")
+    if args.compressed:
+        if "compressed" in params:
+            kw["compressed"] = True
+        else:
+            logger.warning(f"{args.algorithm} has no compressed kernel; running on CSR")
     
     if args.algorithm == "gauss_seidel":
         if args.omega_strategy == "auto":
@@ -102,65 +248,246 @@ def run_algorithm(G: nx.DiGraph, args: argparse.Namespace, omega: float = None)
         kw.update(permc_spec=args.permc_spec,
                  drop_tol=args.direct_drop_tol)
     elif args.algorithm == "anderson_acceleration":
-        kw["m"] = args.m
+        kw.update(m=args.m, beta=args.anderson_beta, reg=args.anderson_reg,
+                  safeguard=args.anderson_safeguard or None)
         logger.info(f"Using Anderson acceleration with m={args.m}")
+    elif args.algorithm == "monte_carlo":
+        kw.update(walks_per_node=args.walks_per_node, workers=args.mc_workers,
+                  seed=args.seed)
+    elif args.algorithm == "adaptive":
+        kw.update(m=args.m)
+    elif args.algorithm == "blockrank":
+        kw.update(partition=args.partition, n_blocks=args.blocks,
+                  global_solver=args.global_solver)
+        if args.host_map:
+            kw["hosts"] = mod.read_host_map(args.host_map)
+    elif args.algorithm == "inner_outer":
+        kw.update(beta=args.inner_beta, inner_tol=args.inner_tol)
+    elif args.algorithm == "power_arnoldi":
+        kw.update(m=args.arnoldi_m, keep=args.arnoldi_keep, power_steps=args.power_steps)
+    elif args.algorithm == "async_relaxation":
+        kw.update(workers=args.relax_workers, block=args.relax_block)
+    elif args.algorithm == "auto":
+        kw.update(history=args.cost_history,
+                  memory_budget=int(args.memory_budget * 2**20) if args.memory_budget else None)
     
-    return mod.pagerank(G, **kw)
-
-def create_table_image(df: pd.DataFrame, title: str, filename: str, figsize: Tuple[int, int] = (12, 8)):
-    """Create and save a table visualization as an image"""
-    # Create figure with appropriate size
-    fig = plt.figure(figsize=figsize)
-    ax = fig.add_subplot(111)
-    ax.axis('tight')
-    ax.axis('off')
-    
-    # Create table
-    table = ax.table(
-        cellText=df.values,
-        colLabels=df.columns,
-        cellLoc='center',
-        loc='center',
-        colColours=['#f2f2f2']*len(df.columns)  # Header background color
-    )
-    
-    # Adjust table style
-    table.auto_set_font_size(False)
-    table.set_font_size(9)
-    table.scale(1.2, 1.5)
-    
-    # Add title
-    plt.title(title, pad=20, fontsize=12)
-    
-    # Save image
-    plt.savefig(filename, bbox_inches='tight', dpi=300)
-    plt.close()
+    reset_peak_rss()
+    result = mod.pagerank(G, **kw)
+    args.last_peak_rss = peak_rss()
+    if args.last_stats.get("deadline_hit"):
+        logger.warning(f"{args.algorithm} stopped at the {args.deadline_ms:g} ms deadline; "
+                       f"L1 error bound {args.last_stats['error_bound']:.2e}")
+    return result
+
+def check_memory(args: argparse.Namespace) -> None:
+    """Estimate peak memory before loading and apply --memory-policy"""
+    if os.path.exists(args.graph):
+        n_nodes, n_edges = read_graph_size(args.graph)
+    else:
+        from .generators import is_spec, parse_spec
+
+        if not is_spec(args.graph):
+            return
+        spec = parse_spec(args.graph)[1]
+        n_nodes, n_edges = spec["nodes"], spec["edges"]
+    budget = int(args.memory_budget * 2**20) if args.memory_budget else None
+    plan = plan_memory(n_nodes, n_edges, args.algorithms, limit=args.limit, budget=budget,
+                       downgrade=args.memory_policy == "downgrade", restart=args.restart,
+                       preconditioner=args.preconditioner, m=args.m)
+    args.memory_estimates = {algo: max(phases.values())
+                             for algo, phases in plan["solvers"].items()}
+    logger.info(f"Memory plan: load ~{plan['load'] / 2**20:.0f} MB, "
+                + ", ".join(f"{algo} ~{b / 2**20:.0f} MB" for algo, b in args.memory_estimates.items())
+                + (f" (budget {plan['budget'] / 2**20:.0f} MB)" if plan['budget'] else ""))
+    for warning in plan["warnings"]:
+        logger.warning(warning)
+    if not plan["warnings"]:
+        return
+    if args.memory_policy == "abort":
+        raise SystemExit("Aborting: predicted memory use exceeds the budget (see warnings above)")
+    if args.memory_policy == "downgrade":
+        args.algorithms = plan["algorithms"]
+        args.limit = plan["limit"]
+        args.restart = plan["restart"]
+        args.preconditioner = plan["preconditioner"]
+        args.m = plan["m"]
+
+def report_main(argv: List[str] = None) -> None:
+    """`pagerank report <results.json>`: render plots from a finished run"""
+    ap = argparse.ArgumentParser(prog="pagerank report",
+                                 description="Render plots and tables from a results.json file")
+    ap.add_argument("results", type=str, help="Path to results.json written by a previous run")
+    ap.add_argument("--out-dir", type=str, default=None,
+                   help="Output directory (default: directory of the results file)")
+    ap.add_argument("--max-points", type=int, default=2000,
+                   help="Downsample residual series to about this many points")
+    ap.add_argument("--log-level", type=str, default="INFO",
+                   choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                   help="Set the logging level")
+    args = ap.parse_args(argv)
+    setup_logging(args.log_level)
+
+    from .reporting import render_report
+    render_report(args.results, args.out_dir, max_points=args.max_points)
+
+def ppr_main(argv: List[str] = None) -> None:
+    """`pagerank ppr --seeds 1,2`: local-push personalized PageRank of a few nodes"""
+    ap = argparse.ArgumentParser(prog="pagerank ppr",
+                                 description="Personalized PageRank of seed nodes by local push")
+    ap.add_argument("--graph", type=str, default="web-Google.txt",
+                   help="Path to graph file")
+    ap.add_argument("--limit", type=int, default=-1,
+                   help="Limit number of nodes to process (-1 for full graph)")
+    ap.add_argument("--seeds", type=str, required=True,
+                   help="Comma-separated seed node IDs (target nodes with --direction backward)")
+    ap.add_argument("--direction", type=str, default="forward",
+                   choices=["forward", "backward"],
+                   help="forward: PPR of each seed; backward: contribution of every node to each target")
+    ap.add_argument("--alpha", type=float, default=0.85,
+                   help="Damping factor for PageRank")
+    ap.add_argument("--eps", type=float, default=1e-6,
+                   help="Push threshold; cost grows with 1/eps")
+    ap.add_argument("--top", type=int, default=10,
+                   help="Number of highest-scoring nodes to print per seed")
+    ap.add_argument("--workers", type=int, default=1,
+                   help="Worker processes for the batch of seeds")
+    ap.add_argument("--log-level", type=str, default="INFO",
+                   choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                   help="Set the logging level")
+    args = ap.parse_args(argv)
+    setup_logging(args.log_level)
+
+    from .algorithms.local_push import LocalPush, ppr_batch
+    from .graph_io import load_graph
+
+    G = load_graph(args.graph, limit_nodes=args.limit)
+    seeds = [int(s) for s in args.seeds.split(",")]
+    t0 = time.perf_counter()
+    results = ppr_batch(LocalPush.from_graph(G, args.alpha), seeds, eps=args.eps,
+                        direction=args.direction, workers=args.workers)
+    logger.info(f"{len(seeds)} {args.direction} push(es) in {time.perf_counter() - t0:.3f}s")
+    for seed, scores in zip(seeds, results):
+        print(f"\n=== {args.direction} push from {seed} ({len(scores)} nonzero) ===")
+        for node, score in sorted(scores.items(), key=lambda x: x[1], reverse=True)[:args.top]:
+            print(f"Node {node}: {score:.6f}")
+
+def serve_main(argv: List[str] = None) -> None:
+    """`pagerank serve`: keep a graph in memory and answer score/top-k/PPR queries"""
+    ap = argparse.ArgumentParser(prog="pagerank serve",
+                                 description="Serve PageRank queries over HTTP or a Unix socket")
+    ap.add_argument("--graph", type=str, default="web-Google.txt",
+                   help="Path to graph file")
+    ap.add_argument("--limit", type=int, default=-1,
+                   help="Limit number of nodes to process (-1 for full graph)")
+    ap.add_argument("--load-workers", type=int, default=None,
+                   help="Processes used to parse the edge list (default: CPU count)")
+    ap.add_argument("--host", type=str, default="127.0.0.1",
+                   help="Address to listen on")
+    ap.add_argument("--port", type=int, default=8080,
+                   help="TCP port to listen on")
+    ap.add_argument("--socket", type=str, default=None,
+                   help="Listen on this Unix socket instead of TCP")
+    ap.add_argument("--alpha", type=float, default=0.85,
+                   help="Damping factor for PageRank")
+    ap.add_argument("--tolerance", type=float, default=1e-6,
+                   help="Tolerance for convergence")
+    ap.add_argument("--max-iter", type=int, default=100,
+                   help="Maximum number of iterations")
+    add_transition_args(ap)
+    ap.add_argument("--window-ms", type=float, default=5.0,
+                   help="Personalized queries arriving within this window are solved together")
+    ap.add_argument("--max-batch", type=int, default=64,
+                   help="Maximum personalized queries per block solve")
+    ap.add_argument("--log-level", type=str, default="INFO",
+                   choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                   help="Set the logging level")
+    args = ap.parse_args(argv)
+    setup_logging(args.log_level)
+
+    from .graph_io import load_graph
+    from .serve import PageRankService, make_server
 
-def main():
-    args = parse_args()
+    G = load_graph(args.graph, limit_nodes=args.limit, workers=args.load_workers,
+                   policy=transition_policy(args))
+    service = PageRankService(G, alpha=args.alpha, tol=args.tolerance, max_iter=args.max_iter,
+                              window_ms=args.window_ms, max_batch=args.max_batch)
+    del G
+    server = make_server(service, host=args.host, port=args.port, socket_path=args.socket)
+    logger.info(f"Listening on {args.socket or f'http://{args.host}:{args.port}'}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down")
+    finally:
+        server.server_close()
+        service.close()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+def experiment_main(argv: List[str] = None) -> None:
+    """`pagerank experiment <file.json>`: run the cells of an experiment that are not stored yet"""
+    ap = argparse.ArgumentParser(prog="pagerank experiment",
+                                 description="Run a declarative experiment matrix, skipping stored cells")
+    ap.add_argument("config", type=str, help="Experiment file (JSON; see pagerank.experiments)")
+    ap.add_argument("--store", type=str, default="experiments",
+                   help="Directory of stored cells, NetworkX baselines and reports")
+    ap.add_argument("--workers", type=int, default=None,
+                   help="Worker processes (default: CPU count); concurrent runs share memory bandwidth, so use 1 for timings")
+    ap.add_argument("--force", action="store_true",
+                   help="Run every cell again, replacing stored results")
+    ap.add_argument("--dry-run", action="store_true",
+                   help="List the cells and whether they are stored, without running anything")
+    ap.add_argument("--no-report", action="store_true",
+                   help="Do not render reports (pandas and matplotlib are not imported)")
+    ap.add_argument("--max-points", type=int, default=2000,
+                   help="Downsample residual series to about this many points when plotting")
+    ap.add_argument("--log-level", type=str, default="INFO",
+                   choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                   help="Set the logging level")
+    args = ap.parse_args(argv)
     setup_logging(args.log_level)
+
+    from .experiments import run_experiment
+    rows = run_experiment(args.config, store=args.store, workers=args.workers,
+                          report=not args.no_report, force=args.force, dry_run=args.dry_run,
+                          max_points=args.max_points)
+    if rows:
+        print(format_table(rows, list(rows[0])))
+    if any(r["Status"] not in ("stored", "ran", "pending") for r in rows):
+        raise SystemExit(1)
+
+# Subcommands dispatched on the first argument; anything else runs the solvers
+COMMANDS = {
+    "report": report_main,
+    "ppr": ppr_main,
+    "serve": serve_main,
+    "experiment": experiment_main,
+}
+
+def main(argv: List[str] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in COMMANDS:
+        return COMMANDS[argv[0]](argv[1:])
+
+    args = parse_args(argv)
+    setup_logging(args.log_level)
+    
+    import networkx as nx
+    import numpy as np
+    from .graph_io import adjacency_csr, load_graph
+    from .transition import networkx_view
     
     # Create directory for plots
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     plot_dir = f"plots_{timestamp}"
-    os.makedirs(plot_dir, exist_ok=True)
-    logger.info(f"Saving plots to {plot_dir}/")
+    if not args.no_report or args.trace:
+        os.makedirs(plot_dir, exist_ok=True)
+        logger.info(f"Saving plots to {plot_dir}/")
     
-    # DataFrame to store metrics
-    metrics = pd.DataFrame(columns=[
-        'Algorithm', 
-        'Time (s)', 
-        'Residual Norm',
-        'Iterations',
-        'Initial Residual',
-        'Final Residual',
-        'Convergence Rate',
-        'Convergence Type',
-        'Norm Type',
-        'Omega'
-    ])
+    # Rows of the metrics table (columns: METRIC_COLUMNS)
+    metrics = []
     
-    # DataFrame to store top nodes
+    # Rows of the top nodes table
     top_nodes_data = []
     
     logger.info(f"Loading graph from: {args.graph}")
@@ -169,21 +496,53 @@ def main():
     else:
         logger.info(f"Processing graph with node limit: {args.limit}")
     
+    args.memory_estimates = {}
+    check_memory(args)
+
     # Load graph once and reuse
-    G = load_graph(args.graph, limit_nodes=args.limit)
-    logger.info(f"Graph loaded with {G.number_of_nodes()} nodes and {G.number_of_edges()} edges")
-    logger.info(f"Graph density: {nx.density(G):.6f}")
-    logger.info(f"Number of dangling nodes: {sum(1 for n in G if G.out_degree(n) == 0)}")
+    reset_peak_rss()
+    G = load_graph(args.graph, limit_nodes=args.limit, workers=args.load_workers,
+                   policy=transition_policy(args))
+    logger.info(f"Graph loaded with {G.number_of_nodes()} nodes and {G.number_of_edges()} edges "
+                f"(peak RSS {peak_rss() / 2**20:.0f} MB)")
+    if args.save_compressed:
+        from .graph_io import save_compressed
+
+        save_compressed(G, args.save_compressed)
+    n_nodes, n_edges = G.number_of_nodes(), G.number_of_edges()
+    logger.info(f"Graph density: {n_edges / (n_nodes * (n_nodes - 1)) if n_nodes > 1 else 0:.6f}")
+    logger.info(f"Number of dangling nodes: {np.count_nonzero(np.diff(adjacency_csr(G)[1]) == 0)}")
     logger.info(f"Using tolerance: {args.tolerance}, alpha: {args.alpha}")
 
-    # NetworkX reference (run only once)
+    # NetworkX reference (run only once); the DiGraph is built for it alone
     logger.info("Running NetworkX PageRank for comparison...")
+    nx_graph, nx_weight = networkx_view(G)
     t0 = time.perf_counter()
-    nx_scores = nx.pagerank(G, alpha=args.alpha, tol=args.tolerance, max_iter=args.max_iter)
+    nx_scores = nx.pagerank(nx_graph, alpha=args.alpha, tol=args.tolerance, max_iter=args.max_iter,
+                            weight=nx_weight)
+    del nx_graph
     nx_elapsed = time.perf_counter() - t0
 
     # Store results of all algorithms
     all_results = []
+    tracers = []
+
+    def new_tracer(label: str):
+        """Create a tracer for one run when --trace is set"""
+        if not args.trace:
+            return None
+        tracers.append(Tracer(label, track_memory=args.trace_memory))
+        return tracers[-1]
+
+    def new_checkpoint(label: str):
+        """Create the checkpointer of one run when --checkpoint is set"""
+        if not args.checkpoint:
+            return None
+        from .checkpoint import Checkpointer
+
+        return Checkpointer(os.path.join(args.checkpoint, run_name(label) + ".npz"),
+                            every=args.checkpoint_every, seconds=args.checkpoint_seconds,
+                            resume=args.resume)
     
     # Run each algorithm
     for algo in args.algorithms:
@@ -196,7 +555,9 @@ def main():
             if args.omega_strategy in ["fixed", "all"] and len(args.omega_values) > 0:
                 for omega in args.omega_values:
                     logger.info(f"\n--- Testing with fixed omega = {omega:.3f} ---")
-                    scores, residuals, elapsed = run_algorithm(G, args, omega)
+                    label = f"{algo} (fixed ω={omega:.3f})"
+                    scores, residuals, elapsed = run_algorithm(
+                        G, args, omega, tracer=new_tracer(label), checkpoint=new_checkpoint(label))
                     
                     # Store results with omega value
                     all_results.append({
@@ -208,13 +569,17 @@ def main():
                     
                     # Calculate metrics and store results
                     process_results(G, scores, residuals, elapsed, nx_scores, nx_elapsed, 
-                                  metrics, top_nodes_data, algo, omega)
+                                  metrics, top_nodes_data, algo, omega,
+                                  memory=(args.memory_estimates.get(algo), args.last_peak_rss),
+                                  error_bound=args.last_stats.get('error_bound'))
             
             # Run dynamic omega if specified
             if args.omega_strategy in ["dynamic", "all"]:
                 logger.info("\n--- Testing with dynamic omega ---")
                 args.omega_strategy = "dynamic"  # Temporarily change strategy
-                scores, residuals, elapsed = run_algorithm(G, args)
+                scores, residuals, elapsed = run_algorithm(
+                    G, args, tracer=new_tracer(f"{algo} (dynamic ω)"),
+                    checkpoint=new_checkpoint(f"{algo} (dynamic ω)"))
                 
                 # Store results
                 all_results.append({
@@ -226,10 +591,13 @@ def main():
                 
                 # Calculate metrics and store results
                 process_results(G, scores, residuals, elapsed, nx_scores, nx_elapsed, 
-                              metrics, top_nodes_data, algo, None)
+                              metrics, top_nodes_data, algo, None,
+                              memory=(args.memory_estimates.get(algo), args.last_peak_rss),
+                              error_bound=args.last_stats.get('error_bound'))
                 args.omega_strategy = "fixed"  # Reset strategy
         else:
-            scores, residuals, elapsed = run_algorithm(G, args)
+            scores, residuals, elapsed = run_algorithm(G, args, tracer=new_tracer(algo),
+                                                       checkpoint=new_checkpoint(algo))
             
             # Store results
             all_results.append({
@@ -242,29 +610,94 @@ def main():
             # Calculate metrics and store results
             if algo == "anderson_acceleration":
                 process_results(G, scores, residuals, elapsed, nx_scores, nx_elapsed, 
-                              metrics, top_nodes_data, algo, m=args.m)
+                              metrics, top_nodes_data, algo, m=args.m,
+                              memory=(args.memory_estimates.get(algo), args.last_peak_rss),
+                              error_bound=args.last_stats.get('error_bound'))
             else:
                 process_results(G, scores, residuals, elapsed, nx_scores, nx_elapsed, 
-                              metrics, top_nodes_data, algo)
+                              metrics, top_nodes_data, algo,
+                              memory=(args.memory_estimates.get(algo), args.last_peak_rss),
+                              error_bound=args.last_stats.get('error_bound'),
+                              selected=args.last_stats.get('solver') if algo == "auto" else None)
 
-    # Plot and save visualizations
-    plot_convergence_comparison(all_results, f"{plot_dir}/convergence.png")
-    plot_top10_comparison(all_results, nx_scores, f"{plot_dir}/top10_comparison.png")
-    
-    # Save metrics and create tables
-    save_metrics_comparison(metrics, pd.DataFrame(top_nodes_data), plot_dir)
+    if args.export:
+        export_runs(all_results, args)
+
+    trace_path = None
+    if tracers:
+        for tracer in tracers:
+            tracer.close()
+        trace_path = f"{plot_dir}/trace.json"
+        save_chrome_trace(tracers, trace_path)
+        logger.info(f"Saved trace to {trace_path}")
+
+    if not args.no_report:
+        from .reporting import render_in_background, render_report, save_results
+
+        results_path = f"{plot_dir}/results.json"
+        save_results(results_path, all_results, nx_scores, metrics, METRIC_COLUMNS,
+                     top_nodes_data, trace_path=trace_path)
+        if args.report_mode == "sync":
+            render_report(results_path, max_points=args.report_max_points)
+        elif args.report_mode == "background":
+            render_in_background(results_path, max_points=args.report_max_points)
+        else:
+            logger.info(f"Render the report with: pagerank report {results_path}")
 
     # Print metrics comparison table
     print("\n=== Algorithm Comparison ===")
-    print(metrics.to_string(index=False))
+    print(format_table(metrics, METRIC_COLUMNS))
+
+def run_name(label: str) -> str:
+    """File-system safe name of a run label, e.g. 'gauss_seidel (fixed ω=1.000)'"""
+    import re
+
+    return re.sub(r"[^A-Za-z0-9_.=-]+", "_", label.replace("ω", "omega")).strip("_")
+
+def export_runs(all_results: List[Dict], args: argparse.Namespace) -> None:
+    """Export the full score vector of every run to args.export"""
+    from .export import export_scores
+
+    os.makedirs(args.export, exist_ok=True)
+    for result in all_results:
+        name = run_name(result['algorithm'])
+        residuals = result['residuals']
+        metadata = {
+            'algorithm': result['algorithm'],
+            'alpha': args.alpha,
+            'tol': args.tolerance,
+            'max_iter': args.max_iter,
+            'iterations': len(residuals),
+            'residual': float(residuals[-1]) if residuals else None,
+            'elapsed': result['elapsed'],
+            'graph': args.graph,
+            'limit': args.limit,
+        }
+        path = os.path.join(args.export, name)
+        if args.export_format == "parquet":
+            path += ".parquet"
+        export_scores(result['scores'], path, metadata=metadata, fmt=args.export_format)
+
+def format_table(rows: List[dict], columns: List[str]) -> str:
+    """Format rows as a right-aligned plain-text table (like DataFrame.to_string)"""
+    cells = [[str(row[c]) for c in columns] for row in rows]
+    widths = [max([len(c)] + [len(r[i]) for r in cells]) for i, c in enumerate(columns)]
+    lines = [" ".join(c.rjust(w) for c, w in zip(columns, widths))]
+    lines += [" ".join(v.rjust(w) for v, w in zip(r, widths)) for r in cells]
+    return "\n".join(lines)
 
 def process_results(G: nx.DiGraph, scores: Dict[int, float], residuals: List[float], 
                    elapsed: float, nx_scores: Dict[int, float], nx_elapsed: float,
-                   metrics: pd.DataFrame, top_nodes_data: List[dict], 
-                   algo: str, omega: float = None, m: int = None):
-    """Process and store results for a single algorithm run"""
+                   metrics: List[dict], top_nodes_data: List[dict], 
+                   algo: str, omega: float = None, m: int = None,
+                   memory: Tuple[int, int] = (None, None),
+                   error_bound: float = None, selected: str = None):
+    """Process and store results for a single algorithm run (``selected``: solver auto ran)"""
+    import numpy as np
+    from .graph_io import node_list
+
     # L1 distance between vectors (ordered by node list)
-    nodes_order = list(G.nodes())
+    nodes_order = node_list(G)
     vec_custom = np.array([scores[n] for n in nodes_order])
     vec_nx = np.array([nx_scores[n] for n in nodes_order])
     l1_diff = np.abs(vec_custom - vec_nx).sum()
@@ -289,11 +722,14 @@ def process_results(G: nx.DiGraph, scores: Dict[int, float], residuals: List[flo
             algo_name = f"{algo} (fixed ω={omega:.3f})"
     elif algo == "anderson_acceleration":
         algo_name = f"{algo} (m={m})"
+    elif selected:
+        algo_name = f"{algo} ({selected})"
+        algo = selected
     else:
         algo_name = algo
 
     # Store metrics
-    metrics.loc[len(metrics)] = {
+    metrics.append({
         'Algorithm': algo_name,
         'Time (s)': f"{elapsed:.3f}",
         'Residual Norm': "N/A" if algo == "direct_lu" else f"{l1_diff:.6f}",
@@ -302,9 +738,12 @@ def process_results(G: nx.DiGraph, scores: Dict[int, float], residuals: List[flo
         'Final Residual': f"{final_residual:.6e}" if not np.isnan(final_residual) else "N/A",
         'Convergence Rate': f"{convergence_rate:.2f}x" if not np.isnan(convergence_rate) else "N/A",
         'Convergence Type': convergence_type,
-        'Norm Type': 'L1' if algo in ['power', 'gauss_seidel', 'anderson_acceleration'] else 'L2' if algo == 'gmres_solver' else 'N/A',
-        'Omega': f"{omega:.3f}" if algo == "gauss_seidel" and omega is not None else "dynamic" if algo == "gauss_seidel" else "N/A"
-    }
+        'Norm Type': 'L1' if algo in ['power', 'gauss_seidel', 'anderson_acceleration', 'monte_carlo', 'adaptive', 'blockrank', 'inner_outer', 'power_arnoldi', 'async_relaxation'] else 'L2' if algo == 'gmres_solver' else 'N/A',
+        'Omega': f"{omega:.3f}" if algo == "gauss_seidel" and omega is not None else "dynamic" if algo == "gauss_seidel" else "N/A",
+        'Error Bound': f"{error_bound:.6e}" if error_bound is not None else "N/A",
+        'Est. Solver (MB)': f"{memory[0] / 2**20:.1f}" if memory[0] else "N/A",
+        'Peak RSS (MB)': f"{memory[1] / 2**20:.1f}" if memory[1] else "N/A"
+    })
 
     # Store top nodes
     top10 = sorted(scores.items(), key=lambda x: x[1], reverse=True)[:10]
@@ -329,7 +768,7 @@ def process_results(G: nx.DiGraph, scores: Dict[int, float], residuals: List[flo
     if residuals:  # Only show convergence info if residuals exist
         print(f"Initial residual: {residuals[0]:.6f}")
         print(f"Final residual: {residuals[-1]:.6f}")
-        print(f"Convergence rate (final/initial residual): {residuals[0]/residuals[-1]:.2f}x")
+        print(f"Convergence rate (final/initial residual): {convergence_rate:.2f}x")
     else:
         print("Direct method - no iteration residuals available")
 
@@ -0,0 +1,308 @@
+"""
+Compressed adjacency (WebGraph-style gap + varint coding) with an SpMV
+that decodes while it multiplies.
+
+PageRank's y = P·x is a pull over the in-neighbours of every node:
+
+    y_i = Σ_{j → i} x_j / outdeg(j)
+
+``CompressedAdjacency`` stores the sorted in-neighbour list of every node as
+gaps:
+
+• every neighbour but a row's first as s_k − s_{k−1} − 1, which is ≥ 0
+  since lists hold no duplicates
+• the first neighbour of a row as zigzag(s₀ − p), where p is the last
+  neighbour of the row before (the block's first row ID for its first
+  list).  This is small when neighbours have nearby IDs (crawl or BFS
+  order), and it makes a block decode with one prefix sum
+
+The gaps are written as LEB128 varints: 7 bits per byte, with the high bit
+set on every byte but the last of a value.  Rows are grouped into blocks
+of ``block_rows``, each with its own byte range of gaps and of (varint)
+row degrees.  So a block can be decoded on its own, without the rest of
+the graph.
+
+``matvec`` walks the blocks and decodes one block at a time with
+vectorised NumPy, turning varints into gaps and gaps into neighbour IDs.
+It then runs SciPy's CSR mat-vec on that block alone.  Only the
+compressed stream and one decoded block are ever in memory, never the full
+int32/int64 ``indices`` array.
+
+Files (``.cgr``) are uncompressed ``.npz`` archives of these arrays, read
+by ``graph_io.load_graph`` and written by ``graph_io.save_compressed``.
+"""
+
+from __future__ import annotations
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from .algorithms.kernel import PageRankKernel, _csr_matvec
+from .logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Rows per independently decodable block; a decoded block needs
+# ~16 bytes per edge of scratch, so this bounds it to a few MB on web graphs
+BLOCK_ROWS = 1 << 14
+# File suffix of compressed graphs
+SUFFIX = ".cgr"
+FORMAT_VERSION = 1
+
+
+def is_compressed_graph(path: Optional[str]) -> bool:
+    return bool(path) and str(path).endswith(SUFFIX)
+
+
+def varint_encode(values: np.ndarray) -> np.ndarray:
+    """LEB128 bytes of non-negative integers, vectorised over the values."""
+    values = np.asarray(values, dtype=np.uint64)
+    nbytes = np.ones(len(values), dtype=np.int64)
+    rest = values >> np.uint64(7)
+    while rest.any():
+        nbytes += rest > 0
+        rest >>= np.uint64(7)
+    out = np.empty(int(nbytes.sum()), dtype=np.uint8)
+    start = np.cumsum(nbytes) - nbytes
+    for k in range(int(nbytes.max()) if len(values) else 0):
+        sel = np.flatnonzero(nbytes > k)
+        byte = (values[sel] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        byte |= np.where(nbytes[sel] > k + 1, np.uint64(0x80), np.uint64(0))
+        out[start[sel] + k] = byte
+    return out
+
+
+def varint_decode(data: np.ndarray) -> np.ndarray:
+    """Integers (int64) of a LEB128 byte stream."""
+    last = data < 0x80
+    ends = np.flatnonzero(last)
+    starts = np.empty(len(ends), dtype=np.int64)
+    starts[:1] = 0
+    starts[1:] = ends[:-1] + 1
+    out = (data[starts] & 0x7F).astype(np.int64)
+    # One pass per byte position, over the values that are still that long;
+    # most values are one byte, so later passes only touch a few of them
+    sel = np.flatnonzero(~last[starts])
+    k = 1
+    while len(sel):
+        byte = data[starts[sel] + k]
+        out[sel] |= (byte & 0x7F).astype(np.int64) << (7 * k)
+        sel = sel[byte >= 0x80]
+        k += 1
+    return out
+
+
+def _encode_rows(indptr: np.ndarray, indices: np.ndarray, first_row: int) -> np.ndarray:
+    """Gap codes of sorted, duplicate-free rows (see module docstring)."""
+    gaps = np.empty(len(indices), dtype=np.int64)
+    if not len(indices):
+        return varint_encode(gaps)
+    gaps[1:] = indices[1:] - indices[:-1] - 1
+    heads = indptr[:-1][np.diff(indptr) > 0] - indptr[0]
+    # Row heads are coded against the neighbour before them (the block's
+    # first row for the first one), which may be larger: zigzag
+    delta = indices[heads] - np.concatenate(([first_row], indices[heads[1:] - 1]))
+    gaps[heads] = np.where(delta >= 0, 2 * delta, -2 * delta - 1)
+    return varint_encode(gaps)
+
+
+def _decode_rows(codes: np.ndarray, indptr: np.ndarray, first_row: int) -> np.ndarray:
+    """Inverse of ``_encode_rows``: the neighbour IDs of the rows."""
+    t = varint_decode(codes)
+    if not len(t):
+        return t
+    heads = indptr[:-1][np.diff(indptr) > 0] - indptr[0]
+    z = t[heads]
+    # Gaps become steps (gap + 1) and heads signed deltas, so one prefix sum
+    # over the whole block restores the IDs
+    t += 1
+    t[heads] = np.where(z & 1, -((z + 1) >> 1), z >> 1)
+    t[0] += first_row
+    return np.cumsum(t, out=t)
+
+
+class CompressedAdjacency:
+    """
+    Gap/varint-coded in-adjacency of a directed graph, in row blocks.
+
+    Attributes:
+        nodes: Node ID of every row (same order as the CSR it was built from)
+        out_degree: Out-degree of every node (int32)
+        block_rows: Rows per block
+        gaps, gap_offsets: Gap byte stream and the start of every block in it
+        degrees, degree_offsets: Varint in-degrees of the rows, per block
+        nnz: Number of edges
+    """
+
+    def __init__(self, nodes, out_degree, block_rows, gaps, gap_offsets, degrees,
+                 degree_offsets, nnz):
+        self.nodes = nodes
+        self.out_degree = out_degree
+        self.block_rows = int(block_rows)
+        self.gaps = gaps
+        self.gap_offsets = gap_offsets
+        self.degrees = degrees
+        self.degree_offsets = degree_offsets
+        self.nnz = int(nnz)
+        self.n = len(out_degree)
+        self._weights = np.empty(0)
+
+    @classmethod
+    def from_csr(cls, nodes, indptr: np.ndarray, indices: np.ndarray,
+                 block_rows: int = BLOCK_ROWS) -> "CompressedAdjacency":
+        """Compress the out-adjacency (indptr, indices) of a graph."""
+        N = len(indptr) - 1
+        out_degree = np.diff(indptr).astype(np.int32)
+        # In-adjacency: rows of Aᵀ, sorted by the CSR → CSC conversion
+        A = csr_matrix((np.ones(len(indices), dtype=np.int8), indices, indptr), shape=(N, N))
+        T = A.T.tocsr()
+        T.sort_indices()
+        in_ptr, in_idx = T.indptr.astype(np.int64), T.indices.astype(np.int64)
+
+        gap_parts, deg_parts = [], []
+        for lo in range(0, N, block_rows):
+            hi = min(lo + block_rows, N)
+            ptr = in_ptr[lo:hi + 1]
+            gap_parts.append(_encode_rows(ptr, in_idx[ptr[0]:ptr[-1]], lo))
+            deg_parts.append(varint_encode(np.diff(ptr)))
+        gap_offsets = np.zeros(len(gap_parts) + 1, dtype=np.int64)
+        np.cumsum([len(p) for p in gap_parts], out=gap_offsets[1:])
+        degree_offsets = np.zeros(len(deg_parts) + 1, dtype=np.int64)
+        np.cumsum([len(p) for p in deg_parts], out=degree_offsets[1:])
+        empty = np.empty(0, dtype=np.uint8)
+        return cls(np.asarray(nodes), out_degree, block_rows,
+                   np.concatenate(gap_parts or [empty]), gap_offsets,
+                   np.concatenate(deg_parts or [empty]), degree_offsets, len(indices))
+
+    @property
+    def n_blocks(self) -> int:
+        return len(self.gap_offsets) - 1
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of the adjacency streams (without ``nodes``)."""
+        return (self.gaps.nbytes + self.gap_offsets.nbytes + self.degrees.nbytes
+                + self.degree_offsets.nbytes + self.out_degree.nbytes)
+
+    def number_of_nodes(self) -> int:
+        return self.n
+
+    def number_of_edges(self) -> int:
+        return self.nnz
+
+    def decode_block(self, b: int) -> Tuple[int, np.ndarray, np.ndarray]:
+        """(first row, indptr, in-neighbour indices) of block ``b``."""
+        lo = b * self.block_rows
+        deg = varint_decode(self.degrees[self.degree_offsets[b]:self.degree_offsets[b + 1]])
+        indptr = np.zeros(len(deg) + 1, dtype=np.int64)
+        np.cumsum(deg, out=indptr[1:])
+        indices = _decode_rows(self.gaps[self.gap_offsets[b]:self.gap_offsets[b + 1]], indptr, lo)
+        return lo, indptr, indices
+
+    def to_csr(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Decoded out-adjacency (indptr, indices), int64, as given to ``from_csr``."""
+        ptrs, idx = [np.zeros(1, dtype=np.int64)], []
+        for b in range(self.n_blocks):
+            _, indptr, indices = self.decode_block(b)
+            ptrs.append(indptr[1:] + ptrs[-1][-1])
+            idx.append(indices)
+        in_ptr = np.concatenate(ptrs)
+        in_idx = np.concatenate(idx) if idx else np.empty(0, dtype=np.int64)
+        N = self.n
+        T = csr_matrix((np.ones(len(in_idx), dtype=np.int8), in_idx, in_ptr), shape=(N, N))
+        A = T.T.tocsr()
+        A.sort_indices()
+        return A.indptr.astype(np.int64), A.indices.astype(np.int64)
+
+    def matvec(self, x: np.ndarray, out: np.ndarray, scale: float = 1.0,
+               scratch: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        out += scale·P·x with P[i, j] = 1/outdeg(j), decoding block by block.
+
+        ``scratch`` is an optional N-length buffer for x/outdeg.
+        """
+        xs = np.divide(x, self.out_degree, out=scratch if scratch is not None else np.empty(self.n),
+                       where=self.out_degree > 0)
+        for b in range(self.n_blocks):
+            lo, indptr, indices = self.decode_block(b)
+            # Every entry of a row block is `scale`; the weights are reused across blocks
+            if len(self._weights) < len(indices) or (len(self._weights) and self._weights[0] != scale):
+                self._weights = np.full(max(len(indices), len(self._weights)), scale)
+            _csr_matvec(len(indptr) - 1, self.n, indptr, indices, self._weights, xs,
+                        out[lo:lo + len(indptr) - 1])
+        return out
+
+    def save(self, path: str) -> None:
+        """Write the arrays to ``path`` (``.cgr``), atomically."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, version=FORMAT_VERSION, nodes=self.nodes, out_degree=self.out_degree,
+                     block_rows=self.block_rows, gaps=self.gaps, gap_offsets=self.gap_offsets,
+                     degrees=self.degrees, degree_offsets=self.degree_offsets, nnz=self.nnz)
+        os.replace(tmp, path)
+        logger.info(f"Saved compressed graph of {self.n} nodes and {self.nnz} edges to {path} "
+                    f"({self.nbytes / 2**20:.1f} MB, {8 * self.gaps.nbytes / max(self.nnz, 1):.2f} "
+                    f"bits per edge)")
+
+    @classmethod
+    def load(cls, path: str) -> "CompressedAdjacency":
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["version"]) != FORMAT_VERSION:
+                raise ValueError(f"{path}: unsupported compressed graph version {int(data['version'])}")
+            return cls(data["nodes"], data["out_degree"], int(data["block_rows"]), data["gaps"],
+                       data["gap_offsets"], data["degrees"], data["degree_offsets"],
+                       int(data["nnz"]))
+
+
+def read_compressed_size(path: str) -> Tuple[int, int]:
+    """(nodes, edges) of a ``.cgr`` file without reading its streams."""
+    with np.load(path, allow_pickle=False) as data:
+        return len(data["out_degree"]), int(data["nnz"])
+
+
+class CompressedKernel(PageRankKernel):
+    """
+    ``PageRankKernel`` whose α·P·x decodes a ``CompressedAdjacency`` on the
+    fly instead of reading a CSR matrix.
+    """
+
+    def __init__(self, adjacency: CompressedAdjacency, alpha: float = 0.85,
+                 v: Optional[np.ndarray] = None):
+        self.adjacency = adjacency
+        self.n = adjacency.n
+        self.alpha = alpha
+        self.dangling = np.flatnonzero(adjacency.out_degree == 0)
+        self.v = None if v is None else np.asarray(v, dtype=float) / np.sum(v)
+        self._gather = np.empty(len(self.dangling))
+        self._scratch = np.empty(self.n)
+        self._xs = np.empty(self.n)
+
+    def spmv_add(self, x: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """out += α·P·x, decoding one row block at a time."""
+        return self.adjacency.matvec(x, out, self.alpha, scratch=self._xs)
+
+
+def compressed_adjacency(G, block_rows: int = BLOCK_ROWS) -> CompressedAdjacency:
+    """
+    ``CompressedAdjacency`` of G: the one loaded with it (``G.graph["compressed"]``)
+    if its node and edge counts still match, else compressed from
+    ``graph_io.adjacency_csr``.
+
+    The compressed kernel multiplies with the plain 1/out-degree matrix, so
+    graphs loaded with edge weights or other ``TransitionPolicy`` choices
+    raise ValueError.
+    """
+    from .graph_io import adjacency_csr
+    from .transition import graph_policy
+
+    if not graph_policy(G).plain:
+        raise ValueError("The compressed kernel supports only unweighted graphs with the default "
+                         "self-loop and dangling policies")
+    adj = G.graph.get("compressed") if hasattr(G, "graph") else None
+    if (adj is not None and adj.number_of_nodes() == G.number_of_nodes()
+            and adj.number_of_edges() == G.number_of_edges()):
+        return adj
+    nodes, indptr, indices = adjacency_csr(G)
+    return CompressedAdjacency.from_csr(np.asarray(nodes), indptr, indices, block_rows)
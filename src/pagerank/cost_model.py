@@ -0,0 +1,308 @@
+"""
+Cost model behind ``--algorithm auto``: predicts the time and memory of
+each solver on a graph and picks the fastest one that fits.
+
+Features are cheap to extract.  ``graph_features`` reads the CSR kept
+with the graph, counts dangling nodes and in-degrees, and labels the
+strongly connected components with SciPy in O(N + nnz):
+
+• ``nodes``, ``edges`` and the ``dangling`` fraction
+• ``giant_scc``: fraction of the nodes in the largest SCC
+• ``closed_sccs``: SCCs of two or more nodes that no edge leaves.  With
+  two or more, the Google matrix has |λ₂| = α, and power-type methods
+  converge at exactly α (the hard case)
+• ``skew``: largest in-degree over the average degree
+
+Power iteration converges at rate α·μ, with μ = 1 for two or more closed
+SCCs.  Otherwise μ = ``MIXING``·(1 − dangling), since the mass of
+dangling nodes is teleported every step.  K = log(tol/2) / log(α·μ)
+is the predicted number of power iterations.  Anderson acceleration and
+GMRES need about √K, and Gauss-Seidel sweeps contract like α².  Each
+solver's time is a non-negative combination of work terms built from
+these quantities (see ``_terms``).  For power iteration that is edges
+for the matrix build plus K·(edges + nodes).  The LU factorisations of
+GMRES's preconditioner and of ``direct_lu`` grow with the hubs inside
+the giant SCC.  The memory of each solver comes from the memory planner
+(``memory.estimate_solver_bytes``), with the LU fill scaled the same way.
+
+The term coefficients start at ``PRIOR`` (seconds per unit of work on a
+reference machine).  They are calibrated against benchmark history: the
+rows written by ``python -m pagerank.benchmark suite|alpha --history``.
+Each row records a solver's time with the features of its graph.
+Calibration minimises the squared log error of the predictions, which
+weighs over- and under-estimates alike.  A ridge penalty
+``CALIBRATION_WEIGHT``·Σ(c/c₀ − 1)² pulls coefficients the history does
+not determine back to the prior.  It is solved per solver with a few
+Gauss-Newton steps, each a non-negative least-squares problem.
+"""
+
+from __future__ import annotations
+import json
+import math
+import os
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from .logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Solvers considered by --algorithm auto
+CANDIDATES = ("power", "gauss_seidel", "gmres_solver", "direct_lu", "anderson_acceleration")
+# Benchmark history read by default (written by `pagerank.benchmark --history`)
+HISTORY_FILE = "benchmark_history.jsonl"
+# Second eigenvalue of P̄ (relative to α) assumed for graphs without two closed SCCs
+MIXING = 0.5
+# Ridge weight pulling calibrated coefficients towards PRIOR
+CALIBRATION_WEIGHT = 1.0
+# Gauss-Newton steps of the calibration fit
+CALIBRATION_STEPS = 8
+# GMRES restart length and Anderson history size the solvers use by default
+GMRES_RESTART = 30
+ANDERSON_M = 2
+# nnz(L + U) / nnz(A) of splu per unit of the fill proxy _fill (1.2-1.9 on
+# R-MAT and power-law graphs)
+LU_FILL_PER_HUB = 2.0
+
+# Seconds per unit of every work term in _terms, measured with CPython 3.11
+# on one core of a small cloud VM
+PRIOR: Dict[str, Dict[str, float]] = {
+    "power": {"build": 1.7e-6, "iterate": 6.0e-9},
+    "gauss_seidel": {"build": 2.4e-6, "sweep": 8.0e-7},
+    "anderson_acceleration": {"build": 1.3e-6, "iterate": 1.5e-8},
+    "gmres_solver": {"build": 2.0e-6, "factor": 2.5e-7, "krylov": 1.2e-8},
+    "direct_lu": {"build": 2.0e-6, "factor": 2.5e-10},
+}
+
+
+@dataclass
+class GraphFeatures:
+    """Graph properties the cost model predicts from (see module docstring)."""
+
+    nodes: int
+    edges: int
+    dangling: float = 0.0
+    giant_scc: float = 1.0
+    closed_sccs: int = 0
+    skew: float = 1.0
+
+    def as_row(self) -> Dict:
+        return {k: round(v, 4) if isinstance(v, float) else v for k, v in asdict(self).items()}
+
+    @classmethod
+    def from_row(cls, row: Dict) -> "GraphFeatures":
+        """Features of a benchmark history row; missing ones take the defaults."""
+        known = {k: row[k] for k in cls.__dataclass_fields__ if k in row}
+        return cls(**known)
+
+
+def graph_features(G) -> GraphFeatures:
+    """Extract ``GraphFeatures`` from G (an ``nx.DiGraph`` or ``CSRGraph``)."""
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    from .graph_io import adjacency_csr
+
+    nodes, indptr, indices = adjacency_csr(G)
+    N, E = len(nodes), len(indices)
+    if N == 0:
+        return GraphFeatures(0, 0)
+    out_deg = np.diff(indptr)
+    in_deg = np.bincount(indices, minlength=N)
+    A = csr_matrix((np.ones(E, dtype=np.int8), indices, indptr), shape=(N, N))
+    n_scc, labels = connected_components(A, directed=True, connection="strong")
+    sizes = np.bincount(labels, minlength=n_scc)
+    # An SCC is closed if none of its edges leaves it
+    src = np.repeat(labels, out_deg)
+    leaves = np.zeros(n_scc, dtype=bool)
+    leaves[src[labels[indices] != src]] = True
+    closed = int(np.count_nonzero(~leaves & (sizes > 1)))
+    return GraphFeatures(nodes=N, edges=E, dangling=float(np.mean(out_deg == 0)),
+                         giant_scc=float(sizes.max() / N), closed_sccs=closed,
+                         skew=float(in_deg.max() / max(E / N, 1e-12)))
+
+
+def power_iterations(f: GraphFeatures, alpha: float, tol: float) -> float:
+    """Predicted power iterations K to reach ``tol`` (uncapped)."""
+    mu = 1.0 if f.closed_sccs >= 2 else MIXING * (1.0 - f.dangling)
+    rate = min(max(alpha * mu, 1e-3), 1.0 - 1e-9)
+    return max(1.0, math.log(tol / 2) / math.log(rate))
+
+
+def _fill(f: GraphFeatures) -> float:
+    """
+    Fill proxy of (incomplete) LU factors: elimination creates fill among
+    the hubs' neighbours, but only inside cycles, so the degree skew is
+    weighted by the share of the nodes in the giant SCC.
+    """
+    return 1.0 + f.skew * f.giant_scc
+
+
+def _iterations(solver: str, f: GraphFeatures, alpha: float, tol: float, max_iter: int) -> float:
+    """Predicted iterations of ``solver`` (uncapped)."""
+    K = power_iterations(f, alpha, tol)
+    if solver == "gauss_seidel":
+        # Sweeps contract like α² whatever the mixing of the graph
+        return max(1.0, math.log(tol / 2) / (2 * math.log(min(alpha, 1.0 - 1e-9))))
+    if solver == "anderson_acceleration":
+        return math.sqrt(K) * 2
+    if solver == "gmres_solver":
+        # Preconditioned Krylov steps
+        return math.sqrt(K)
+    if solver == "direct_lu":
+        return 1.0
+    return K
+
+
+def converges(solver: str, f: GraphFeatures, alpha: float, tol: float, max_iter: int) -> bool:
+    """Whether ``solver`` is predicted to reach ``tol`` within ``max_iter``."""
+    # max_iter counts restart cycles for GMRES
+    limit = max_iter * GMRES_RESTART if solver == "gmres_solver" else max_iter
+    return _iterations(solver, f, alpha, tol, max_iter) <= limit
+
+
+def _terms(solver: str, f: GraphFeatures, alpha: float, tol: float, max_iter: int) -> Dict[str, float]:
+    """Units of work of each cost term of ``solver`` (keys of ``PRIOR``)."""
+    N, E = f.nodes, f.edges
+    limit = max_iter * GMRES_RESTART if solver == "gmres_solver" else max_iter
+    it = min(_iterations(solver, f, alpha, tol, max_iter), limit)
+    if solver == "gauss_seidel":
+        return {"build": E, "sweep": it * (E + N)}
+    if solver == "anderson_acceleration":
+        return {"build": E, "iterate": it * (E + 2 * ANDERSON_M * N)}
+    if solver == "gmres_solver":
+        return {"build": E, "factor": (E + N) * _fill(f), "krylov": it * (E + GMRES_RESTART * N)}
+    if solver == "direct_lu":
+        return {"build": E, "factor": ((E + N) * _fill(f)) ** 1.5}
+    return {"build": E, "iterate": it * (E + N)}
+
+
+@dataclass
+class Prediction:
+    solver: str
+    seconds: float
+    bytes: int
+    converges: bool
+    fits: bool = True
+    within_budget: bool = True
+
+
+@dataclass
+class CostModel:
+    """Per-solver term coefficients (seconds per unit of work)."""
+
+    coefficients: Dict[str, Dict[str, float]] = field(
+        default_factory=lambda: {s: dict(c) for s, c in PRIOR.items()})
+    samples: Dict[str, int] = field(default_factory=dict)
+
+    def predict(self, solver: str, f: GraphFeatures, alpha: float = 0.85, tol: float = 1e-6,
+                max_iter: int = 100) -> Prediction:
+        from .memory import DEFAULT_LU_FILL, estimate_solver_bytes
+
+        coef = self.coefficients.get(solver, PRIOR["power"])
+        terms = _terms(solver, f, alpha, tol, max_iter)
+        seconds = sum(coef.get(k, 0.0) * v for k, v in terms.items())
+        lu_fill = max(DEFAULT_LU_FILL, LU_FILL_PER_HUB * _fill(f))
+        nbytes = max(estimate_solver_bytes(solver, f.nodes, f.edges, lu_fill=lu_fill).values())
+        return Prediction(solver, seconds, nbytes, converges(solver, f, alpha, tol, max_iter))
+
+    def calibrate(self, rows: Iterable[Dict], weight: float = CALIBRATION_WEIGHT) -> "CostModel":
+        """
+        Fit the coefficients to measured benchmark rows (see module docstring).
+
+        Rows need ``case`` (starting with the solver name), ``median_s``,
+        ``nodes`` and ``edges``; ``alpha``, ``tol``, ``max_iter`` and the
+        ``GraphFeatures`` columns are used when present.
+        """
+        from scipy.optimize import nnls
+
+        by_solver: Dict[str, List[Dict]] = {}
+        for row in rows:
+            solver = str(row.get("case", "")).split()[0] if row.get("case") else ""
+            if (solver in PRIOR and row.get("median_s") and row.get("edges")
+                    and not row.get("skipped")):
+                by_solver.setdefault(solver, []).append(row)
+
+        for solver, sample in by_solver.items():
+            prior = PRIOR[solver]
+            names = list(prior)
+            # Units of work in units of the prior coefficients, and measured times
+            U = np.array([[prior[k] * t[k] for k in names] for t in (
+                _terms(solver, GraphFeatures.from_row(row), row.get("alpha", 0.85),
+                       row.get("tol", 1e-6), row.get("max_iter", 100)) for row in sample)])
+            y = np.array([row["median_s"] for row in sample], dtype=float)
+            ridge = math.sqrt(weight) * np.eye(len(names))
+            w = np.ones(len(names))
+            for _ in range(CALIBRATION_STEPS):
+                # Gauss-Newton step on the log error, linearised around the current fit
+                pred = np.maximum(U @ w, 1e-12)
+                A = np.vstack([U / pred[:, None], ridge])
+                b = np.concatenate([1.0 + np.log(y / pred), ridge @ np.ones(len(names))])
+                w, _ = nnls(A, b)
+            self.coefficients[solver] = {k: prior[k] * wk for k, wk in zip(names, w)}
+            self.samples[solver] = len(sample)
+        return self
+
+    @classmethod
+    def from_history(cls, paths: Optional[Sequence[str]] = None) -> "CostModel":
+        """Prior model calibrated with the benchmark history in ``paths`` (if any exist)."""
+        rows = load_history(paths if paths is not None else [HISTORY_FILE])
+        model = cls()
+        if rows:
+            model.calibrate(rows)
+            logger.debug(f"Cost model calibrated on {sum(model.samples.values())} benchmark rows")
+        return model
+
+
+def load_history(paths: Sequence[str]) -> List[Dict]:
+    """Rows of benchmark history files: JSON lines, or JSON lists saved by ``--json``."""
+    rows: List[Dict] = []
+    for path in paths:
+        if not path or not os.path.exists(path):
+            continue
+        with open(path) as f:
+            text = f.read()
+        if text.lstrip().startswith("["):
+            rows.extend(json.loads(text))
+        else:
+            rows.extend(json.loads(line) for line in text.splitlines() if line.strip())
+    return rows
+
+
+def append_history(path: str, rows: Iterable[Dict]) -> None:
+    """Append benchmark rows to a JSON-lines history file."""
+    # Serialise everything first so a bad row cannot leave a partial record
+    lines = "".join(json.dumps(row) + "\n" for row in rows)
+    with open(path, "a") as f:
+        f.write(lines)
+
+
+def select_solver(
+    f: GraphFeatures,
+    model: CostModel,
+    *,
+    alpha: float = 0.85,
+    tol: float = 1e-6,
+    max_iter: int = 100,
+    candidates: Sequence[str] = CANDIDATES,
+    memory_budget: Optional[int] = None,
+    time_budget: Optional[float] = None,
+) -> List[Prediction]:
+    """
+    Predictions for ``candidates``, best first.
+
+    Solvers whose predicted memory exceeds ``memory_budget`` come last,
+    then those predicted not to converge within ``max_iter``, then those
+    over ``time_budget``.  Within each group they are ordered by predicted
+    time.
+    """
+    predictions = []
+    for solver in candidates:
+        p = model.predict(solver, f, alpha, tol, max_iter)
+        p.fits = memory_budget is None or p.bytes <= memory_budget
+        p.within_budget = time_budget is None or p.seconds <= time_budget
+        predictions.append(p)
+    return sorted(predictions, key=lambda p: (not p.fits, not p.converges, not p.within_budget,
+                                              p.seconds))
@@ -0,0 +1,58 @@
+"""
+Time budgets and certified error bounds for anytime PageRank results.
+
+Every iterative solver accepts ``time_budget`` (seconds).  When the budget
+runs out the solver stops and returns its best iterate so far instead of
+running on to ``tol`` or ``max_iter``.  With ``stats`` it reports how good
+that iterate is.
+
+For the Google matrix G(x) = α·S·x + (1−α)·v, with S column stochastic, G is
+an α-contraction in the L1 norm on probability vectors.  So for any
+probability vector x with residual r = ‖G(x) − x‖₁:
+
+    ‖x − π‖₁ ≤ r / (1 − α)          ‖G(x) − π‖₁ ≤ α·r / (1 − α)
+
+These bounds hold regardless of how x was produced, so they certify the
+output of every solver (iterate clipping and normalisation included).
+"""
+
+from __future__ import annotations
+import time
+from typing import Optional
+
+
+def error_bound(residual: float, alpha: float, stepped: bool = False) -> float:
+    """
+    Certified L1 distance to the exact PageRank vector.
+
+    Args:
+        residual: ‖G(x) − x‖₁ of a probability vector x
+        alpha: Damping factor
+        stepped: The bound is for G(x) rather than x (one α factor tighter)
+    """
+    # Two probability vectors are never more than 2 apart
+    return min(2.0, (alpha if stepped else 1.0) * float(residual) / (1.0 - alpha))
+
+
+class Deadline:
+    """
+    Wall-clock deadline ``budget`` seconds after construction.
+
+    A ``None`` budget never expires, so solvers can check it unconditionally.
+    """
+
+    def __init__(self, budget: Optional[float] = None):
+        self.budget = budget
+        self.start = time.perf_counter()
+        self.hit = False
+
+    def remaining(self) -> float:
+        if self.budget is None:
+            return float("inf")
+        return self.budget - (time.perf_counter() - self.start)
+
+    def expired(self) -> bool:
+        """True once the budget is used up; also records that it was hit."""
+        if self.budget is not None and self.remaining() <= 0.0:
+            self.hit = True
+        return self.hit
@@ -0,0 +1,303 @@
+"""
+Fast parallel reading of SNAP-style edge lists into NumPy arrays.
+
+Plain files are split into byte ranges that end on line boundaries and
+each worker process reads and parses its own range.  ``.gz`` and ``.zst``
+files cannot be split before decompression, so the main process streams
+the decompressed data in blocks cut at the last newline and the workers
+parse the blocks while the next ones are being decompressed.
+
+Each block is parsed by NumPy's C integer reader in a single call, so there
+is no per-line Python or regex work.  Lines starting with ``#`` are
+comments.  Blocks that are not exactly two integers per line fall back to
+a vectorised byte-level parser that keeps the first two integers of each
+line.
+
+Weighted edge lists (``source target weight``) are read with
+``weighted=True``: each block then parses to an (edges, weights) pair, and
+lines without a weight count as weight 1.
+
+``.zst`` input needs the optional ``zstandard`` package.
+"""
+
+from __future__ import annotations
+import gzip
+import io
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Bytes per parse task; small enough to overlap decompression and parsing
+BLOCK_BYTES = 16 << 20
+# Below this (uncompressed) size a process pool costs more than it saves
+PARALLEL_MIN_BYTES = 32 << 20
+
+_NEWLINE, _ZERO, _NINE = ord("\n"), ord("0"), ord("9")
+_SPACE = ord(" ")  # bytes up to this one separate tokens
+_POW10 = 10 ** np.arange(19, dtype=np.int64)
+
+
+def is_compressed(path: str) -> bool:
+    return path.endswith((".gz", ".zst"))
+
+
+def open_edge_list(path: str) -> BinaryIO:
+    """Open a plain, gzip or zstd edge list as a binary stream of text."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".zst"):
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("Reading .zst files requires zstandard (pip install zstandard)") from None
+        f = open(path, "rb")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(f, closefd=True))
+    return open(path, "rb")
+
+
+def _strip_comments(buf: bytes) -> bytes:
+    if buf.startswith(b"#") or b"\n#" in buf:
+        return b"\n".join(line for line in buf.split(b"\n") if not line.startswith(b"#"))
+    return buf
+
+
+def _parse_tokens(buf: bytes) -> np.ndarray:
+    """
+    General vectorised parser: first two digit runs of every line.
+
+    Slower than ``np.fromstring`` but tolerates extra columns, blank lines
+    and stray characters.
+    """
+    data = np.frombuffer(buf, dtype=np.uint8)
+    digit = (data >= _ZERO) & (data <= _NINE)
+    # Token boundaries: [starts[k], ends[k]) is the k-th digit run
+    step = np.diff(digit.view(np.int8), prepend=0, append=0)
+    starts = np.flatnonzero(step == 1)
+    ends = np.flatnonzero(step == -1)
+    if not len(starts):
+        return np.empty((0, 2), dtype=np.int64)
+    if (ends - starts).max() > 18:
+        raise ValueError("Node IDs with more than 18 digits are not supported")
+
+    # value = Σ digit · 10^(distance to the end of its token)
+    idx = np.flatnonzero(digit)
+    token = np.repeat(np.arange(len(starts)), ends - starts)
+    power = _POW10[ends[token] - 1 - idx]
+    values = np.add.reduceat((data[idx] - _ZERO).astype(np.int64) * power,
+                             np.searchsorted(idx, starts))
+
+    # Keep the first two tokens of every line
+    line_of_token = np.searchsorted(np.flatnonzero(data == _NEWLINE), starts)
+    first_idx = np.flatnonzero(np.concatenate(([True], line_of_token[1:] != line_of_token[:-1])))
+    counts = np.diff(np.append(first_idx, len(values)))
+    if (counts < 2).any():
+        raise ValueError("Edge list line with fewer than two node IDs")
+    return np.column_stack((values[first_idx], values[first_idx + 1]))
+
+
+def has_columns(buf: bytes, columns: int) -> bool:
+    """Whether every line of ``buf`` holds exactly ``columns`` whitespace-separated tokens."""
+    if not buf:
+        return False
+    lines = buf.count(b"\n") + (not buf.endswith(b"\n"))
+    data = np.frombuffer(buf, dtype=np.uint8)
+    space = data <= _SPACE
+    # A token starts at a non-space byte that follows a space (or the start)
+    starts = np.flatnonzero(space[:-1] > space[1:]) + 1
+    if not space[0]:
+        starts = np.concatenate(([0], starts))
+    if len(starts) != columns * lines:
+        return False
+    # Line k ends after its last token and before the next line's first
+    ends = np.flatnonzero(data == _NEWLINE)
+    return bool((starts[columns - 1::columns][:len(ends)] < ends).all()
+                and (starts[columns::columns] > ends[:lines - 1]).all())
+
+
+def parse_edges(buf: bytes) -> np.ndarray:
+    """
+    Parse whitespace-separated integer pairs, one edge per line.
+
+    Comment lines are dropped and the rest is handed to NumPy's C
+    whitespace-separated integer reader in one call; its values are
+    trusted only if every line holds exactly two tokens.  Other blocks
+    (extra or missing columns, blank lines, stray text) go through the
+    slower ``_parse_tokens``.
+
+    Returns:
+        (E, 2) int64 array of (source, target)
+    """
+    buf = _strip_comments(buf)
+    lines = buf.count(b"\n") + (not buf.endswith(b"\n"))
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", DeprecationWarning)
+            values = np.fromstring(buf, dtype=np.int64, sep=" ")
+        if len(values) == 2 * lines and has_columns(buf, 2):
+            return values.reshape(-1, 2)
+    except (ValueError, DeprecationWarning):
+        pass
+    return _parse_tokens(buf)
+
+
+def _parse_weighted_lines(body: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    """Line-by-line fallback for blocks mixing weighted and unweighted lines."""
+    rows = [line.split() for line in body.split(b"\n") if line.strip()]
+    if any(len(row) not in (2, 3) for row in rows):
+        raise ValueError("Weighted edge list lines must be 'source target [weight]'")
+    ids = np.array([(int(row[0]), int(row[1])) for row in rows], dtype=np.int64).reshape(-1, 2)
+    weights = np.array([float(row[2]) if len(row) == 3 else 1.0 for row in rows])
+    return ids, weights
+
+
+def parse_weighted_edges(buf: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Parse ``source target weight`` lines; a missing weight counts as 1.
+
+    Blocks where every line has two columns, or every line three, are read
+    by NumPy's C float reader in one call (node IDs must then be integers
+    below 2^53); others go through a slower line-by-line parser.
+
+    Returns:
+        ((E, 2) int64 array of (source, target), (E,) float64 weights)
+    """
+    body = _strip_comments(buf).rstrip()
+    if not body:
+        return np.empty((0, 2), dtype=np.int64), np.empty(0)
+    lines = body.count(b"\n") + 1
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", DeprecationWarning)
+            values = np.fromstring(body, dtype=float, sep=" ")
+    except (ValueError, DeprecationWarning):
+        values = np.empty(0)
+    if len(values) in (2 * lines, 3 * lines) and has_columns(body, len(values) // lines):
+        values = values.reshape(lines, -1)
+        if (np.abs(values[:, :2]) >= 2.0 ** 53).any() or (values[:, :2] % 1).any():
+            raise ValueError("Node IDs must be integers below 2^53")
+        ids = values[:, :2].astype(np.int64)
+        weights = np.ascontiguousarray(values[:, 2]) if values.shape[1] == 3 else np.ones(lines)
+    else:
+        ids, weights = _parse_weighted_lines(body)
+    if not np.isfinite(weights).all() or (weights < 0).any():
+        raise ValueError("Edge weights must be finite and non-negative")
+    return ids, weights
+
+
+def _parse_range(path: str, start: int, end: int, parse=parse_edges):
+    with open(path, "rb") as f:
+        f.seek(start)
+        return parse(f.read(end - start))
+
+
+def _byte_ranges(path: str, parts: int) -> List[Tuple[int, int]]:
+    """Split a plain file into about ``parts`` ranges ending on newlines."""
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, "rb") as f:
+        for k in range(1, parts):
+            pos = max(bounds[-1], size * k // parts)
+            f.seek(pos)
+            f.readline()  # advance to the start of the next line
+            pos = f.tell()
+            if pos >= size:
+                break
+            if pos > bounds[-1]:
+                bounds.append(pos)
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _blocks(stream: BinaryIO, block_bytes: int) -> Iterator[bytes]:
+    """Yield blocks of whole lines from a stream."""
+    tail = b""
+    while True:
+        chunk = stream.read(block_bytes)
+        if not chunk:
+            break
+        chunk = tail + chunk
+        cut = chunk.rfind(b"\n") + 1
+        if cut == 0:
+            tail = chunk
+            continue
+        tail = chunk[cut:]
+        yield chunk[:cut]
+    if tail:
+        yield tail
+
+
+def iter_edge_arrays(
+    path: str,
+    *,
+    workers: Optional[int] = None,
+    block_bytes: int = BLOCK_BYTES,
+    weighted: bool = False,
+) -> Iterator[np.ndarray]:
+    """
+    Parse an edge list block by block, yielding (e, 2) int64 arrays in file order.
+
+    With ``weighted`` every block is an (edges, weights) pair from
+    ``parse_weighted_edges`` instead.
+
+    Blocks are yielded as soon as they are parsed, so a consumer can work
+    on the first edges while the rest of the file is still being read.
+
+    Args:
+        path: Edge-list file
+        workers: Parser processes (default: CPU count; 1 parses in-process)
+        block_bytes: Bytes per parse task
+        weighted: Read a third column of edge weights
+    """
+    parse = parse_weighted_edges if weighted else parse_edges
+    workers = workers or os.cpu_count() or 1
+    compressed = is_compressed(path)
+    size = os.path.getsize(path)
+    if size < (PARALLEL_MIN_BYTES // 4 if compressed else PARALLEL_MIN_BYTES):
+        workers = 1
+
+    if workers == 1:
+        with open_edge_list(path) as f:
+            for block in _blocks(f, block_bytes):
+                yield parse(block)
+    elif not compressed:
+        ranges = _byte_ranges(path, max(workers, -(-size // block_bytes)))
+        with ProcessPoolExecutor(workers) as pool:
+            yield from pool.map(_parse_range, [path] * len(ranges),
+                                [a for a, _ in ranges], [b for _, b in ranges], [parse] * len(ranges))
+    else:
+        # Decompression is sequential; keep at most 2 blocks per worker in flight
+        pending = []
+        with open_edge_list(path) as f, ProcessPoolExecutor(workers) as pool:
+            for block in _blocks(f, block_bytes):
+                pending.append(pool.submit(parse, block))
+                if len(pending) >= 2 * workers:
+                    yield pending.pop(0).result()
+            for p in pending:
+                yield p.result()
+
+
+def read_edge_array(
+    path: str,
+    *,
+    workers: Optional[int] = None,
+    block_bytes: int = BLOCK_BYTES,
+) -> np.ndarray:
+    """
+    Read an edge list (plain, ``.gz`` or ``.zst``) into an (E, 2) int64 array.
+
+    Args:
+        path: Edge-list file
+        workers: Parser processes (default: CPU count; 1 parses in-process)
+        block_bytes: Bytes per parse task
+    """
+    parts = list(iter_edge_arrays(path, workers=workers, block_bytes=block_bytes))
+    edges = np.concatenate(parts) if parts else np.empty((0, 2), dtype=np.int64)
+    logger.debug(f"Parsed {len(edges)} edges from {path}")
+    return edges
@@ -0,0 +1,473 @@
+"""
+Memoized experiment runner (``pagerank experiment <file.json>``).
+
+An experiment file declares a matrix of runs: datasets with their node
+limits, algorithms, a parameter grid shared by all algorithms and
+per-algorithm grids.  Parameter names are those of the CLI options
+(``alpha``, ``tolerance``, ``max_iter``, ``omega``, ``preconditioner``,
+...)::
+
+    {
+      "name": "EC6-EC7",
+      "datasets": [
+        {"graph": "web-Google.txt", "limits": [7500, 15000]},
+        {"graph": "rmat:nodes=1e5,seed=1"}
+      ],
+      "algorithms": ["power", "gauss_seidel"],
+      "grid": {"alpha": [0.85, 0.95]},
+      "params": {"gauss_seidel": [{"omega": [1.0, 1.05, 1.1]},
+                                  {"omega_strategy": "dynamic"}]}
+    }
+
+A dataset entry may override ``algorithms``, ``grid`` and ``params``.
+``reporting-vi/experiments.json`` declares the EC1-EC10 runs.
+
+Every cell, one solver run with one parameter setting on one graph, is
+content-addressed.  Its key is the SHA-256 of the graph's content
+fingerprint, the node limit, the algorithm, its parameters and the package
+version.  Results are stored as ``<store>/cells/<key>.json``.  Cells that
+are already stored are skipped, so re-running an experiment only runs the
+cells that were added or changed.  The NetworkX baseline every cell is
+compared with is memoized the same way, as a score export in
+``<store>/baselines/<key>/``.
+
+The remaining cells are grouped by graph and run on a process pool.  Each
+task loads its graph once for all of its cells.  A graph whose baseline is
+not stored yet runs in a single task, so the baseline is computed once.
+Reports with the same plots and tables as the CLI are rendered per
+comparison group (graph, limit, alpha, tolerance, max_iter) from the
+stored cells.  Each is rendered as soon as the group's last cell is stored,
+and only when the group's set of cells changed since the last render.
+"""
+
+from __future__ import annotations
+import contextlib
+import hashlib
+import io
+import itertools
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from . import __version__
+from .logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+STORE_DIR = "experiments"
+CELL_VERSION = 1
+# Parameters of every cell's key and comparison group; unset ones take the CLI default
+SHARED_PARAMS = ("alpha", "tolerance", "max_iter")
+# Parameters that change how the graph is loaded (``transition.TransitionPolicy``);
+# cells that set them form their own groups, with their own baselines
+GRAPH_PARAMS = ("weighted", "dedupe", "self_loops", "dangling")
+# CLI options the runner sets itself, or that do not change a run's results
+_RESERVED = {
+    "graph", "limit", "algorithm", "load_workers", "log_level", "no_report", "report_mode",
+    "report_max_points", "export", "export_format", "checkpoint", "checkpoint_every",
+    "checkpoint_seconds", "resume", "trace", "trace_memory", "save_compressed",
+}
+
+
+@dataclass(frozen=True)
+class Cell:
+    """One solver run of an experiment: graph, node limit, algorithm and parameters."""
+
+    graph: str
+    limit: int
+    algorithm: str
+    params: Tuple[Tuple[str, Any], ...]
+
+    @property
+    def label(self) -> str:
+        """Algorithm name with the parameters that are not shared by its comparison group."""
+        own = [f"{k}={v}" for k, v in self.params if k not in SHARED_PARAMS + GRAPH_PARAMS]
+        return f"{self.algorithm} ({', '.join(own)})" if own else self.algorithm
+
+    @property
+    def group(self) -> Tuple:
+        """Cells of the same group are compared in one report and share a baseline."""
+        shared = dict(self.params)
+        return ((self.graph, self.limit) + tuple((k, shared[k]) for k in SHARED_PARAMS)
+                + tuple((k, shared[k]) for k in GRAPH_PARAMS if k in shared))
+
+    @property
+    def policy(self):
+        """``TransitionPolicy`` the cell's graph is loaded with."""
+        from .transition import TransitionPolicy
+
+        params = dict(self.params)
+        return TransitionPolicy(**{k: params[k] for k in GRAPH_PARAMS if k in params})
+
+    def argv(self) -> List[str]:
+        """CLI arguments of the run."""
+        argv = ["--graph", self.graph, "--limit", str(self.limit), "--algorithm", self.algorithm]
+        for k, v in self.params:
+            if isinstance(v, bool):
+                argv += [f"--{k.replace('_', '-')}"] if v else []
+            else:
+                argv += [f"--{k.replace('_', '-')}", str(v)]
+        return argv
+
+
+def _digest(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def _write_json(path: str, payload: Any) -> None:
+    """Write JSON atomically, so concurrent workers and readers never see partial files."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(payload, f, default=lambda v: v.item() if hasattr(v, "item") else str(v))
+    os.replace(tmp, path)
+
+
+def _expand(grid: Dict, space: Union[Dict, List[Dict]]) -> Iterator[Dict]:
+    """Parameter settings of the shared ``grid`` times ``space``, a grid or a list of grids."""
+    for sub in space if isinstance(space, list) else [space]:
+        merged = {**grid, **sub}
+        keys = sorted(merged)
+        values = [v if isinstance(v, list) else [v] for v in (merged[k] for k in keys)]
+        for combo in itertools.product(*values):
+            yield dict(zip(keys, combo))
+
+
+def load_experiment(path: str) -> Tuple[str, List[Cell]]:
+    """
+    Expand an experiment file into its cells.
+
+    A dataset entry may override ``algorithms``, ``grid`` and ``params``.
+    An algorithm's ``params`` may be a list of grids, whose cells are
+    concatenated (e.g. fixed omegas and one dynamic-omega run).  Generated
+    graphs must give a ``seed``.
+
+    Returns:
+        Tuple of (experiment name, cells in file order)
+    """
+    from .cli import parse_args
+    from .generators import is_spec, parse_spec
+
+    with open(path) as f:
+        config = json.load(f)
+    name = config.get("name") or os.path.splitext(os.path.basename(path))[0]
+    defaults = vars(parse_args([]))
+
+    cells = []
+    for dataset in config["datasets"]:
+        if isinstance(dataset, str):
+            dataset = {"graph": dataset}
+        # Cells are keyed by the spec, so it must always draw the same graph
+        if is_spec(dataset["graph"]) and "seed" not in parse_spec(dataset["graph"])[1]:
+            raise ValueError(f"Generated graph {dataset['graph']!r} in {path} needs a seed= "
+                             f"so its stored cells can be reused")
+        grid = {**config.get("grid", {}), **dataset.get("grid", {})}
+        per_algorithm = {**config.get("params", {}), **dataset.get("params", {})}
+        for limit in dataset.get("limits", config.get("limits", [-1])):
+            for algorithm in dataset.get("algorithms", config.get("algorithms")):
+                for setting in _expand(grid, per_algorithm.get(algorithm, {})):
+                    unknown = [k for k in setting if k not in defaults or k in _RESERVED]
+                    if unknown:
+                        raise ValueError(f"Unknown or reserved parameter(s) in {path}: "
+                                         f"{', '.join(unknown)}")
+                    if setting.get("omega_strategy") == "all":
+                        raise ValueError("omega_strategy 'all' is two runs; "
+                                         "give a list of grids with 'fixed' and 'dynamic' instead")
+                    params = {k: defaults[k] for k in SHARED_PARAMS}
+                    params.update(setting)
+                    cell = Cell(dataset["graph"], int(limit), algorithm, tuple(sorted(params.items())))
+                    # Normalise values through the CLI parser (e.g. "0.85" and 0.85)
+                    args = parse_args(cell.argv())
+                    cells.append(Cell(cell.graph, cell.limit, algorithm,
+                                      tuple((k, getattr(args, k)) for k, _ in cell.params)))
+    return name, cells
+
+
+def graph_fingerprint(graph: str, cache: Dict[str, List]) -> str:
+    """
+    Content hash of a graph file, or the spec of a generated graph.
+
+    File hashes are cached by path, size and modification time, so a file
+    is read again only when it changed.
+    """
+    from .generators import is_spec, parse_spec
+
+    if is_spec(graph):
+        name, kwargs = parse_spec(graph)
+        return _digest({"generator": name, **{k: str(v) for k, v in kwargs.items()}})
+    path = os.path.abspath(graph)
+    st = os.stat(path)
+    cached = cache.get(path)
+    if cached and cached[:2] == [st.st_size, st.st_mtime_ns]:
+        return cached[2]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    cache[path] = [st.st_size, st.st_mtime_ns, h.hexdigest()]
+    return cache[path][2]
+
+
+def cell_key(cell: Cell, fingerprint: str) -> str:
+    return _digest({"graph": fingerprint, "limit": cell.limit, "algorithm": cell.algorithm,
+                    "params": cell.params, "version": __version__})
+
+
+def baseline_key(cell: Cell, fingerprint: str) -> str:
+    return _digest({"graph": fingerprint, "limit": cell.limit, "networkx": cell.group[2:],
+                    "version": __version__})
+
+
+# Graph of the last task in this worker process, reused by the next task on the same graph
+_GRAPH: Dict[Tuple, Any] = {}
+
+
+def _load(cell: Cell, load_workers: Optional[int]):
+    from .graph_io import load_graph
+
+    key = (cell.graph, cell.limit, cell.policy)
+    if key not in _GRAPH:
+        _GRAPH.clear()
+        _GRAPH[key] = load_graph(cell.graph, limit_nodes=cell.limit, workers=load_workers,
+                                 policy=cell.policy)
+    return _GRAPH[key]
+
+
+def _baseline(G, cell: Cell, key: str, store: str) -> Tuple[Dict, float]:
+    """NetworkX scores and time of the cell's group, from the store or computed and stored."""
+    import networkx as nx
+    from .export import ScoreReader, export_scores
+    from .transition import networkx_view
+
+    path = os.path.join(store, "baselines", key)
+    if not os.path.exists(os.path.join(path, "meta.json")):
+        shared = dict(cell.params)
+        view, weight = networkx_view(G)
+        t0 = time.perf_counter()
+        scores = nx.pagerank(view, alpha=shared["alpha"], tol=shared["tolerance"],
+                             max_iter=shared["max_iter"], weight=weight)
+        elapsed = time.perf_counter() - t0
+        tmp = f"{path}.{os.getpid()}.tmp"
+        export_scores(scores, tmp, metadata={"algorithm": "networkx", "elapsed": elapsed,
+                                             "graph": cell.graph, "limit": cell.limit})
+        try:
+            os.replace(tmp, path)
+        except OSError:
+            # Another task stored the same baseline first
+            shutil.rmtree(tmp, ignore_errors=True)
+    reader = ScoreReader(path)
+    return dict(zip(reader.nodes.tolist(), reader.scores.tolist())), reader.metadata["elapsed"]
+
+
+def run_cells(task: List[Tuple[Cell, str, str]], store: str,
+              load_workers: Optional[int] = None) -> List[Tuple[str, Optional[str]]]:
+    """
+    Run cells of one graph and store their results (worker entry point).
+
+    Args:
+        task: (cell, cell key, baseline key) of cells with the same graph, limit
+            and transition policy
+        store: Store directory
+        load_workers: Parser processes for loading the graph
+
+    Returns:
+        (cell key, error message or None) of every cell
+    """
+    from .cli import parse_args, process_results, run_algorithm
+    from .reporting import _top_k
+
+    G = _load(task[0][0], load_workers)
+    done = []
+    for cell, key, bkey in task:
+        try:
+            nx_scores, nx_elapsed = _baseline(G, cell, bkey, store)
+            args = parse_args(cell.argv())
+            args.algorithm = cell.algorithm
+            logger.info(f"Running {cell.label} on {cell.graph} (limit {cell.limit})")
+            scores, residuals, elapsed = run_algorithm(G, args)
+            fixed = cell.algorithm == "gauss_seidel" and args.omega_strategy == "fixed"
+            metrics, top_nodes = [], []
+            with contextlib.redirect_stdout(io.StringIO()):
+                process_results(G, scores, residuals, elapsed, nx_scores, nx_elapsed,
+                                metrics, top_nodes, cell.algorithm,
+                                args.omega_values[0] if fixed else None, m=args.m,
+                                memory=(None, args.last_peak_rss),
+                                error_bound=args.last_stats.get("error_bound"),
+                                selected=args.last_stats.get("solver"))
+            for row in metrics + top_nodes:
+                row["Algorithm"] = cell.label
+            _write_json(os.path.join(store, "cells", f"{key}.json"), {
+                "version": CELL_VERSION,
+                "key": key,
+                "graph": cell.graph,
+                "limit": cell.limit,
+                "algorithm": cell.algorithm,
+                "params": dict(cell.params),
+                "label": cell.label,
+                "baseline": bkey,
+                "elapsed": float(elapsed),
+                "residuals": [float(x) for x in residuals],
+                "top": _top_k(scores, 10),
+                "metrics": metrics[0],
+                "top_nodes": top_nodes,
+                "stats": args.last_stats,
+                "finished": datetime.now().isoformat(timespec="seconds"),
+            })
+            done.append((key, None))
+        except Exception as e:
+            logger.error(f"{cell.label} on {cell.graph} failed: {e!r}")
+            done.append((key, repr(e)))
+    return done
+
+
+def load_cell(store: str, key: str) -> Optional[Dict]:
+    """Stored result of a cell, or None if it has not run."""
+    path = os.path.join(store, "cells", f"{key}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        payload = json.load(f)
+    return payload if payload.get("version") == CELL_VERSION else None
+
+
+def render_group(store: str, name: str, group: Tuple, keys: Sequence[str],
+                 max_points: int = 2000) -> Optional[str]:
+    """
+    Render the report of one comparison group from its stored cells.
+
+    Nothing is rendered if no cell is stored, or if the report already
+    shows exactly the stored cells.
+
+    Returns:
+        The report directory if it was rendered
+    """
+    from .cli import METRIC_COLUMNS, run_name
+    from .export import ScoreReader
+    from .reporting import render_report, save_results
+
+    cells = [c for c in (load_cell(store, k) for k in keys) if c]
+    if not cells:
+        return None
+    graph, limit = group[:2]
+    slug = run_name(f"{os.path.basename(graph)}_{'full' if limit == -1 else limit}_"
+                    + "_".join(f"{k}={v}" for k, v in group[2:]))
+    out_dir = os.path.join(store, "reports", run_name(name), slug)
+    manifest = os.path.join(out_dir, "cells.json")
+    stored = sorted(c["key"] for c in cells)
+    if os.path.exists(manifest):
+        with open(manifest) as f:
+            if json.load(f) == stored:
+                return None
+    os.makedirs(out_dir, exist_ok=True)
+    nx_top = dict(ScoreReader(os.path.join(store, "baselines", cells[0]["baseline"])).top(10))
+    runs = [{"algorithm": c["label"], "elapsed": c["elapsed"], "residuals": c["residuals"],
+             "scores": {node: score for node, score in c["top"]}} for c in cells]
+    results_path = os.path.join(out_dir, "results.json")
+    save_results(results_path, runs, nx_top, [c["metrics"] for c in cells], METRIC_COLUMNS,
+                 [row for c in cells for row in c["top_nodes"]])
+    render_report(results_path, max_points=max_points)
+    _write_json(manifest, stored)
+    return out_dir
+
+
+def run_experiment(
+    path: str,
+    store: str = STORE_DIR,
+    workers: Optional[int] = None,
+    report: bool = True,
+    force: bool = False,
+    dry_run: bool = False,
+    max_points: int = 2000,
+) -> List[Dict]:
+    """
+    Run the cells of an experiment file that are not stored yet.
+
+    Args:
+        path: Experiment file (see module docstring)
+        store: Directory of stored cells, baselines and reports
+        workers: Worker processes (default: CPU count; 1 runs in this process)
+        report: Render the report of each comparison group when its cells are stored
+        force: Run all cells again, replacing stored results
+        dry_run: Only list the cells and whether they are stored
+        max_points: Residual series are downsampled to about this many points in plots
+
+    Returns:
+        One summary row per cell
+    """
+    name, cells = load_experiment(path)
+    for sub in ("cells", "baselines"):
+        os.makedirs(os.path.join(store, sub), exist_ok=True)
+    fp_path = os.path.join(store, "fingerprints.json")
+    fp_cache = {}
+    if os.path.exists(fp_path):
+        with open(fp_path) as f:
+            fp_cache = json.load(f)
+    fingerprints = {g: graph_fingerprint(g, fp_cache) for g in dict.fromkeys(c.graph for c in cells)}
+    _write_json(fp_path, fp_cache)
+
+    keys = [cell_key(c, fingerprints[c.graph]) for c in cells]
+    status = {k: "stored" if not force and load_cell(store, k) else "pending" for k in keys}
+    pending = [(c, k, baseline_key(c, fingerprints[c.graph]))
+               for c, k in zip(cells, keys) if status[k] == "pending"]
+    pending = list({k: (c, k, b) for c, k, b in pending}.values())
+    logger.info(f"Experiment {name}: {len(set(keys))} cells, {len(set(keys)) - len(pending)} stored, "
+                f"{len(pending)} to run")
+
+    groups: Dict[Tuple, List[str]] = {}
+    for c, k in zip(cells, keys):
+        groups.setdefault(c.group, []).append(k)
+
+    if not dry_run:
+        workers = workers or os.cpu_count() or 1
+        # Tasks: cells of one graph; split across workers once the graph's baselines are stored
+        by_graph: Dict[Tuple, List] = {}
+        for item in pending:
+            by_graph.setdefault((item[0].graph, item[0].limit, item[0].policy), []).append(item)
+        tasks = []
+        for items in by_graph.values():
+            stored = all(os.path.exists(os.path.join(store, "baselines", b, "meta.json"))
+                         for _, _, b in items)
+            n_tasks = min(len(items), -(-workers // len(by_graph))) if stored else 1
+            tasks += [items[i::n_tasks] for i in range(n_tasks)]
+        remaining = {g: sum(1 for _, k, _ in pending if k in set(ks)) for g, ks in groups.items()}
+
+        def finished(task_keys: Sequence[str]) -> None:
+            for g, ks in groups.items():
+                remaining[g] -= sum(1 for k in task_keys if k in ks)
+                if report and remaining[g] == 0:
+                    remaining[g] = -1
+                    out_dir = render_group(store, name, g, ks, max_points)
+                    if out_dir:
+                        logger.info(f"Report of {out_dir} updated")
+
+        # Groups with nothing to run only need their report brought up to date
+        finished([])
+        if workers == 1 or len(tasks) <= 1:
+            for task in tasks:
+                results = run_cells(task, store)
+                status.update((k, err or "ran") for k, err in results)
+                finished([k for k, _ in results])
+        elif tasks:
+            with ProcessPoolExecutor(min(workers, len(tasks))) as pool:
+                # Graphs are loaded with one parser process per task
+                futures = [pool.submit(run_cells, task, store, 1) for task in tasks]
+                for future in as_completed(futures):
+                    results = future.result()
+                    status.update((k, err or "ran") for k, err in results)
+                    finished([k for k, _ in results])
+
+    rows = []
+    for c, k in zip(cells, keys):
+        stored = load_cell(store, k) if not dry_run else None
+        metrics = stored["metrics"] if stored else {}
+        rows.append({"Cell": k[:12], "Graph": c.graph, "Limit": c.limit, "Run": c.label,
+                     "Time (s)": metrics.get("Time (s)", "N/A"),
+                     "Iterations": metrics.get("Iterations", "N/A"),
+                     "Residual Norm": metrics.get("Residual Norm", "N/A"),
+                     "Status": status[k]})
+    return rows
+
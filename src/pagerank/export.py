@@ -0,0 +1,171 @@
+"""
+Columnar export of full PageRank score vectors.
+
+An export is a directory of plain ``.npy`` files that readers open with
+``np.load(mmap_mode='r')``, so looking up one node or the top-N never loads
+the graph or the whole vector:
+
+    nodes.npy    int64   node ID at each position
+    scores.npy   float64 score at each position
+    ranks.npy    int64   1-based rank at each position
+    order.npy    int64   positions sorted by descending score (top-k index)
+    index.npy    int64   node ID -> position, -1 if absent   (dense IDs)
+      or
+    sorted_ids.npy / sorted_pos.npy  for binary search     (sparse IDs)
+    meta.json            alpha, tol, algorithm, residual, ...
+
+With ``fmt="parquet"`` a single ``scores.parquet`` (node, score, rank; rows
+in rank order) is written instead.  This needs the optional ``pyarrow``
+package.
+"""
+
+from __future__ import annotations
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+EXPORT_VERSION = 1
+# Use a direct-address index when node IDs are at most this many times N
+DENSE_INDEX_FACTOR = 4
+
+
+def _ranked_arrays(scores: Dict) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    try:
+        nodes = np.fromiter(scores.keys(), dtype=np.int64, count=len(scores))
+    except (TypeError, ValueError):
+        raise ValueError("Columnar export needs integer node IDs") from None
+    values = np.fromiter(scores.values(), dtype=np.float64, count=len(scores))
+    # Ties broken by node ID so exports are deterministic
+    order = np.lexsort((nodes, -values))
+    ranks = np.empty(len(order), dtype=np.int64)
+    ranks[order] = np.arange(1, len(order) + 1)
+    return nodes, values, ranks, order
+
+
+def export_scores(
+    scores: Dict[int, float],
+    path: str,
+    *,
+    metadata: Optional[dict] = None,
+    top_k: Optional[int] = None,
+    fmt: str = "npy",
+) -> None:
+    """
+    Write a full score vector with its rank index.
+
+    Args:
+        scores: Node -> score (integer node IDs)
+        path: Output directory (``npy``) or file (``parquet``)
+        metadata: Run parameters to store, e.g. alpha, tol, algorithm, residual
+        top_k: Length of the sorted index (default: all nodes)
+        fmt: "npy" (memory-mappable arrays) or "parquet"
+    """
+    nodes, values, ranks, order = _ranked_arrays(scores)
+    if top_k is not None:
+        order = order[:top_k]
+    meta = {
+        "version": EXPORT_VERSION,
+        "n": int(len(nodes)),
+        "top_k": int(len(order)),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        **(metadata or {}),
+    }
+
+    if fmt == "parquet":
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet export requires pyarrow (pip install pyarrow)") from None
+        full_order = np.argsort(ranks)
+        table = pa.table({"node": nodes[full_order], "score": values[full_order],
+                          "rank": ranks[full_order]})
+        table = table.replace_schema_metadata({"pagerank": json.dumps(meta)})
+        pq.write_table(table, path)
+        logger.info(f"Exported {len(nodes)} scores to {path}")
+        return
+    if fmt != "npy":
+        raise ValueError(f"Unknown export format {fmt!r}")
+
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, "nodes.npy"), nodes)
+    np.save(os.path.join(path, "scores.npy"), values)
+    np.save(os.path.join(path, "ranks.npy"), ranks)
+    np.save(os.path.join(path, "order.npy"), order.astype(np.int64))
+
+    if len(nodes) and nodes.min() >= 0 and nodes.max() < DENSE_INDEX_FACTOR * len(nodes):
+        index = np.full(int(nodes.max()) + 1, -1, dtype=np.int64)
+        index[nodes] = np.arange(len(nodes))
+        np.save(os.path.join(path, "index.npy"), index)
+        meta["index"] = "dense"
+    else:
+        by_id = np.argsort(nodes, kind="stable")
+        np.save(os.path.join(path, "sorted_ids.npy"), nodes[by_id])
+        np.save(os.path.join(path, "sorted_pos.npy"), by_id.astype(np.int64))
+        meta["index"] = "sorted"
+
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2, default=lambda v: v.item() if hasattr(v, "item") else str(v))
+    logger.info(f"Exported {len(nodes)} scores to {path}/")
+
+
+class ScoreReader:
+    """
+    Read-only, memory-mapped access to an ``npy`` export.
+
+    ``score``/``rank`` are O(1) for dense node IDs (O(log N) otherwise) and
+    ``top(n)`` is O(n) for n within the stored top-k index.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.metadata = json.load(f)
+        if self.metadata.get("version") != EXPORT_VERSION:
+            raise ValueError(f"Unsupported export version {self.metadata.get('version')!r}")
+        load = lambda name: np.load(os.path.join(path, name), mmap_mode="r")
+        self.nodes = load("nodes.npy")
+        self.scores = load("scores.npy")
+        self.ranks = load("ranks.npy")
+        self.order = load("order.npy")
+        if self.metadata["index"] == "dense":
+            self._index = load("index.npy")
+        else:
+            self._sorted_ids = load("sorted_ids.npy")
+            self._sorted_pos = load("sorted_pos.npy")
+
+    def __len__(self) -> int:
+        return int(self.metadata["n"])
+
+    def position(self, node: int) -> int:
+        """Position of ``node`` in the arrays; raises KeyError if absent."""
+        if self.metadata["index"] == "dense":
+            pos = int(self._index[node]) if 0 <= node < len(self._index) else -1
+        else:
+            i = int(np.searchsorted(self._sorted_ids, node))
+            found = i < len(self._sorted_ids) and self._sorted_ids[i] == node
+            pos = int(self._sorted_pos[i]) if found else -1
+        if pos < 0:
+            raise KeyError(node)
+        return pos
+
+    def score(self, node: int) -> float:
+        return float(self.scores[self.position(node)])
+
+    def rank(self, node: int) -> int:
+        return int(self.ranks[self.position(node)])
+
+    def top(self, n: int = 10) -> List[Tuple[int, float]]:
+        """The ``n`` highest-scoring (node, score) pairs in rank order."""
+        if n <= len(self.order):
+            pos = np.asarray(self.order[:n])
+        else:
+            pos = np.argsort(self.ranks)[:n]
+        return list(zip(self.nodes[pos].tolist(), self.scores[pos].tolist()))
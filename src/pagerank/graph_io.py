@@ -1,52 +1,120 @@
 import networkx as nx
-import pandas as pd
 import numpy as np
 from pathlib import Path
-from typing import Optional, Set
+from typing import TYPE_CHECKING, List, Optional, Set, Tuple
 from .logging_utils import get_logger
 
+if TYPE_CHECKING:
+    from .csr_loader import CSRGraph
+    from .transition import TransitionPolicy
+
 logger = get_logger(__name__)
 
-def load_graph(path_txt: str | None = None, limit_nodes: int | None = None) -> nx.DiGraph:
+def load_graph(
+    path_txt: str | None = None,
+    limit_nodes: int | None = None,
+    workers: int | None = None,
+    policy: "TransitionPolicy | None" = None,
+) -> "nx.DiGraph | CSRGraph":
     """
     Load a directed graph from a SNAP `web-Google.txt`‑style edge‑list.
+    Plain, `.gz` and `.zst` files are read directly (see `edge_list`).
+    A generator spec such as `rmat:nodes=875713,edges=5105039,seed=1`
+    builds a synthetic graph instead (see `generators`).  A `.cgr` file
+    written by `save_compressed` is decoded, and its compressed adjacency
+    is kept in `G.graph["compressed"]` for the solvers' `compressed` option.
     If `path_txt` is None or missing, fall back to Karate Club graph
     converted to a digraph for demo purposes.
+
+    Loaded graphs are returned as the `csr_loader.CSRGraph`, which every
+    solver accepts; building the `nx.DiGraph` (one dict per edge) takes
+    several times longer than reading the file, so it is left to the
+    callers that need one (see `graph_from_csr`).
     
     If limit_nodes is specified:
     - If positive: Keep the largest strongly connected component and limit to N nodes
+      (an `nx.DiGraph`)
     - If -1: Process the full graph
     - If None: Use the full graph
+
+    `workers` is the number of parser processes (default: CPU count).
+
+    `policy` (a `transition.TransitionPolicy`) says whether the edge list
+    has a weight column and how repeated edges are reduced; it is kept in
+    `G.graph["transition"]` so every solver builds the same transition
+    matrix (see `transition.transition_matrix`).
     """
-    if path_txt and Path(path_txt).exists():
-        G = nx.DiGraph()
-        logger.info("Reading graph file using pandas...")
-        
-        # Read file in chunks for better memory efficiency
-        chunk_size = 100000  # Adjust based on available memory
-        for chunk in pd.read_csv(path_txt, 
-                               sep='\s+',  # whitespace separator
-                               comment='#',  # skip comment lines
-                               header=None,  # no header
-                               names=['source', 'target'],  # column names
-                               dtype={'source': np.int32, 'target': np.int32},  # specify dtypes
-                               chunksize=chunk_size):
-            # Add edges from chunk to graph
-            edges = list(zip(chunk['source'], chunk['target']))
-            G.add_edges_from(edges)
+    from .compressed import is_compressed_graph
+    from .generators import is_spec
+    from .transition import TransitionPolicy
+
+    policy = policy or TransitionPolicy()
+
+    compressed = None
+    if is_compressed_graph(path_txt) and Path(path_txt).exists():
+        from .compressed import CompressedAdjacency
+        from .csr_loader import CSRGraph
+
+        logger.info("Reading compressed graph file...")
+        compressed = CompressedAdjacency.load(path_txt)
+        if policy.weighted:
+            logger.warning("Compressed graph files carry no edge weights; all edges weigh 1")
+        csr = CSRGraph(compressed.nodes, *compressed.to_csr())
+    elif path_txt and Path(path_txt).exists():
+        from .csr_loader import load_csr
+
+        logger.info("Reading graph file...")
+        csr = load_csr(path_txt, workers=workers, weighted=policy.weighted, dedupe=policy.dedupe)
+    elif is_spec(path_txt):
+        from .csr_loader import build_csr
+        from .generators import generate_edges
+
+        logger.info(f"Generating graph {path_txt}...")
+        csr = build_csr([generate_edges(path_txt)], dedupe=policy.dedupe)
+    else:
+        csr = None
+
+    if csr is not None:
+        csr.graph["transition"] = policy
+        if compressed is not None:
+            csr.graph["compressed"] = compressed
         
         if limit_nodes and limit_nodes > 0:
-            G = get_largest_component(G, limit_nodes)
+            return get_largest_component(graph_from_csr(csr), limit_nodes)
         
-        return G
+        return csr
     # fallback
-    return nx.DiGraph(nx.karate_club_graph())
+    G = nx.DiGraph(nx.karate_club_graph())
+    G.graph["transition"] = policy
+    return G
+
+def graph_from_csr(csr: "CSRGraph") -> nx.DiGraph:
+    """DiGraph of a ``CSRGraph``, keeping the CSR for the solvers (see adjacency_csr)."""
+    G = csr.to_networkx()
+    G.graph["csr"] = csr
+    return G
+
+def save_compressed(G: nx.DiGraph, path: str, block_rows: int | None = None) -> None:
+    """Write G as a compressed `.cgr` graph (see `compressed.CompressedAdjacency`)."""
+    from .compressed import BLOCK_ROWS, CompressedAdjacency
+
+    nodes, indptr, indices = adjacency_csr(G)
+    adj = CompressedAdjacency.from_csr(np.asarray(nodes), indptr, indices, block_rows or BLOCK_ROWS)
+    adj.save(path)
+
+def node_list(G) -> List:
+    """Nodes of G (an ``nx.DiGraph`` or ``CSRGraph``) in the solvers' order."""
+    from .csr_loader import CSRGraph
+
+    return G.nodes.tolist() if isinstance(G, CSRGraph) else list(G.nodes())
 
 def get_largest_component(G: nx.DiGraph, limit_nodes: int) -> nx.DiGraph:
     """Get the largest strongly connected component and optionally limit its size"""
     logger.info("Finding largest strongly connected component...")
     largest_scc = max(nx.strongly_connected_components(G), key=len)
     G = G.subgraph(largest_scc).copy()
+    G.graph.pop("csr", None)
+    G.graph.pop("compressed", None)
     
     # If still too many nodes, use BFS sampling
     if len(G) > limit_nodes:
@@ -65,4 +133,31 @@ def bfs_sample(G: nx.DiGraph, limit_nodes: int) -> nx.DiGraph:
         bfs_nodes.add(node)
         if len(bfs_nodes) >= limit_nodes:
             break
-    return G.subgraph(bfs_nodes).copy() 
\ No newline at end of file
+    return G.subgraph(bfs_nodes).copy()
+
+def adjacency_csr(G: nx.DiGraph) -> Tuple[List, np.ndarray, np.ndarray]:
+    """
+    Node list and CSR out-adjacency (indptr, indices) of G.
+
+    Row i lists the positions of the successors of ``nodes[i]``; both arrays
+    are int64.  Graphs from ``load_graph`` carry the CSR built while loading
+    in ``G.graph["csr"]``, which is returned without walking the edges as
+    long as the node and edge counts still match.  ``G`` may also be a
+    ``csr_loader.CSRGraph``.
+    """
+    from scipy.sparse import csr_matrix
+    from .csr_loader import CSRGraph
+
+    csr = G if isinstance(G, CSRGraph) else G.graph.get("csr")
+    if (csr is not None and csr.number_of_nodes() == G.number_of_nodes()
+            and csr.number_of_edges() == G.number_of_edges()):
+        return csr.nodes.tolist(), csr.indptr, csr.indices
+
+    nodes = list(G.nodes())
+    index = {n: i for i, n in enumerate(nodes)}
+    N, E = len(nodes), G.number_of_edges()
+    src = np.fromiter((index[u] for u, _ in G.edges()), dtype=np.int64, count=E)
+    dst = np.fromiter((index[v] for _, v in G.edges()), dtype=np.int64, count=E)
+    A = csr_matrix((np.ones(E, dtype=np.int8), (src, dst)), shape=(N, N))
+    A.sum_duplicates()
+    return nodes, A.indptr.astype(np.int64), A.indices.astype(np.int64)
@@ -22,18 +22,53 @@ def plot_residuals(residuals: List[float], title: Optional[str] = None) -> None:
     plt.grid(True)
     plt.legend()
 
-def plot_convergence_comparison(all_results: List[Dict], save_path: str) -> None:
+def downsample_series(values: List[float], max_points: int = 2000) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce a long series to at most ~max_points points for plotting.
+    
+    The series is split into max_points/2 buckets and the minimum and maximum
+    of every bucket are kept (plus the first and last point), so spikes and
+    the overall envelope survive while rendering time stays bounded.
+    
+    Args:
+        values: Series to reduce (e.g. residual history)
+        max_points: Upper bound on the number of points returned
+        
+    Returns:
+        Tuple of (x indices, y values)
+    """
+    y = np.asarray(values, dtype=float)
+    n = len(y)
+    if n <= max_points:
+        return np.arange(n), y
+    buckets = max(1, max_points // 2)
+    size = -(-n // buckets)  # ceil division
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(buckets, size)
+    rows = np.arange(buckets)[~np.all(np.isnan(padded), axis=1)]
+    blocks = padded[rows]
+    offsets = rows * size
+    idx = np.concatenate(([0, n - 1],
+                          offsets + np.nanargmin(blocks, axis=1),
+                          offsets + np.nanargmax(blocks, axis=1)))
+    idx = np.unique(idx)
+    return idx, y[idx]
+
+def plot_convergence_comparison(all_results: List[Dict], save_path: str, max_points: int = 2000) -> None:
     """
     Plot convergence comparison for multiple algorithms.
     
     Args:
         all_results: List of dictionaries containing algorithm results
         save_path: Path to save the plot
+        max_points: Residual series longer than this are downsampled
     """
     plt.figure(figsize=(12, 6))
     for result in all_results:
         if result['residuals']:  # Only plot if residuals exist
-            plt.semilogy(result['residuals'], label=result['algorithm'].capitalize())
+            x, y = downsample_series(result['residuals'], max_points)
+            plt.semilogy(x, y, label=result['algorithm'].capitalize())
     plt.grid(True)
     plt.xlabel('Iteration')
     plt.ylabel('Residual (log scale)')
@@ -150,4 +185,35 @@ def save_metrics_comparison(metrics: pd.DataFrame, top_nodes_df: pd.DataFrame, p
     #     "Top 10 Nodes Comparison",
     #     f"{plot_dir}/top_nodes_table.png",
     #     figsize=(20, 12)
-    # ) 
\ No newline at end of file
+    # ) 
+def plot_time_breakdown(summaries: List[Tuple[str, Dict[str, Dict[str, float]]]], save_path: str) -> None:
+    """
+    Plot a stacked bar chart of per-phase wall time for each traced run.
+    
+    Args:
+        summaries: List of (run name, phase summary) pairs, as returned by
+            ``Tracer.summary`` or ``tracing.load_summaries``
+        save_path: Path to save the plot
+    """
+    phases = []
+    for _, summary in summaries:
+        for name in summary:
+            if name not in phases:
+                phases.append(name)
+
+    plt.figure(figsize=(12, max(3, 0.6 * len(summaries) + 2)))
+    y = np.arange(len(summaries))
+    left = np.zeros(len(summaries))
+    for name in phases:
+        widths = np.array([summary.get(name, {}).get('time', 0.0) for _, summary in summaries])
+        plt.barh(y, widths, left=left, label=name)
+        left += widths
+
+    plt.yticks(y, [label.capitalize() for label, _ in summaries])
+    plt.xlabel('Wall time (s)')
+    plt.title('Time Breakdown by Phase')
+    plt.legend()
+    plt.grid(True, axis='x')
+    plt.tight_layout()
+    plt.savefig(save_path, bbox_inches='tight', dpi=300)
+    plt.close()
@@ -0,0 +1,141 @@
+"""
+Serialized run results and off-critical-path report rendering.
+
+``cli.main`` writes everything the report needs (residual histories, top-k
+scores, metrics rows, trace file) to ``results.json``.  The PNG/CSV report is
+then rendered from that file, either in-process, in a detached worker
+process, or later with ``pagerank report <results.json>``.
+"""
+
+from __future__ import annotations
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional
+from .logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+RESULTS_VERSION = 1
+
+
+def _to_json(value):
+    """json.dump fallback for NumPy scalars (node IDs are often np.int32)."""
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+def _top_k(scores: Dict, k: int) -> List[List]:
+    top = sorted(scores.items(), key=lambda x: x[1], reverse=True)[:k]
+    return [[_to_json(node) if not isinstance(node, (int, str)) else node, float(score)]
+            for node, score in top]
+
+
+def save_results(
+    path: str,
+    all_results: List[Dict],
+    nx_scores: Dict,
+    metrics: List[dict],
+    metric_columns: List[str],
+    top_nodes_data: List[dict],
+    trace_path: Optional[str] = None,
+    top_k: int = 10,
+) -> None:
+    """
+    Serialize the results of one CLI run to JSON.
+
+    Only the top ``top_k`` scores of each run are kept; that is all the
+    report plots need.  Residual histories are stored in full so the
+    renderer can decide how to downsample them.
+    """
+    runs = [{
+        "algorithm": r["algorithm"],
+        "elapsed": float(r["elapsed"]),
+        "residuals": [float(x) for x in r["residuals"]],
+        "top": _top_k(r["scores"], top_k),
+    } for r in all_results]
+    payload = {
+        "version": RESULTS_VERSION,
+        "runs": runs,
+        "networkx_top": _top_k(nx_scores, top_k),
+        "metric_columns": metric_columns,
+        "metrics": metrics,
+        "top_nodes": top_nodes_data,
+        "trace": os.path.basename(trace_path) if trace_path else None,
+    }
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(payload, f, default=_to_json)
+    os.replace(tmp, path)
+
+
+def load_results(path: str) -> Dict:
+    """Load a results file written by ``save_results``."""
+    with open(path) as f:
+        payload = json.load(f)
+    if payload.get("version") != RESULTS_VERSION:
+        raise ValueError(f"Unsupported results version {payload.get('version')!r} in {path}")
+    return payload
+
+
+def render_report(results_path: str, out_dir: Optional[str] = None, max_points: int = 2000) -> None:
+    """
+    Render convergence/top-10/metrics/time-breakdown plots from a results file.
+
+    Args:
+        results_path: Path to ``results.json``
+        out_dir: Output directory (default: the directory of ``results_path``)
+        max_points: Residual series are downsampled to about this many points
+    """
+    import pandas as pd
+    from .plotting import (
+        plot_convergence_comparison,
+        plot_time_breakdown,
+        plot_top10_comparison,
+        save_metrics_comparison
+    )
+
+    payload = load_results(results_path)
+    base_dir = os.path.dirname(os.path.abspath(results_path))
+    out_dir = out_dir or base_dir
+    os.makedirs(out_dir, exist_ok=True)
+
+    all_results = [{
+        "algorithm": run["algorithm"],
+        "scores": {node: score for node, score in run["top"]},
+        "residuals": run["residuals"],
+        "elapsed": run["elapsed"],
+    } for run in payload["runs"]]
+    nx_scores = {node: score for node, score in payload["networkx_top"]}
+
+    plot_convergence_comparison(all_results, f"{out_dir}/convergence.png", max_points=max_points)
+    plot_top10_comparison(all_results, nx_scores, f"{out_dir}/top10_comparison.png")
+    save_metrics_comparison(pd.DataFrame(payload["metrics"], columns=payload["metric_columns"]),
+                            pd.DataFrame(payload["top_nodes"]), out_dir)
+
+    if payload.get("trace"):
+        from .tracing import load_summaries
+        trace_file = os.path.join(base_dir, payload["trace"])
+        if os.path.exists(trace_file):
+            plot_time_breakdown(load_summaries(trace_file), f"{out_dir}/time_breakdown.png")
+    logger.info(f"Report written to {out_dir}/")
+
+
+def render_in_background(results_path: str, max_points: int = 2000) -> subprocess.Popen:
+    """
+    Render the report in a detached worker process and return immediately.
+
+    The worker runs ``python -m pagerank.cli report`` in its own session, so
+    it keeps going after the calling process exits.  Its output goes to
+    ``report.log`` next to the results file.
+    """
+    log_path = os.path.join(os.path.dirname(os.path.abspath(results_path)), "report.log")
+    with open(log_path, "w") as log:
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "pagerank.cli", "report", results_path,
+             "--max-points", str(max_points)],
+            stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    logger.info(f"Rendering report in background (pid {proc.pid}, log: {log_path})")
+    return proc
@@ -0,0 +1,343 @@
+"""
+Long-running PageRank query service (``pagerank serve``).
+
+The graph is loaded and the transition matrix built once; global scores are
+computed at start-up and kept in memory with their ranking.  The service
+answers over HTTP (TCP or a Unix socket), JSON in and out:
+
+    GET  /score?node=12            {"node": 12, "score": ..., "rank": ...}
+    GET  /top?k=10                 {"top": [[node, score], ...]}
+    GET  /ppr?seeds=1,2&k=10       personalized PageRank, top-k
+    POST /ppr  {"seeds": [1, 2], "k": 10}
+    GET  /metrics                  latency p50/p99, throughput, batch sizes
+    GET  /health
+
+Personalized queries are coalesced: a batcher thread collects the queries
+that arrive within ``window_ms`` of the first one (up to ``max_batch``) and
+solves them together with one block power iteration, X ← α·(P·X + d·X) +
+(1-α)·V, where every column of V is one query's personalization vector.
+One sparse matrix-times-block product per iteration replaces ``b`` separate
+SpMVs.
+"""
+
+from __future__ import annotations
+import json
+import os
+import queue
+import socketserver
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from .logging_utils import get_logger
+from .transition import transition_matrix
+
+logger = get_logger(__name__)
+
+# Latency samples kept per endpoint for the percentiles
+LATENCY_WINDOW = 10000
+
+
+def block_pagerank(
+    P: csr_matrix,
+    dangling: np.ndarray,
+    V: np.ndarray,
+    *,
+    alpha: float = 0.85,
+    tol: float = 1e-6,
+    max_iter: int = 100,
+) -> Tuple[np.ndarray, int]:
+    """
+    Personalized PageRank for every column of V at once.
+
+    Args:
+        P: Column-stochastic transition matrix (dangling columns empty)
+        dangling: Boolean mask of dangling nodes
+        V: N × b personalization vectors (columns sum to 1); dangling mass
+            is redistributed by the same vectors
+        alpha, tol, max_iter: As for the solvers; ``tol`` applies to the
+            L1 change of every column
+
+    Returns:
+        (N × b scores, iterations)
+    """
+    X = V.copy()
+    teleport = (1.0 - alpha) * V
+    for it in range(1, max_iter + 1):
+        X_new = P @ X
+        X_new += V * X[dangling].sum(axis=0)
+        X_new *= alpha
+        X_new += teleport
+        res = np.abs(X_new - X).sum(axis=0)
+        X = X_new
+        if res.max() < tol:
+            break
+    return X / X.sum(axis=0), it
+
+
+class _Metrics:
+    """Thread-safe per-endpoint latency and throughput counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.latency: Dict[str, deque] = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+        self.count: Dict[str, int] = defaultdict(int)
+        self.errors = 0
+        self.batches: deque = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, endpoint: str, seconds: float, ok: bool = True) -> None:
+        with self._lock:
+            self.latency[endpoint].append(seconds)
+            self.count[endpoint] += 1
+            self.errors += not ok
+
+    def record_batch(self, size: int, seconds: float, iterations: int) -> None:
+        with self._lock:
+            self.batches.append((size, seconds, iterations))
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            uptime = time.time() - self.started
+            endpoints = {}
+            for name, samples in self.latency.items():
+                ms = np.asarray(samples) * 1e3
+                endpoints[name] = {
+                    "count": self.count[name],
+                    "p50_ms": round(float(np.percentile(ms, 50)), 3),
+                    "p99_ms": round(float(np.percentile(ms, 99)), 3),
+                    "throughput_rps": round(self.count[name] / uptime, 3),
+                }
+            sizes = [b[0] for b in self.batches]
+            return {
+                "uptime_s": round(uptime, 1),
+                "requests": sum(self.count.values()),
+                "errors": self.errors,
+                "throughput_rps": round(sum(self.count.values()) / uptime, 3),
+                "endpoints": endpoints,
+                "ppr_batches": {
+                    "count": len(sizes),
+                    "mean_size": round(float(np.mean(sizes)), 2) if sizes else 0.0,
+                    "max_size": max(sizes, default=0),
+                    "mean_solve_ms": round(float(np.mean([b[1] for b in self.batches])) * 1e3, 3)
+                                     if sizes else 0.0,
+                },
+            }
+
+
+class PageRankService:
+    """
+    In-memory PageRank state and query logic, independent of the transport.
+
+    Args:
+        G: Graph to serve
+        alpha, tol, max_iter: Solver parameters for global and personalized scores
+        window_ms: How long the batcher waits for more personalized queries
+        max_batch: Maximum personalized queries per block solve
+    """
+
+    def __init__(
+        self,
+        G,
+        *,
+        alpha: float = 0.85,
+        tol: float = 1e-6,
+        max_iter: int = 100,
+        window_ms: float = 5.0,
+        max_batch: int = 64,
+    ):
+        self.alpha, self.tol, self.max_iter = alpha, tol, max_iter
+        self.window = window_ms / 1e3
+        self.max_batch = max_batch
+        self.metrics = _Metrics()
+
+        t0 = time.perf_counter()
+        # Column-stochastic P: the solvers' matrix, with G's weights and policy
+        self.nodes, self.P, self.dangling = transition_matrix(G)
+        self.index = {n: i for i, n in enumerate(self.nodes)}
+        N = len(self.nodes)
+        self.update_scores()
+        logger.info(f"Service ready: {N} nodes, global scores in "
+                     f"{time.perf_counter() - t0:.2f}s")
+
+        self._queue: "queue.Queue[Optional[Tuple[np.ndarray, Future]]]" = queue.Queue()
+        self._batcher = threading.Thread(target=self._batch_loop, name="ppr-batcher", daemon=True)
+        self._batcher.start()
+
+    def update_scores(self) -> None:
+        """(Re)compute the global scores and their ranking."""
+        N = len(self.nodes)
+        x, _ = block_pagerank(self.P, self.dangling, np.full((N, 1), 1.0 / N),
+                              alpha=self.alpha, tol=self.tol, max_iter=self.max_iter)
+        self.scores = x[:, 0]
+        self.order = np.argsort(-self.scores, kind="stable")
+        self.ranks = np.empty(N, dtype=np.int64)
+        self.ranks[self.order] = np.arange(1, N + 1)
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._batcher.join()
+
+    def _position(self, node) -> int:
+        try:
+            return self.index[node]
+        except KeyError:
+            raise KeyError(f"Unknown node {node!r}") from None
+
+    def score(self, node: Hashable) -> Dict:
+        i = self._position(node)
+        return {"node": node, "score": float(self.scores[i]), "rank": int(self.ranks[i])}
+
+    def top(self, k: int = 10) -> List[Tuple[Hashable, float]]:
+        return [(self.nodes[i], float(self.scores[i])) for i in self.order[:k]]
+
+    def ppr(self, seeds: Sequence[Hashable], k: int = 10, timeout: Optional[float] = None
+            ) -> List[Tuple[Hashable, float]]:
+        """Top-k personalized PageRank for a uniform distribution over ``seeds``."""
+        if not seeds:
+            raise ValueError("At least one seed is required")
+        positions = np.array([self._position(s) for s in seeds])
+        future: Future = Future()
+        self._queue.put((positions, future))
+        x = future.result(timeout)
+        top = np.argsort(-x)[:k]
+        return [(self.nodes[i], float(x[i])) for i in top]
+
+    def _batch_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.perf_counter() + self.window
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.perf_counter()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+            self._solve(batch)
+
+    def _solve(self, batch: List[Tuple[np.ndarray, Future]]) -> None:
+        t0 = time.perf_counter()
+        V = np.zeros((len(self.nodes), len(batch)))
+        for j, (positions, _) in enumerate(batch):
+            V[positions, j] += 1.0 / len(positions)
+        try:
+            X, iterations = block_pagerank(self.P, self.dangling, V, alpha=self.alpha,
+                                           tol=self.tol, max_iter=self.max_iter)
+        except Exception as exc:  # hand the failure to every waiting request
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+        for j, (_, future) in enumerate(batch):
+            future.set_result(X[:, j])
+        self.metrics.record_batch(len(batch), time.perf_counter() - t0, iterations)
+        logger.debug(f"Solved {len(batch)} personalized queries in {iterations} iterations")
+
+
+class _MissingParameter(Exception):
+    pass
+
+
+class _Params(dict):
+    def __missing__(self, key):
+        raise _MissingParameter(key)
+
+
+def _parse_node(value: str):
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service: PageRankService  # set on the server-specific subclass
+
+    def address_string(self) -> str:
+        # Unix-socket clients have no (host, port) address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug("%s - %s" % (self.address_string(), format % args))
+
+    def _reply(self, status: int, payload: Dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _dispatch(self, params: Dict) -> None:
+        params = _Params(params)
+        t0 = time.perf_counter()
+        endpoint = urlparse(self.path).path.rstrip("/") or "/"
+        status = 200
+        try:
+            if endpoint == "/score":
+                payload = self.service.score(_parse_node(params["node"]))
+            elif endpoint == "/top":
+                payload = {"top": self.service.top(int(params.get("k", 10)))}
+            elif endpoint == "/ppr":
+                seeds = params["seeds"]
+                if isinstance(seeds, str):
+                    seeds = seeds.split(",")
+                seeds = [_parse_node(str(s)) for s in seeds]
+                payload = {"seeds": seeds, "top": self.service.ppr(seeds, int(params.get("k", 10)))}
+            elif endpoint == "/metrics":
+                payload = self.service.metrics.snapshot()
+            elif endpoint == "/health":
+                payload = {"status": "ok", "nodes": len(self.service.nodes)}
+            else:
+                status, payload = 404, {"error": f"Unknown endpoint {endpoint}"}
+        except _MissingParameter as exc:
+            status, payload = 400, {"error": f"Missing parameter {exc.args[0]!r}"}
+        except KeyError as exc:
+            status, payload = 404, {"error": str(exc.args[0])}
+        except (ValueError, TypeError) as exc:
+            status, payload = 400, {"error": str(exc)}
+        self._reply(status, payload)
+        if endpoint not in ("/metrics", "/health"):
+            self.service.metrics.record(endpoint, time.perf_counter() - t0, ok=status == 200)
+
+    def do_GET(self) -> None:
+        query = parse_qs(urlparse(self.path).query)
+        self._dispatch({key: values[-1] for key, values in query.items()})
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            params = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError as exc:
+            self._reply(400, {"error": f"Invalid JSON: {exc}"})
+            return
+        self._dispatch(params if isinstance(params, dict) else {})
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(service: PageRankService, *, host: str = "127.0.0.1", port: int = 8080,
+                socket_path: Optional[str] = None) -> socketserver.BaseServer:
+    """HTTP server for ``service`` on host:port, or on a Unix socket if ``socket_path``."""
+    handler = type("Handler", (_Handler,), {"service": service})
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        return _UnixHTTPServer(socket_path, handler)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
@@ -0,0 +1,203 @@
+"""
+Per-iteration instrumentation for the PageRank solvers.
+
+Every solver accepts an optional ``tracer`` keyword.  When it is omitted the
+solver uses ``NULL_TRACER`` whose methods are no-ops, so the disabled path
+costs one attribute lookup and an empty context manager per phase.
+
+A real ``Tracer`` records:
+    • wall time of every named phase (matrix build, SpMV, residual, ...)
+    • number of matrix-vector products
+    • bytes allocated inside each phase (optional, via ``tracemalloc``)
+    • the residual reached at every iteration
+
+and exports the result either as plain JSON or in the Chrome trace-event
+format (open with ``chrome://tracing`` or https://ui.perfetto.dev).
+"""
+
+from __future__ import annotations
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+_NULL_CONTEXT = nullcontext()
+
+
+class NullTracer:
+    """Tracer that records nothing.  Used when tracing is disabled."""
+
+    enabled = False
+
+    def phase(self, name: str):
+        return _NULL_CONTEXT
+
+    def matvec(self, n: int = 1) -> None:
+        pass
+
+    def iteration(self, residual: float) -> None:
+        pass
+
+    def annotate(self, **metadata) -> None:
+        pass
+
+
+NULL_TRACER = NullTracer()
+
+
+class Tracer(NullTracer):
+    """
+    Collects phase timings, mat-vec counts, allocations and residuals.
+
+    Args:
+        name: Label of the traced run (shown as process name in Chrome traces)
+        track_memory: Measure bytes allocated per phase with ``tracemalloc``.
+            This slows NumPy allocations down noticeably, so it is off by default.
+    """
+
+    enabled = True
+
+    def __init__(self, name: str = "pagerank", track_memory: bool = False):
+        self.name = name
+        self.track_memory = track_memory
+        self.phases: List[Dict] = []
+        self.iterations: List[Dict] = []
+        self.metadata: Dict = {}
+        self.matvecs = 0
+        self._t0 = time.perf_counter()
+        self._last_iter = self._t0
+        self._depth = 0
+        self._peak_stack: List[List[int]] = []
+        self._started_tracemalloc = False
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def close(self) -> None:
+        """Stop ``tracemalloc`` if this tracer started it."""
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def _now(self) -> float:
+        return time.perf_counter() - self._t0
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = self._now()
+        if self.track_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # Keep the enclosing phase's peak before resetting for this one
+            if self._peak_stack:
+                self._peak_stack[-1][1] = max(self._peak_stack[-1][1], peak)
+            tracemalloc.reset_peak()
+            self._peak_stack.append([current, current])
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            event = {"name": name, "start": start,
+                     "duration": self._now() - start, "depth": self._depth}
+            if self.track_memory:
+                base, seen = self._peak_stack.pop()
+                peak = max(seen, tracemalloc.get_traced_memory()[1])
+                event["bytes"] = peak - base
+                if self._peak_stack:
+                    self._peak_stack[-1][1] = max(self._peak_stack[-1][1], peak)
+            self.phases.append(event)
+
+    def matvec(self, n: int = 1) -> None:
+        self.matvecs += n
+
+    def iteration(self, residual: float) -> None:
+        now = time.perf_counter()
+        record = {"iteration": len(self.iterations), "time": now - self._t0,
+                  "duration": now - self._last_iter,
+                  "residual": float(residual), "matvecs": self.matvecs}
+        if self.track_memory:
+            record["bytes"] = tracemalloc.get_traced_memory()[0]
+        self.iterations.append(record)
+        self._last_iter = now
+
+    def annotate(self, **metadata) -> None:
+        self.metadata.update(metadata)
+
+    # ------------------------------------------------------------------ export
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Total time, call count and allocated bytes per top-level phase name."""
+        totals: Dict[str, Dict[str, float]] = {}
+        for ev in self.phases:
+            if ev["depth"]:
+                continue
+            t = totals.setdefault(ev["name"], {"time": 0.0, "calls": 0, "bytes": 0})
+            t["time"] += ev["duration"]
+            t["calls"] += 1
+            t["bytes"] += ev.get("bytes", 0)
+        return totals
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "matvecs": self.matvecs,
+            "metadata": self.metadata,
+            "summary": self.summary(),
+            "phases": self.phases,
+            "iterations": self.iterations,
+        }
+
+    def save_json(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def chrome_events(self, pid: int = 1) -> List[Dict]:
+        """Return this trace as a list of Chrome trace events."""
+        events = [{"name": "process_name", "ph": "M", "pid": pid,
+                   "args": {"name": self.name}}]
+        for ev in self.phases:
+            args = {"depth": ev["depth"]}
+            if "bytes" in ev:
+                args["bytes"] = ev["bytes"]
+            events.append({"name": ev["name"], "ph": "X", "pid": pid, "tid": 1,
+                           "ts": ev["start"] * 1e6, "dur": ev["duration"] * 1e6,
+                           "args": args})
+        for it in self.iterations:
+            events.append({"name": "residual", "ph": "C", "pid": pid,
+                           "ts": it["time"] * 1e6, "args": {"residual": it["residual"]}})
+            events.append({"name": "matvecs", "ph": "C", "pid": pid,
+                           "ts": it["time"] * 1e6, "args": {"matvecs": it["matvecs"]}})
+        return events
+
+
+def save_chrome_trace(tracers: Sequence[Tracer], path: str) -> None:
+    """Write several tracers into one Chrome trace file, one process per run."""
+    events: List[Dict] = []
+    for pid, tracer in enumerate(tracers, 1):
+        events.extend(tracer.chrome_events(pid))
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+def load_summaries(path: str) -> List[Tuple[str, Dict[str, Dict[str, float]]]]:
+    """
+    Rebuild per-phase totals from a Chrome trace written by ``save_chrome_trace``.
+
+    Returns:
+        List of (run name, summary) pairs in the same shape as ``Tracer.summary``.
+    """
+    with open(path) as f:
+        events = json.load(f)["traceEvents"]
+    names: Dict[int, str] = {}
+    totals: Dict[int, Dict[str, Dict[str, float]]] = {}
+    for ev in events:
+        if ev["ph"] == "M":
+            names[ev["pid"]] = ev["args"]["name"]
+            totals.setdefault(ev["pid"], {})
+        elif ev["ph"] == "X" and not ev["args"].get("depth", 0):
+            t = totals.setdefault(ev["pid"], {}).setdefault(
+                ev["name"], {"time": 0.0, "calls": 0, "bytes": 0})
+            t["time"] += ev["dur"] / 1e6
+            t["calls"] += 1
+            t["bytes"] += ev["args"].get("bytes", 0)
+    return [(names.get(pid, str(pid)), totals[pid]) for pid in sorted(totals)]
@@ -0,0 +1,257 @@
+"""
+Column-stochastic transition matrices built in one vectorized pass.
+
+Every matrix-based solver needs P with P[i, j] = w(j → i) / Σ_k w(j → k).
+Building it edge by edge from a DiGraph costs a dict lookup and a
+``G.out_degree`` call per edge, and small differences in how each solver
+treated self-loops, repeated edges and dangling nodes made their results
+drift apart.  This module builds P once from edge arrays instead:
+
+1. Edges are encoded as int64 keys ``source · N + target`` and sorted
+   (stably, so "first" keeps the weight that came first in the file);
+   repeats of an edge become neighbours and are reduced to one entry
+   with ``np.add.reduceat`` / ``np.maximum.reduceat`` (``dedupe_edges``).
+2. The sorted keys are already the CSR out-adjacency.  Self-loops are
+   masked out or kept, the out-weights are one ``np.bincount`` and every
+   entry is divided by the out-weight of its source (``normalize``).
+3. The CSR out-adjacency *is* the CSC layout of P, so P in CSR is a
+   single SciPy format conversion, with no further sort.
+
+How the graph is read is described by a ``TransitionPolicy``:
+
+• ``weighted``: the edge list has a third column of non-negative weights
+  (missing weights count as 1)
+• ``dedupe``: what a repeated edge contributes: the ``first`` weight
+  seen (like a DiGraph, one link per pair), the ``sum`` of its weights (a multigraph; for
+  unweighted input, its multiplicity) or the ``max``
+• ``self_loops``: ``keep`` them as links or ``drop`` them
+• ``dangling``: nodes without out-links spread their mass like the
+  ``teleport`` vector, or keep it with a ``self`` loop
+
+``load_graph`` applies ``dedupe`` while building its CSR and stores the
+policy in ``G.graph["transition"]``; ``transition_matrix(G)`` applies the
+rest, so every solver run on G sees the same P.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import List, NamedTuple, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+from scipy.sparse import csc_matrix, csr_matrix, diags
+
+DEDUPE = ("first", "sum", "max")
+SELF_LOOPS = ("keep", "drop")
+DANGLING = ("teleport", "self")
+
+
+@dataclass(frozen=True)
+class TransitionPolicy:
+    """How edges become transition probabilities (see module docstring)."""
+
+    weighted: bool = False
+    dedupe: str = "first"
+    self_loops: str = "keep"
+    dangling: str = "teleport"
+
+    def __post_init__(self):
+        for name, valid in (("dedupe", DEDUPE), ("self_loops", SELF_LOOPS), ("dangling", DANGLING)):
+            if getattr(self, name) not in valid:
+                raise ValueError(f"Unknown {name} policy {getattr(self, name)!r}. "
+                                 f"Valid choices are: {', '.join(valid)}")
+
+    @property
+    def has_weights(self) -> bool:
+        """Whether edges carry weights other than 1 (a weight column or summed repeats)."""
+        return self.weighted or self.dedupe == "sum"
+
+    @property
+    def plain(self) -> bool:
+        """Whether P is the plain 1/out-degree matrix of the deduplicated graph."""
+        return not self.has_weights and self.self_loops == "keep" and self.dangling == "teleport"
+
+
+def graph_policy(G) -> TransitionPolicy:
+    """The policy G was loaded with (default: ``TransitionPolicy()``)."""
+    graph = getattr(G, "graph", None)
+    return (graph or {}).get("transition") or TransitionPolicy()
+
+
+class Transition(NamedTuple):
+    """
+    Attributes:
+        nodes: Node of every row/column
+        P: Column-stochastic transition matrix (CSR, float64); the columns
+            of dangling nodes are zero, or a self-loop with ``dangling="self"``
+        dangling: Boolean mask of the nodes whose mass follows the teleport
+            vector (all False with ``dangling="self"``)
+    """
+
+    nodes: List
+    P: csr_matrix
+    dangling: np.ndarray
+
+
+def dedupe_edges(
+    key: np.ndarray,
+    weights: Optional[np.ndarray] = None,
+    dedupe: str = "first",
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Sort edge keys and collapse repeated edges into one.
+
+    Args:
+        key: int64 edge keys (source · N + target), in input order; sorted
+            in place when there are no weights
+        weights: Weight of every edge, or None for weight 1
+        dedupe: "first", "sum" or "max" (see ``TransitionPolicy``)
+
+    Returns:
+        (sorted unique keys, their reduced weights).  The weights are None
+        when the input had none and ``dedupe`` is not "sum".
+    """
+    if dedupe not in DEDUPE:
+        raise ValueError(f"Unknown dedupe policy {dedupe!r}. Valid choices are: {', '.join(DEDUPE)}")
+    if weights is None:
+        key.sort()
+    else:
+        order = np.argsort(key, kind="stable")
+        key, weights = key[order], weights[order]
+    first = np.ones(len(key), dtype=bool)
+    first[1:] = key[1:] != key[:-1]
+    if first.all():
+        return key, (np.ones(len(key)) if weights is None and dedupe == "sum" else weights)
+    starts = np.flatnonzero(first)
+
+    if weights is None:
+        if dedupe == "sum":
+            weights = np.diff(np.append(starts, len(key))).astype(float)
+    elif dedupe == "sum":
+        weights = np.add.reduceat(weights, starts)
+    elif dedupe == "max":
+        weights = np.maximum.reduceat(weights, starts)
+    else:
+        weights = weights[starts]
+    return key[starts], weights
+
+
+def normalize(
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    weights: Optional[np.ndarray] = None,
+    *,
+    self_loops: str = "keep",
+    dangling: str = "teleport",
+) -> Tuple[csr_matrix, np.ndarray]:
+    """
+    Column-stochastic P of a CSR out-adjacency with optional edge weights.
+
+    Returns:
+        (P, dangling mask) as in ``Transition``
+    """
+    N = len(indptr) - 1
+    if self_loops not in SELF_LOOPS:
+        raise ValueError(f"Unknown self_loops policy {self_loops!r}. "
+                         f"Valid choices are: {', '.join(SELF_LOOPS)}")
+    if dangling not in DANGLING:
+        raise ValueError(f"Unknown dangling policy {dangling!r}. Valid choices are: {', '.join(DANGLING)}")
+
+    src = np.repeat(np.arange(N, dtype=np.int64), np.diff(indptr))
+    data = np.ones(len(indices)) if weights is None else np.asarray(weights, dtype=float)
+    if self_loops == "drop":
+        keep = indices != src
+        if not keep.all():
+            src, indices, data = src[keep], indices[keep], data[keep]
+            indptr = np.zeros(N + 1, dtype=np.int64)
+            np.cumsum(np.bincount(src, minlength=N), out=indptr[1:])
+
+    out = np.bincount(src, weights=data, minlength=N)
+    # Zero-weight rows count as dangling too: they have nowhere to send their mass
+    mask = out <= 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        data = np.where(out[src] > 0, data / out[src], 0.0)
+    # The CSR out-adjacency read as CSC is P itself
+    P = csc_matrix((data, indices, indptr), shape=(N, N)).tocsr()
+    if dangling == "self" and mask.any():
+        P = (P + diags(mask.astype(float), format="csr")).tocsr()
+        mask = np.zeros(N, dtype=bool)
+    return P, mask
+
+
+def transition_from_edges(
+    src: np.ndarray,
+    dst: np.ndarray,
+    n: int,
+    weights: Optional[np.ndarray] = None,
+    policy: Optional[TransitionPolicy] = None,
+) -> Tuple[csr_matrix, np.ndarray]:
+    """
+    Column-stochastic P of an edge array with dense node indices 0..n-1.
+
+    Repeated edges are reduced with ``policy.dedupe``, then ``normalize``
+    applies the self-loop and dangling policies.
+
+    Returns:
+        (P, dangling mask) as in ``Transition``
+    """
+    policy = policy or TransitionPolicy()
+    width = max(n, 1)
+    key, weights = dedupe_edges(np.asarray(src, dtype=np.int64) * width + np.asarray(dst, dtype=np.int64),
+                                weights, policy.dedupe)
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(key // width, minlength=n), out=indptr[1:])
+    return normalize(indptr, key % width, weights,
+                     self_loops=policy.self_loops, dangling=policy.dangling)
+
+
+def transition_matrix(G: nx.DiGraph, policy: Optional[TransitionPolicy] = None) -> Transition:
+    """
+    Transition matrix of G under ``policy`` (default: the one G was loaded with).
+
+    Graphs from ``load_graph`` reuse the CSR (and its weights) built while
+    loading; other graphs are converted once, reading the ``weight`` edge
+    attribute when the policy has weights.  ``G`` may also be a
+    ``csr_loader.CSRGraph``.
+    """
+    from .csr_loader import CSRGraph
+
+    policy = policy or graph_policy(G)
+    csr = G if isinstance(G, CSRGraph) else G.graph.get("csr")
+    if (csr is not None and csr.number_of_nodes() == G.number_of_nodes()
+            and csr.number_of_edges() == G.number_of_edges()):
+        weights = csr.weights if policy.has_weights else None
+        P, mask = normalize(csr.indptr, csr.indices, weights,
+                            self_loops=policy.self_loops, dangling=policy.dangling)
+        return Transition(csr.nodes.tolist(), P, mask)
+
+    nodes = list(G.nodes())
+    index = {n: i for i, n in enumerate(nodes)}
+    E = G.number_of_edges()
+    src = np.fromiter((index[u] for u, _ in G.edges()), dtype=np.int64, count=E)
+    dst = np.fromiter((index[v] for _, v in G.edges()), dtype=np.int64, count=E)
+    weights = (np.fromiter((w for _, _, w in G.edges(data="weight", default=1.0)), dtype=float, count=E)
+               if policy.has_weights else None)
+    P, mask = transition_from_edges(src, dst, len(nodes), weights, policy)
+    return Transition(nodes, P, mask)
+
+
+def networkx_view(G: nx.DiGraph, policy: Optional[TransitionPolicy] = None) -> Tuple[nx.DiGraph, Optional[str]]:
+    """
+    (graph, weight attribute) under which ``nx.pagerank`` follows the same P.
+
+    A ``csr_loader.CSRGraph`` is converted to a new DiGraph; other graphs
+    are copied only when self-loops are dropped or dangling nodes get one.
+    """
+    from .csr_loader import CSRGraph
+
+    policy = policy or graph_policy(G)
+    if isinstance(G, CSRGraph):
+        G = G.to_networkx()
+    elif policy.self_loops == "drop" or policy.dangling == "self":
+        G = G.copy()
+    if policy.self_loops == "drop":
+        G.remove_edges_from(list(nx.selfloop_edges(G)))
+    if policy.dangling == "self":
+        G.add_edges_from(((n, n) for n, d in G.out_degree() if d == 0), weight=1.0)
+    return G, ("weight" if policy.has_weights else None)
@@ -0,0 +1,47 @@
+"""A run resumed from a checkpoint reproduces the uninterrupted run bit for bit."""
+
+import inspect
+
+import pytest
+
+from pagerank.algorithms import available_solvers, get_solver
+from pagerank.checkpoint import Checkpointer
+from pagerank.graph_io import load_graph
+
+OPTIONS = {
+    "monte_carlo": {"seed": 1, "walks_per_node": 2},
+    "async_relaxation": {"workers": 1},
+}
+
+
+@pytest.fixture(scope="module")
+def graph():
+    return load_graph("rmat:nodes=2000,edges=12000,seed=3")
+
+
+def checkpointed_solvers():
+    return [name for name in available_solvers()
+            if "checkpoint" in inspect.signature(get_solver(name)).parameters]
+
+
+@pytest.mark.parametrize("name", checkpointed_solvers())
+def test_resume_is_bit_for_bit(tmp_path, graph, name):
+    solve = get_solver(name)
+    options = {"alpha": 0.85, "tol": 1e-14, **OPTIONS.get(name, {})}
+    scores, residuals, _ = solve(graph, max_iter=12, **options)
+
+    path = str(tmp_path / "run.npz")
+    solve(graph, max_iter=5, checkpoint=Checkpointer(path, every=1), **options)
+    checkpoint = Checkpointer(path, every=1, resume=True)
+    resumed, resumed_residuals, _ = solve(graph, max_iter=12, checkpoint=checkpoint, **options)
+
+    assert resumed_residuals == residuals
+    assert resumed == scores
+
+
+def test_resume_rejects_other_run(tmp_path, graph):
+    path = str(tmp_path / "run.npz")
+    solve = get_solver("power")
+    solve(graph, max_iter=3, checkpoint=Checkpointer(path, every=1))
+    with pytest.raises(ValueError):
+        solve(graph, alpha=0.5, max_iter=3, checkpoint=Checkpointer(path, resume=True))
@@ -0,0 +1,26 @@
+"""End-to-end runs of the ``pagerank`` command."""
+
+import pytest
+
+from pagerank.cli import main
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.mark.parametrize("algorithm", ["power", "gauss_seidel", "direct_lu", "gmres_solver"])
+def test_fallback_graph(algorithm, capsys):
+    # A missing file falls back to the karate club graph
+    main(["--graph", "missing.txt", "--algorithm", algorithm, "--no-report", "--log-level", "WARNING"])
+    assert "Residual Norm:" in capsys.readouterr().out
+
+
+def test_edge_list_with_policy(workdir, capsys):
+    path = workdir / "edges.txt"
+    path.write_text("0 1 2\n0 1 1\n1 1 1\n1 2 1\n2 0 4\n2 3 1\n")
+    main(["--graph", str(path), "--algorithm", "power", "--weighted", "--dedupe", "sum",
+          "--self-loops", "drop", "--dangling", "self", "--no-report", "--log-level", "WARNING"])
+    assert "Residual Norm:" in capsys.readouterr().out
@@ -0,0 +1,88 @@
+"""Edge-list parsers: the NumPy fast paths, their fallbacks and malformed rows."""
+
+import numpy as np
+import pytest
+
+from pagerank.edge_list import has_columns, parse_edges, parse_weighted_edges, read_edge_array
+
+
+def test_parse_edges():
+    buf = b"# FromNodeId\tToNodeId\n0\t1\n1\t2\n# inline comment\n2\t0\n"
+    assert parse_edges(buf).tolist() == [[0, 1], [1, 2], [2, 0]]
+
+
+def test_parse_edges_without_trailing_newline():
+    assert parse_edges(b"5 6\n7 8").tolist() == [[5, 6], [7, 8]]
+
+
+def test_parse_edges_tolerates_extra_columns_and_blank_lines():
+    assert parse_edges(b"1 2 9\n\n3 4 9\n").tolist() == [[1, 2], [3, 4]]
+
+
+@pytest.mark.parametrize("buf", [
+    b"1 2 9\n4\n",          # as many numbers as two full lines
+    b"1 2\n3\n",
+    b"1\n2 3 4\n",
+])
+def test_parse_edges_rejects_short_lines(buf):
+    with pytest.raises(ValueError):
+        parse_edges(buf)
+
+
+def test_parse_weighted_edges():
+    ids, weights = parse_weighted_edges(b"# weighted\n0 1 0.5\n1 2 2\n2 0 1e-3\n")
+    assert ids.tolist() == [[0, 1], [1, 2], [2, 0]]
+    assert weights.tolist() == [0.5, 2.0, 1e-3]
+
+
+def test_parse_weighted_edges_missing_weight_is_one():
+    ids, weights = parse_weighted_edges(b"0 1\n1 2 3.5\n\n2 0\n")
+    assert ids.tolist() == [[0, 1], [1, 2], [2, 0]]
+    assert weights.tolist() == [1.0, 3.5, 1.0]
+    ids, weights = parse_weighted_edges(b"0 1\n1 2\n")
+    assert weights.tolist() == [1.0, 1.0]
+
+
+@pytest.mark.parametrize("buf", [
+    b"1 2 3 4\n5 6\n",      # as many numbers as two weighted lines
+    b"1 2 3\n4 5 6 7 8 9\n",
+    b"1\n2 3 4 5 6\n",
+    b"1 2 3 4\n",
+])
+def test_parse_weighted_edges_rejects_bad_column_counts(buf):
+    with pytest.raises(ValueError):
+        parse_weighted_edges(buf)
+
+
+@pytest.mark.parametrize("buf", [b"0 1 -1\n", b"0 1 nan\n", b"0 1 inf\n"])
+def test_parse_weighted_edges_rejects_bad_weights(buf):
+    with pytest.raises(ValueError):
+        parse_weighted_edges(buf)
+
+
+def test_parse_weighted_edges_rejects_fractional_ids():
+    with pytest.raises(ValueError):
+        parse_weighted_edges(b"0.5 1 1\n")
+
+
+@pytest.mark.parametrize("buf, columns, expected", [
+    (b"1 2\n3 4\n", 2, True),
+    (b"1 2\n3 4", 2, True),
+    (b" 1\t2 \n3   4\n", 2, True),
+    (b"1 2 3\n4\n", 2, False),
+    (b"1 2\n3 4 5\n", 2, False),
+    (b"1 2 3\n4 5 6\n", 3, True),
+    (b"1 2 3\n4 5 6\n", 2, False),
+    (b"", 2, False),
+])
+def test_has_columns(buf, columns, expected):
+    assert has_columns(buf, columns) is expected
+
+
+def test_read_edge_array_across_blocks(tmp_path):
+    rng = np.random.default_rng(0)
+    edges = rng.integers(0, 1000, size=(5000, 2))
+    path = tmp_path / "edges.txt"
+    path.write_text("# header\n" + "".join(f"{u}\t{v}\n" for u, v in edges))
+    for workers in (1, 4):
+        assert np.array_equal(read_edge_array(str(path), workers=workers, block_bytes=4096), edges)
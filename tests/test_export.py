@@ -0,0 +1,59 @@
+"""Columnar score export and the memory-mapped ``ScoreReader`` index."""
+
+import numpy as np
+import pytest
+
+from pagerank.export import ScoreReader, export_scores
+
+
+def scores_with_ids(ids):
+    rng = np.random.default_rng(0)
+    values = rng.random(len(ids))
+    return dict(zip(ids, (values / values.sum()).tolist()))
+
+
+@pytest.mark.parametrize("ids, index", [
+    (list(range(50)), "dense"),
+    ([7, 3, 0, 12, 19], "dense"),
+    ([7, 3, 0, 12, 20], "sorted"),
+    ([10 ** 9 + i * 7919 for i in range(50)], "sorted"),
+])
+def test_reader_round_trip(tmp_path, ids, index):
+    scores = scores_with_ids(ids)
+    export_scores(scores, str(tmp_path / "out"), metadata={"alpha": 0.85})
+    reader = ScoreReader(str(tmp_path / "out"))
+    assert reader.metadata["index"] == index
+    assert reader.metadata["alpha"] == 0.85
+    assert len(reader) == len(ids)
+    ranked = sorted(scores, key=lambda n: (-scores[n], n))
+    for node in ids:
+        assert reader.score(node) == scores[node]
+        assert reader.rank(node) == ranked.index(node) + 1
+    assert reader.top(3) == [(n, scores[n]) for n in ranked[:3]]
+
+
+@pytest.mark.parametrize("ids", [list(range(10)), [10 ** 9 + i for i in range(0, 100, 10)]])
+@pytest.mark.parametrize("missing", [-1, 10 ** 9 + 5, 10 ** 12])
+def test_reader_missing_node(tmp_path, ids, missing):
+    export_scores(scores_with_ids(ids), str(tmp_path / "out"))
+    with pytest.raises(KeyError):
+        ScoreReader(str(tmp_path / "out")).score(missing)
+
+
+def test_ties_ranked_by_node_id(tmp_path):
+    export_scores({5: 0.25, 2: 0.25, 9: 0.5}, str(tmp_path / "out"))
+    reader = ScoreReader(str(tmp_path / "out"))
+    assert [reader.rank(n) for n in (9, 2, 5)] == [1, 2, 3]
+
+
+def test_top_beyond_stored_index(tmp_path):
+    scores = scores_with_ids(list(range(20)))
+    export_scores(scores, str(tmp_path / "out"), top_k=5)
+    reader = ScoreReader(str(tmp_path / "out"))
+    ranked = sorted(scores, key=lambda n: (-scores[n], n))
+    assert [n for n, _ in reader.top(8)] == ranked[:8]
+
+
+def test_export_rejects_non_integer_ids(tmp_path):
+    with pytest.raises(ValueError):
+        export_scores({"a": 1.0}, str(tmp_path / "out"))
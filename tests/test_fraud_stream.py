@@ -0,0 +1,43 @@
+"""Transaction stream parsing of the fraud-detection application."""
+
+import importlib.util
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+MAIN = Path(__file__).parents[1] / "src" / "pagerank_application" / "fraud-detection" / "main.py"
+
+
+@pytest.fixture(scope="module")
+def fraud():
+    spec = importlib.util.spec_from_file_location("fraud_detection", MAIN)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def read(fraud, tmp_path, text: str) -> np.ndarray:
+    path = tmp_path / "stream.csv"
+    path.write_text(text)
+    return np.concatenate(list(fraud.read_stream(str(path))))
+
+
+def test_read_stream(fraud, tmp_path):
+    values = read(fraud, tmp_path, "# ts,src,dst,amount\n1,10,20,5.5\n2,20,30,1\n")
+    assert values.tolist() == [[1, 10, 20, 5.5], [2, 20, 30, 1]]
+
+
+def test_read_stream_skips_blank_lines(fraud, tmp_path):
+    values = read(fraud, tmp_path, "1 10 20\n\n2 20 30\n")
+    assert values.tolist() == [[1, 10, 20], [2, 20, 30]]
+
+
+@pytest.mark.parametrize("text", [
+    "1,10,20,5\n2,20\n3,30,40,1,9,9\n",  # as many numbers as three full lines
+    "1 10 20\n2 20 30 40 50\n",
+    "1 10\n2 20\n",
+])
+def test_read_stream_rejects_bad_column_counts(fraud, tmp_path, text):
+    with pytest.raises(ValueError):
+        read(fraud, tmp_path, text)
@@ -0,0 +1,106 @@
+"""Every registered solver against ``nx.pagerank`` under each transition policy."""
+
+import itertools
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from pagerank.algorithms import available_solvers, get_solver
+from pagerank.graph_io import load_graph
+from pagerank.transition import DANGLING, DEDUPE, SELF_LOOPS, TransitionPolicy, networkx_view
+
+# (source, target, weight): a repeated edge (0 → 1), self-loops on 1 and 3
+# (3 has no other out-edge), a dangling node 5 and a node 4 nothing links to
+EDGES = [
+    (0, 1, 1.0),
+    (0, 1, 2.0),
+    (0, 2, 0.5),
+    (1, 2, 1.0),
+    (1, 1, 3.0),
+    (2, 0, 1.0),
+    (2, 3, 2.0),
+    (2, 5, 1.0),
+    (3, 3, 1.0),
+    (3, 3, 4.0),
+    (4, 0, 1.0),
+]
+
+POLICIES = [TransitionPolicy(weighted, dedupe, self_loops, dangling)
+            for weighted, dedupe, self_loops, dangling
+            in itertools.product((False, True), DEDUPE, SELF_LOOPS, DANGLING)]
+
+# Walks follow the plain adjacency and converge statistically
+STOCHASTIC = {"monte_carlo": {"seed": 1, "walks_per_node": 2000, "max_iter": 20}}
+
+
+def reference_graph(policy: TransitionPolicy) -> nx.DiGraph:
+    """The DiGraph whose ``weight`` attributes give P under ``policy``, built edge by edge."""
+    reduced = {}
+    for u, v, w in EDGES:
+        w = w if policy.weighted else 1.0
+        if (u, v) not in reduced:
+            reduced[(u, v)] = w
+        elif policy.dedupe == "sum":
+            reduced[(u, v)] += w
+        elif policy.dedupe == "max":
+            reduced[(u, v)] = max(reduced[(u, v)], w)
+    G = nx.DiGraph()
+    G.add_nodes_from(n for edge in EDGES for n in edge[:2])
+    G.add_weighted_edges_from((u, v, w) for (u, v), w in reduced.items()
+                              if u != v or policy.self_loops == "keep")
+    if policy.dangling == "self":
+        G.add_weighted_edges_from((n, n, 1.0) for n, d in list(G.out_degree()) if d == 0)
+    return G
+
+
+@pytest.fixture(scope="module")
+def edge_files(tmp_path_factory):
+    root = tmp_path_factory.mktemp("graphs")
+    plain, weighted = root / "edges.txt", root / "weighted.txt"
+    plain.write_text("# test graph\n" + "".join(f"{u} {v}\n" for u, v, _ in EDGES))
+    weighted.write_text("".join(f"{u} {v} {w}\n" for u, v, w in EDGES))
+    return {False: str(plain), True: str(weighted)}
+
+
+def l1(scores, expected) -> float:
+    return sum(abs(scores[n] - expected[n]) for n in expected)
+
+
+@pytest.mark.parametrize("policy", POLICIES, ids=str)
+def test_networkx_view_matches_policy(edge_files, policy):
+    G = load_graph(edge_files[policy.weighted], policy=policy)
+    view, weight = networkx_view(G)
+    expected = nx.pagerank(reference_graph(policy), alpha=0.85, tol=1e-12, weight="weight")
+    assert l1(nx.pagerank(view, alpha=0.85, tol=1e-12, weight=weight), expected) < 1e-9
+
+
+@pytest.mark.parametrize("policy", POLICIES, ids=str)
+@pytest.mark.parametrize("name", [s for s in available_solvers() if s not in STOCHASTIC])
+def test_solver_matches_networkx(edge_files, name, policy):
+    G = load_graph(edge_files[policy.weighted], policy=policy)
+    expected = nx.pagerank(reference_graph(policy), alpha=0.85, tol=1e-12, weight="weight")
+    scores, residuals, _ = get_solver(name)(G, alpha=0.85, tol=1e-10, max_iter=1000)
+    assert set(scores) == set(expected)
+    assert sum(scores.values()) == pytest.approx(1.0)
+    assert l1(scores, expected) < 1e-6
+
+
+@pytest.mark.parametrize("name", list(STOCHASTIC))
+def test_stochastic_solver_matches_networkx(edge_files, name):
+    G = load_graph(edge_files[False])
+    expected = nx.pagerank(reference_graph(TransitionPolicy()), alpha=0.85, tol=1e-12)
+    options = {"alpha": 0.85, "tol": 1e-4, **STOCHASTIC[name]}
+    scores, _, _ = get_solver(name)(G, **options)
+    assert l1(scores, expected) < 0.02
+
+
+def test_solvers_accept_digraph_and_csr(edge_files):
+    csr = load_graph(edge_files[False])
+    G = nx.DiGraph((u, v) for u, v, _ in EDGES)
+    for name in available_solvers():
+        if name in STOCHASTIC:
+            continue
+        a, _, _ = get_solver(name)(csr, tol=1e-10, max_iter=1000)
+        b, _, _ = get_solver(name)(G, tol=1e-10, max_iter=1000)
+        assert np.allclose([a[n] for n in G], [b[n] for n in G], atol=1e-8), name